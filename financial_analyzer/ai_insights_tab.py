@@ -5,6 +5,7 @@ Provides comprehensive AI-powered analysis across all financial areas
 
 import streamlit as st
 import pandas as pd
+from financial_analyzer.analysis_graph import get_analysis_graph
 from financial_analyzer.analysis_modes import FinancialAnalyzer
 from financial_analyzer.render_layouts import _get_batched_insights
 
@@ -109,7 +110,7 @@ def _summarize_sales(sales_res, months_filter, products_filter):
 
 
 def _summarize_anomalies(dfs, months_filter, products_filter):
-    anomalies = FinancialAnalyzer.detect_anomalies(dfs)
+    anomalies = get_analysis_graph(dfs)['anomalies']
     if anomalies.empty:
         return ""
     df = anomalies.copy()
@@ -227,14 +228,15 @@ def _summarize_spending(spending_res, months_filter):
 def _build_structured_context(dfs, question: str):
     intents = _detect_intents(question)
     months_filter = _extract_month_filters(question)
-    sales_res = FinancialAnalyzer.analyze_sales(dfs)
+    graph = get_analysis_graph(dfs)
+    sales_res = graph['sales']
     available_products = sales_res.get('by_product', pd.DataFrame())
     product_names = available_products['Product'].tolist() if available_products is not None and not available_products.empty else []
     products_filter = _detect_product_filters(question, product_names)
 
     context_parts = []
 
-    overview = FinancialAnalyzer.analyze_overview(dfs)
+    overview = graph['overview']
     if overview:
         context_parts.append(
             f"Overview: YTD sales ${overview.get('ytd_sales', 0):,.0f}; expenses ${overview.get('ytd_expense', 0):,.0f}; net profit ${overview.get('net_profit', 0):,.0f}; net margin {overview.get('net_profit_margin', 0):.1f}%"
@@ -251,27 +253,27 @@ def _build_structured_context(dfs, question: str):
             context_parts.append(anomaly_summary)
 
     if 'cash' in intents:
-        cash_summary = _summarize_cash(FinancialAnalyzer.analyze_cash(dfs))
+        cash_summary = _summarize_cash(graph['cash'])
         if cash_summary:
             context_parts.append(cash_summary)
 
     if 'ar' in intents:
-        ar_summary = _summarize_ar(FinancialAnalyzer.analyze_ar(dfs))
+        ar_summary = _summarize_ar(graph['ar'])
         if ar_summary:
             context_parts.append(ar_summary)
 
     if 'ap' in intents:
-        ap_summary = _summarize_ap(FinancialAnalyzer.analyze_ap(dfs))
+        ap_summary = _summarize_ap(graph['ap'])
         if ap_summary:
             context_parts.append(ap_summary)
 
     if 'profit' in intents:
-        profit_summary = _summarize_profitability(FinancialAnalyzer.analyze_profit(dfs), months_filter)
+        profit_summary = _summarize_profitability(graph['profit'], months_filter)
         if profit_summary:
             context_parts.append("Profitability: " + profit_summary)
 
     if 'expense' in intents:
-        spending_summary = _summarize_spending(FinancialAnalyzer.analyze_spending(dfs), months_filter)
+        spending_summary = _summarize_spending(graph['spending'], months_filter)
         if spending_summary:
             context_parts.append(spending_summary)
 
@@ -315,8 +317,9 @@ def calculate_health_score(dfs):
     score = 100
     
     try:
+        graph = get_analysis_graph(dfs)
         # Overview metrics
-        ov = FinancialAnalyzer.analyze_overview(dfs)
+        ov = graph['overview']
         profit_margin = ov.get('net_profit_margin', 0)
         
         # Deduct points for poor profitability
@@ -326,7 +329,7 @@ def calculate_health_score(dfs):
             score -= 10
         
         # Cash flow analysis
-        cash_res = FinancialAnalyzer.analyze_cash(dfs)
+        cash_res = graph['cash']
         runway = cash_res.get('runway_months', 999)
         if runway < 3:
             score -= 30
@@ -336,7 +339,7 @@ def calculate_health_score(dfs):
             score -= 5
         
         # AR aging
-        ar_res = FinancialAnalyzer.analyze_ar(dfs)
+        ar_res = graph['ar']
         aging = ar_res.get('aging_table', pd.DataFrame())
         if not aging.empty:
             old_debt = aging[aging['AgingBucket'].str.contains('60|90|Over', regex=True, na=False)]['Amount'].sum()
@@ -349,7 +352,7 @@ def calculate_health_score(dfs):
                     score -= 8
         
         # Sales trend
-        sales_res = FinancialAnalyzer.analyze_sales(dfs)
+        sales_res = graph['sales']
         trend = sales_res.get('trend', pd.DataFrame())
         if not trend.empty and len(trend) >= 3:
             recent_3 = trend.tail(3)['Revenue'].mean()
@@ -371,15 +374,16 @@ def categorize_insights(all_insights, dfs):
     opportunities = []
     
     try:
+        graph = get_analysis_graph(dfs)
         # Analyze key metrics for categorization
-        cash_res = FinancialAnalyzer.analyze_cash(dfs)
+        cash_res = graph['cash']
         runway = cash_res.get('runway_months', 999)
         
-        ar_res = FinancialAnalyzer.analyze_ar(dfs)
+        ar_res = graph['ar']
         total_ar = ar_res.get('total_ar', 0)
         aging = ar_res.get('aging_table', pd.DataFrame())
         
-        ov = FinancialAnalyzer.analyze_overview(dfs)
+        ov = graph['overview']
         profit_margin = ov.get('net_profit_margin', 0)
         
         # Process insights from each mode
@@ -0,0 +1,146 @@
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 64
+
+# id(frame) -> (weakref to frame, fingerprint). Parsed frames are never modified after
+# loading (shared datasets are read-only), so a frame's fingerprint is computed once.
+_frame_fingerprints = {}
+_fingerprint_lock = threading.Lock()
+
+
+def frame_fingerprint(df):
+    """
+    Returns a content hash of a DataFrame (values, index, column names and dtypes).
+    Memoized per frame object; the weak reference guards against a recycled id().
+    """
+    key = id(df)
+    with _fingerprint_lock:
+        entry = _frame_fingerprints.get(key)
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+
+    h = hashlib.sha1()
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode('utf-8'))
+    try:
+        h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    except Exception:
+        # Cells pandas cannot hash (e.g. lists); fall back to a pickle of the frame
+        h.update(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+    fingerprint = h.hexdigest()
+
+    def _forget(_ref, key=key):
+        with _fingerprint_lock:
+            entry = _frame_fingerprints.get(key)
+            if entry is not None and entry[0] is _ref:
+                del _frame_fingerprints[key]
+
+    with _fingerprint_lock:
+        _frame_fingerprints[key] = (weakref.ref(df, _forget), fingerprint)
+    return fingerprint
+
+
+def dataset_fingerprint(dfs):
+    """Returns a content hash of a sheet name -> DataFrame dict."""
+    h = hashlib.sha1()
+    for name, df in dfs.items():
+        h.update(str(name).encode('utf-8'))
+        h.update((frame_fingerprint(df) if isinstance(df, pd.DataFrame) else repr(df)).encode('utf-8'))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of analysis results keyed by dataset fingerprint + call parameters.
+    Keeps hit / miss / eviction counters for diagnostics.
+    """
+
+    def __init__(self, maxsize=None):
+        if maxsize is None:
+            maxsize = int(os.getenv('ANALYSIS_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns (True, result) on a hit, (False, None) on a miss."""
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return True, self._results[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, result):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._results), 'maxsize': self.maxsize,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+analysis_cache = ResultCache()
+
+
+def cached_analysis(func):
+    """
+    Caches an analysis function `func(dfs, *args, **kwargs)` in `analysis_cache`.
+    The key uses the bound arguments with defaults applied, so f(dfs), f(dfs, 'x') and
+    f(dfs, param='x') share one entry when 'x' is the default.
+    Results are shared between callers and must be treated as read-only.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(dfs, *args, **kwargs):
+        if not isinstance(dfs, dict):
+            return func(dfs, *args, **kwargs)
+        try:
+            bound = signature.bind(dfs, *args, **kwargs)
+        except TypeError:
+            return func(dfs, *args, **kwargs)  # let the call raise its own error
+        bound.apply_defaults()
+
+        params = []
+        for name, value in list(bound.arguments.items())[1:]:
+            if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+                value = sorted(value.items())
+            params.append((name, value))
+        key = (func.__qualname__, dataset_fingerprint(dfs), repr(params))
+        hit, result = analysis_cache.get(key)
+        if hit:
+            return result
+
+        result = func(dfs, *args, **kwargs)
+        analysis_cache.put(key, result)
+        return result
+
+    return wrapper
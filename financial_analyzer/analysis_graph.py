@@ -0,0 +1,143 @@
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from financial_analyzer.analysis_cache import dataset_fingerprint
+from financial_analyzer.analysis_modes import FinancialAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# name -> (dependencies, fn(dfs, *dependency_results)). A dependency that raised is passed as None.
+# Sales / profit / spending share the P&L cube through PnLCube.for_dataset's own cache.
+NODES = {
+    'sales': ((), lambda dfs: FinancialAnalyzer.analyze_sales(dfs)),
+    'profit': ((), lambda dfs: FinancialAnalyzer.analyze_profit(dfs)),
+    'spending': ((), lambda dfs: FinancialAnalyzer.analyze_spending(dfs)),
+    'ar': ((), lambda dfs: FinancialAnalyzer.analyze_ar(dfs)),
+    'ap': ((), lambda dfs: FinancialAnalyzer.analyze_ap(dfs)),
+    'cash': ((), lambda dfs: FinancialAnalyzer.analyze_cash(dfs)),
+    'cash_flow_statement': ((), lambda dfs: FinancialAnalyzer.analyze_cash_flow_statement(dfs)),
+    'overview': (('profit', 'ar', 'ap'), lambda dfs, profit, ar, ap: FinancialAnalyzer._overview_from(profit, ar, ap)),
+    'forecast': (('sales',), lambda dfs, sales: FinancialAnalyzer._forecast_from(sales)),
+    'seasonal_forecast': (('sales',), lambda dfs, sales: FinancialAnalyzer._forecast_from(sales, 'holt_winters')),
+    'anomalies': (('sales',), lambda dfs, sales: FinancialAnalyzer._anomalies_from(sales)),
+}
+
+
+class AnalysisGraph:
+    """
+    Lazily evaluated analyses of one dataset.
+
+    Each node in NODES is computed at most once, on first access, after its dependencies;
+    `graph['overview']` reuses the profit / AR / AP nodes instead of re-running them.
+    `timings` holds each node's own compute time in seconds (dependencies excluded).
+    Results are shared between callers and must be treated as read-only.
+    The dataset is held through a weak reference where it supports one (ReadOnlyDataset
+    does), so a graph never keeps a released dataset version alive.
+    """
+
+    def __init__(self, dfs, nodes=None):
+        try:
+            self._dfs = weakref.ref(dfs)
+        except TypeError:
+            self._dfs = lambda: dfs  # plain dicts cannot be weakly referenced
+        self.nodes = nodes or NODES
+        self.timings = {}
+        self.errors = {}
+        self._results = {}
+        self._locks = {name: threading.Lock() for name in self.nodes}
+
+    @property
+    def dfs(self):
+        """The dataset, or None once it has been garbage collected."""
+        return self._dfs()
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def get(self, name):
+        """Returns the node's result, computing it (and its dependencies) if needed. Re-raises node errors."""
+        if name not in self.nodes:
+            raise KeyError(f"Unknown analysis: {name}")
+        self._resolve(name)
+        if name in self.errors:
+            raise self.errors[name]
+        return self._results[name]
+
+    def _resolve(self, name):
+        if name in self._results or name in self.errors:
+            return
+        deps, fn = self.nodes[name]
+        with self._locks[name]:
+            if name in self._results or name in self.errors:
+                return
+            dfs = self.dfs
+            if dfs is None:
+                raise RuntimeError(f"Dataset of analysis '{name}' has been released")
+            dep_results = []
+            for dep in deps:
+                self._resolve(dep)
+                dep_results.append(self._results.get(dep))
+            start = time.perf_counter()
+            try:
+                self._results[name] = fn(dfs, *dep_results)
+            except Exception as e:
+                logger.warning(f"Analysis '{name}' failed: {e}")
+                self.errors[name] = e
+            self.timings[name] = time.perf_counter() - start
+
+    def compute(self, names, max_workers=None):
+        """
+        Evaluates several nodes concurrently on a thread pool (pandas / numpy release the GIL
+        in their heavy kernels) and returns {name: result} in the order of `names`.
+        Shared dependencies are still computed once; the first failing node's error is raised.
+        ANALYSIS_WORKERS caps the pool size; 1 evaluates serially.
+        """
+        names = list(names)
+        if max_workers is None:
+            max_workers = int(os.getenv('ANALYSIS_WORKERS', 0)) or min(len(names), os.cpu_count() or 1)
+        if max_workers <= 1 or len(names) <= 1:
+            return {name: self.get(name) for name in names}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis') as pool:
+            return dict(zip(names, pool.map(self.get, names)))
+
+    def computed(self):
+        """Names of the nodes evaluated so far."""
+        return list(self.timings)
+
+
+_graphs = OrderedDict()
+_graphs_lock = threading.Lock()
+MAX_GRAPHS = 8
+
+
+def _forget_graph(key, graph_ref):
+    with _graphs_lock:
+        if key in _graphs and _graphs[key] is graph_ref():
+            del _graphs[key]
+
+
+def get_analysis_graph(dfs):
+    """
+    Returns the shared AnalysisGraph for a dataset (one per dataset content).
+    A graph is dropped together with its dataset, so released versions are freed.
+    """
+    if not isinstance(dfs, dict):
+        return AnalysisGraph(dfs)
+    key = dataset_fingerprint(dfs)
+    with _graphs_lock:
+        graph = _graphs.get(key)
+        if graph is None or graph.dfs is None:
+            graph = _graphs[key] = AnalysisGraph(dfs)
+            try:
+                weakref.finalize(dfs, _forget_graph, key, weakref.ref(graph))
+            except TypeError:
+                pass
+            while len(_graphs) > MAX_GRAPHS:
+                _graphs.popitem(last=False)
+        _graphs.move_to_end(key)
+        return graph
@@ -1,11 +1,18 @@
 
 from financial_analyzer.schema_matcher import SchemaMatcher
+from financial_analyzer.analysis_cache import cached_analysis
+from financial_analyzer.pnl_cube import PnLCube
+from financial_analyzer.cash_flow_parser import period_flows, section_totals, tag_statement
+from financial_analyzer.forecast_engine import ForecastEngine
+from financial_analyzer.anomaly_detection import ANOMALY_COLUMNS, find_anomalies
+import numpy as np
 import pandas as pd
+from collections import namedtuple
 from datetime import datetime
 import streamlit as st
 
-# Cache for analysis results to prevent redundant calculations
-_analysis_cache = {}
+# Product x month sales and MoM growth as float32 arrays (rows follow `products`, columns `months`)
+GrowthArrays = namedtuple('GrowthArrays', ['products', 'months', 'revenue', 'growth'])
 
 class FinancialAnalyzer:
     """
@@ -14,16 +21,28 @@ class FinancialAnalyzer:
     """
     
     @staticmethod
+    @cached_analysis
     def analyze_overview(dfs):
         """Mode 1: Overview - Aggregates key metrics from other modules"""
         if not dfs or not isinstance(dfs, dict):
             return {'ytd_sales': 0, 'ytd_expense': 0, 'net_profit': 0, 'net_profit_margin': 0, 'total_ar': 0, 'total_ap': 0}
-        
+
+        def safe(analysis):
+            try:
+                return analysis(dfs)
+            except Exception:
+                return None
+
+        return FinancialAnalyzer._overview_from(
+            safe(FinancialAnalyzer.analyze_profit), safe(FinancialAnalyzer.analyze_ar), safe(FinancialAnalyzer.analyze_ap))
+
+    @staticmethod
+    def _overview_from(pnl_res, ar_res, ap_res):
+        """Builds the overview cards from profit, AR and AP results (None for a failed analysis)."""
         results = {}
         
         # 1. P&L Metrics (YTD Sales, Expense, Net)
         try:
-            pnl_res = FinancialAnalyzer.analyze_profit(dfs)
             metrics = pnl_res.get('metrics', {})
             results['ytd_sales'] = metrics.get('ytd_op_income', 0)
             # Fix: Include Other Expenses in the main card
@@ -38,13 +57,11 @@ class FinancialAnalyzer:
             
         # 2. Balance Sheet Metrics (AR, AP)
         try:
-            ar_res = FinancialAnalyzer.analyze_ar(dfs)
             results['total_ar'] = ar_res.get('total_ar', 0)
         except Exception:
             results['total_ar'] = 0
             
         try:
-            ap_res = FinancialAnalyzer.analyze_ap(dfs)
             results['total_ap'] = ap_res.get('total_open', 0)
         except Exception:
              results['total_ap'] = 0
@@ -52,13 +69,14 @@ class FinancialAnalyzer:
         return results
 
     @staticmethod
-    def analyze_sales(dfs):
-        """Mode 2: Sales Trends"""
-        # Check cache first
-        cache_key = f"sales_{id(dfs)}"
-        if cache_key in _analysis_cache:
-            return _analysis_cache[cache_key]
-        
+    @cached_analysis
+    def analyze_sales(dfs, as_arrays=False):
+        """
+        Mode 2: Sales Trends
+
+        With as_arrays=True the result also carries 'growth_arrays', a GrowthArrays of
+        float32 product x month revenue and MoM growth for array consumers.
+        """
         df = SchemaMatcher.get_sheet(dfs, 'Sales_Monthly')
         # Default empty return
         default_res = {
@@ -77,13 +95,15 @@ class FinancialAnalyzer:
         if prod_col not in df.columns or rev_col not in df.columns:
             return default_res # Cannot analyze without these
 
+        cube = PnLCube.for_dataset(dfs)
+
         # Group by Product
-        by_product = df.groupby(prod_col)[rev_col].sum().reset_index()
+        by_product = cube.account_totals('Sales_Monthly').reset_index()
         by_product.columns = ['Product', 'Revenue'] # Normalize output names
         
         # Trend over time
         if month_col in df.columns:
-            trend = df.groupby(month_col)[rev_col].sum().reset_index()
+            trend = cube.monthly_totals('Sales_Monthly').reset_index()
             trend.columns = ['Month', 'Revenue']
         else:
             trend = pd.DataFrame(columns=['Month', 'Revenue'])
@@ -94,32 +114,16 @@ class FinancialAnalyzer:
         
         if month_col in df.columns and prod_col in df.columns:
             try:
-                # Create pivot table: Products as rows, Months as columns
-                df_copy = df.copy()
-                df_copy[month_col] = pd.to_datetime(df_copy[month_col])
-                df_copy = df_copy.sort_values(month_col)
-                
-                product_monthly = df_copy.pivot_table(
-                    index=prod_col,
-                    columns=month_col,
-                    values=rev_col,
-                    aggfunc='sum',
-                    fill_value=0
-                )
+                # Products as rows, Months as columns
+                product_monthly = cube.account_matrix('Sales_Monthly')
+                product_monthly.index.name = prod_col
+                product_monthly.columns.name = month_col
                 
                 # Calculate Month-on-Month growth percentage
                 if len(product_monthly.columns) > 1:
-                    product_mom_growth = product_monthly.copy()
-                    for i in range(1, len(product_mom_growth.columns)):
-                        prev_col = product_mom_growth.columns[i-1]
-                        curr_col = product_mom_growth.columns[i]
-                        # Calculate percentage change
-                        product_mom_growth[curr_col] = (
-                            (product_monthly[curr_col] - product_monthly[prev_col]) / 
-                            product_monthly[prev_col].replace(0, 1) * 100
-                        )
-                    # First column has no previous month, set to 0
-                    product_mom_growth[product_mom_growth.columns[0]] = 0
+                    product_mom_growth = pd.DataFrame(
+                        FinancialAnalyzer._mom_growth(product_monthly.to_numpy(dtype=float)),
+                        index=product_monthly.index, columns=product_monthly.columns)
                     
             except Exception as e:
                 # If pivot fails, return empty dataframes
@@ -131,13 +135,29 @@ class FinancialAnalyzer:
             'product_monthly': product_monthly,
             'product_mom_growth': product_mom_growth
         }
-        
-        # Cache result
-        cache_key = f"sales_{id(dfs)}"
-        _analysis_cache[cache_key] = result
+        if as_arrays:
+            result['growth_arrays'] = GrowthArrays(
+                products=product_monthly.index,
+                months=product_monthly.columns,
+                revenue=product_monthly.to_numpy(dtype=np.float32),
+                growth=product_mom_growth.to_numpy(dtype=np.float32) if not product_mom_growth.empty
+                       else np.zeros(product_monthly.shape, dtype=np.float32)
+            )
         return result
 
     @staticmethod
+    def _mom_growth(values):
+        """
+        Month-on-month % change along the columns of a products x months array.
+        A zero previous month divides by 1; the first month has no previous month and is 0.
+        """
+        growth = np.zeros_like(values)
+        prev = values[:, :-1]
+        growth[:, 1:] = (values[:, 1:] - prev) / np.where(prev == 0, 1, prev) * 100
+        return growth
+
+    @staticmethod
+    @cached_analysis
     def analyze_ar(dfs):
         """Mode 3: AR Collections"""
         df = SchemaMatcher.get_sheet(dfs, 'AR')
@@ -196,6 +216,7 @@ class FinancialAnalyzer:
         }
 
     @staticmethod
+    @cached_analysis
     def analyze_ap(dfs):
         """Mode 4: AP Management"""
         df = SchemaMatcher.get_sheet(dfs, 'AP')
@@ -228,7 +249,7 @@ class FinancialAnalyzer:
             upcoming_30d += df[c].sum()
             
         if vend_col and amt_col:
-             vendors = df.groupby(vend_col)[amt_col].sum().reset_index().sort_values(amt_col, ascending=False).head(10)
+             vendors = df.groupby(vend_col, observed=True)[amt_col].sum().reset_index().sort_values(amt_col, ascending=False).head(10)
              vendors.columns = ['Vendor', 'Amount']
         else:
              vendors = default_res['vendors']
@@ -240,6 +261,7 @@ class FinancialAnalyzer:
         }
 
     @staticmethod
+    @cached_analysis
     def analyze_cash(dfs):
         """Mode 5: Cash Flow"""
         df = SchemaMatcher.get_sheet(dfs, 'Cash')
@@ -287,6 +309,7 @@ class FinancialAnalyzer:
         }
 
     @staticmethod
+    @cached_analysis
     def analyze_profit(dfs):
         """Mode 6: Profitability"""
         default_res = {'monthly_pnl': pd.DataFrame(columns=['Month', 'Revenue', 'NetProfit', 'Margin'])}
@@ -297,7 +320,7 @@ class FinancialAnalyzer:
         df_other_inc = SchemaMatcher.get_sheet(dfs, 'Other_Income_Monthly')
         df_other_exp = SchemaMatcher.get_sheet(dfs, 'Other_Expenses_Monthly')
         
-        # Combine for detailed view (Pivot Table)
+        # Need at least one P&L segment
         frames = []
         if df_sales is not None: frames.append(df_sales)
         if df_exp is not None: frames.append(df_exp)
@@ -306,70 +329,59 @@ class FinancialAnalyzer:
         
         if not frames: return default_res
         
-        df_pnl_all = pd.concat(frames, ignore_index=True)
+        cube = PnLCube.for_dataset(dfs)
         
         # Calculate Monthly Aggregates
-        def get_monthly_sum(df):
-            if df is not None and not df.empty:
-                return df.groupby('Month')['Revenue'].sum()
-            return pd.Series()
-
-        s_op_inc = get_monthly_sum(df_sales)
-        s_op_exp = get_monthly_sum(df_exp)
-        s_oth_inc = get_monthly_sum(df_other_inc)
-        s_oth_exp = get_monthly_sum(df_other_exp)
-        
-        # Align dates
-        all_months = sorted(list(set(s_op_inc.index) | set(s_op_exp.index) | set(s_oth_inc.index) | set(s_oth_exp.index)))
-        
-        pnl_data = []
-        for m in all_months:
-            op_inc = s_op_inc.get(m, 0)
-            op_exp = s_op_exp.get(m, 0)
-            oth_inc = s_oth_inc.get(m, 0)
-            oth_exp = s_oth_exp.get(m, 0)
-            
-            net_op_profit = op_inc - op_exp
-            net_profit = net_op_profit + oth_inc - oth_exp
-            
-            pnl_data.append({
-                'Month': m,
-                'OperatingIncome': op_inc,
-                'OperatingExpense': op_exp,
-                'NetOperatingProfit': net_op_profit,
-                'OtherIncome': oth_inc,
-                'OtherExpense': oth_exp,
-                'NetProfit': net_profit,
-                'Margin': (net_profit / op_inc * 100) if op_inc != 0 else 0
-            })
-            
-        pnl = pd.DataFrame(pnl_data)
+        s_op_inc = cube.monthly_totals('Sales_Monthly')
+        s_op_exp = cube.monthly_totals('Expenses_Monthly')
+        s_oth_inc = cube.monthly_totals('Other_Income_Monthly')
+        s_oth_exp = cube.monthly_totals('Other_Expenses_Monthly')
+        
+        # Align the four series on a shared month axis; a month missing from a segment counts as 0
+        pnl = pd.concat({
+            'OperatingIncome': s_op_inc,
+            'OperatingExpense': s_op_exp,
+            'OtherIncome': s_oth_inc,
+            'OtherExpense': s_oth_exp
+        }, axis=1).sort_index().fillna(0).astype(float)
+        pnl.index.name = 'Month'
+        pnl = pnl.reset_index()
+        
+        pnl['NetOperatingProfit'] = pnl['OperatingIncome'] - pnl['OperatingExpense']
+        pnl['NetProfit'] = pnl['NetOperatingProfit'] + pnl['OtherIncome'] - pnl['OtherExpense']
+        op_inc = pnl['OperatingIncome']
+        pnl['Margin'] = (pnl['NetProfit'] / op_inc.where(op_inc != 0) * 100).fillna(0)
+        pnl = pnl[['Month', 'OperatingIncome', 'OperatingExpense', 'NetOperatingProfit',
+                   'OtherIncome', 'OtherExpense', 'NetProfit', 'Margin']]
+        all_months = pnl['Month']
         
         # YTD Metrics
+        ytd = pnl.drop(columns=['Month', 'Margin']).sum()
         metrics = {
-            'ytd_op_income': pnl['OperatingIncome'].sum(),
-            'ytd_op_expense': pnl['OperatingExpense'].sum(),
-            'ytd_net_op_profit': pnl['NetOperatingProfit'].sum(),
-            'ytd_other_income': pnl['OtherIncome'].sum(),
-            'ytd_other_expense': pnl['OtherExpense'].sum(),
-            'ytd_net_profit': pnl['NetProfit'].sum(),
-            'op_margin': (pnl['NetOperatingProfit'].sum() / pnl['OperatingIncome'].sum() * 100) if pnl['OperatingIncome'].sum() else 0,
-            'net_margin': (pnl['NetProfit'].sum() / pnl['OperatingIncome'].sum() * 100) if pnl['OperatingIncome'].sum() else 0
+            'ytd_op_income': ytd['OperatingIncome'],
+            'ytd_op_expense': ytd['OperatingExpense'],
+            'ytd_net_op_profit': ytd['NetOperatingProfit'],
+            'ytd_other_income': ytd['OtherIncome'],
+            'ytd_other_expense': ytd['OtherExpense'],
+            'ytd_net_profit': ytd['NetProfit'],
+            'op_margin': (ytd['NetOperatingProfit'] / ytd['OperatingIncome'] * 100) if ytd['OperatingIncome'] else 0,
+            'net_margin': (ytd['NetProfit'] / ytd['OperatingIncome'] * 100) if ytd['OperatingIncome'] else 0
         }
         
         # Detailed Categorization
         # Use existing 'Type' column if available (High Quality)
-        if 'Type' in df_pnl_all.columns:
-             df_pnl_all['Category'] = df_pnl_all['Type']
+        if cube.has_type:
+             detailed_pivot = cube.account_matrix(*PnLCube.SEGMENTS, by=('Type', 'Product'))
+             detailed_pivot.index = detailed_pivot.index.set_names(['Category', 'Product'])
         else:
              # Fallback
-             df_pnl_all['Category'] = 'Uncategorized'
+             detailed_pivot = cube.account_matrix(*PnLCube.SEGMENTS)
+             detailed_pivot.index = pd.MultiIndex.from_product([['Uncategorized'], detailed_pivot.index], names=['Category', 'Product'])
              
-        # Format month for display
-        df_pnl_all['MonthStr'] = pd.to_datetime(df_pnl_all['Month']).dt.strftime('%b %Y')
-        
-        # Pivot
-        detailed_pivot = df_pnl_all.pivot_table(index=['Category', 'Product'], columns='MonthStr', values='Revenue', aggfunc='sum').fillna(0)
+        # Format month for display (months sharing a label are summed, as a pivot on the label would)
+        detailed_pivot.columns = pd.Index(detailed_pivot.columns.strftime('%b %Y'), name='MonthStr')
+        if not detailed_pivot.columns.is_unique:
+            detailed_pivot = detailed_pivot.T.groupby(level=0, sort=False).sum().T
         
         # Sort columns chronologically
         sorted_month_strs = [m.strftime('%b %Y') for m in all_months]
@@ -379,6 +391,7 @@ class FinancialAnalyzer:
         return {'monthly_pnl': pnl, 'metrics': metrics, 'detailed_pivot': detailed_pivot}
 
     @staticmethod
+    @cached_analysis
     def analyze_spending(dfs):
         """Mode 8: Spending Analysis"""
         try:
@@ -391,18 +404,20 @@ class FinancialAnalyzer:
              
              if not frames: return None
              
-             all_expenses = pd.concat(frames, ignore_index=True)
+             cube = PnLCube.for_dataset(dfs)
+             segments = ('Expenses_Monthly', 'Other_Expenses_Monthly')
+             if not cube.has_facts(*segments): return None  # no resolvable expense rows
              
              # 1. Total Monthly Trend
-             monthly = all_expenses.groupby('Month')['Revenue'].sum().reset_index()
+             monthly = cube.monthly_totals(*segments).reset_index()
              
              # 2. Top 5 Categories (Accounts) YTD
-             by_account = all_expenses.groupby('Product')['Revenue'].sum().sort_values(ascending=False).reset_index()
+             by_account = cube.account_totals(*segments).sort_values(ascending=False).reset_index()
              top_5 = by_account.head(5)
              
              # 3. Top 5 Trend (MoM)
              top_5_names = top_5['Product'].tolist()
-             top_5_trend = all_expenses[all_expenses['Product'].isin(top_5_names)].copy()
+             top_5_trend = cube.facts(*segments, products=top_5_names)
              
              return {
                  'monthly': monthly,
@@ -413,18 +428,30 @@ class FinancialAnalyzer:
              return None
 
     @staticmethod
-    def analyze_forecast(dfs):
-        """Mode 7: Forecast"""
+    @cached_analysis
+    def analyze_forecast(dfs, method='growth'):
+        """
+        Mode 7: Forecast
+        method: 'growth' (capped L6M average growth) or 'holt_winters' (seasonal smoothing)
+        """
+        # Base forecast on Operating Income (Sales Mode)
+        return FinancialAnalyzer._forecast_from(FinancialAnalyzer.analyze_sales(dfs), method)
+
+    @staticmethod
+    def _forecast_from(res, method='growth'):
+        """Projects the next 3 months from an analyze_sales result (None without sales data)."""
+        if res is None: return None
         try:
-             # Base forecast on Operating Income (Sales Mode)
-             res = FinancialAnalyzer.analyze_sales(dfs)
-             trend = res['trend']
+             trend = res['trend'].copy()  # cached sales result is shared; don't modify it
              if trend.empty: return None
              
              # Clean up
              trend['Revenue'] = pd.to_numeric(trend['Revenue'], errors='coerce').fillna(0)
              trend = trend.sort_values('Month')
              
+             if method == 'holt_winters':
+                 return FinancialAnalyzer._seasonal_forecast(trend)
+             
              # Calculate Growth Rate (CAGR or simple avg of last 6 mos)
              # Use last 6 months for relevance
              recent = trend.tail(6).copy()
@@ -463,50 +490,57 @@ class FinancialAnalyzer:
         except Exception as e:
              print(f"Forecast Error: {e}")
              return None
+
+    @staticmethod
+    def _seasonal_forecast(trend, months_ahead=3):
+        """Holt-Winters projection of a sorted Month / Revenue trend (seasonal with 24+ months)."""
+        # On a gap-free month axis so the seasonal index lines up; missing months are NaN
+        months = pd.DatetimeIndex(pd.to_datetime(trend['Month']))
+        series = pd.Series(trend['Revenue'].to_numpy(dtype=float), index=months)
+        if months.is_month_start.all() and months.is_unique:
+            series = series.reindex(pd.date_range(months.min(), months.max(), freq='MS'))
+        hw = ForecastEngine.fit_stored('holt_winters', series.to_numpy(), series.index, months_ahead)
+        values = hw.future_values[0]
+        if not np.isfinite(values).all():
+            return None
+        
+        forecast_df = pd.DataFrame({'Month': hw.future_dates, 'Revenue': values, 'Type': 'Forecast'})
+        
+        # Average monthly growth implied by the projection, for the growth metric / insights
+        last_val = trend.iloc[-1]['Revenue']
+        growth = (values[-1] / last_val) ** (1 / months_ahead) - 1 if last_val > 0 and values[-1] > 0 else 0
+        
+        trend['Type'] = 'Actual'
+        return {
+            'history': trend,
+            'forecast': forecast_df,
+            'growth_rate': growth,
+            'seasonal': bool(hw.seasonal[0]),
+            'params': dict(zip(['alpha', 'beta', 'gamma'], hw.params[0]))
+        }
     
     @staticmethod
+    @cached_analysis
     def analyze_cash_flow_statement(dfs):
         """Mode 9: Cash Flow Statement Analysis (from QuickBooks Statement of Cash Flows)"""
         try:
             # Direct access since the sheet name is "Cash flow" (with space)
             df = dfs.get('Cash flow')
-            if df is None or df.empty:
+            if df is None or df.empty or df.shape[1] < 2:
                 return None
             
-            # QuickBooks format: First column has line items, second has amounts
-            df_clean = df.copy()
-            df_clean.columns = ['Line_Item', 'Amount']
-            
-            # Remove NaN rows and convert amounts
-            df_clean = df_clean[df_clean['Amount'].notna()].copy()
-            df_clean['Amount'] = pd.to_numeric(df_clean['Amount'], errors='coerce').fillna(0)
-            
-            # Extract key sections
-            net_income = df_clean[df_clean['Line_Item'].str.contains('Net Income', case=False, na=False)]['Amount'].sum()
-            
-            # Operating Activities (between "OPERATING ACTIVITIES" and "INVESTING")
-            operating_start = df_clean[df_clean['Line_Item'].str.contains('OPERATING ACTIVITIES', case=False, na=False)].index
-            investing_start = df_clean[df_clean['Line_Item'].str.contains('INVESTING ACTIVITIES', case=False, na=False)].index
-            financing_start = df_clean[df_clean['Line_Item'].str.contains('FINANCING ACTIVITIES', case=False, na=False)].index
-            
-            # Calculate section totals
-            operating_cf = 0
-            investing_cf = 0
-            financing_cf = 0
+            # Every row tagged with its section and role (header / item / subtotal / balance)
+            # in one pass; one value column per period for multi-month exports
+            df_clean = tag_statement(df)
+            items = df_clean[df_clean['Role'] == 'item']
             
-            if len(operating_start) > 0:
-                end_idx = investing_start[0] if len(investing_start) > 0 else len(df_clean)
-                operating_section = df_clean.iloc[operating_start[0]+1:end_idx]
-                operating_cf = operating_section['Amount'].sum()
+            net_income = items.loc[items['Is_Net_Income'], 'Amount'].sum()
             
-            if len(investing_start) > 0:
-                end_idx = financing_start[0] if len(financing_start) > 0 else len(df_clean)
-                investing_section = df_clean.iloc[investing_start[0]+1:end_idx]
-                investing_cf = investing_section['Amount'].sum()
-            
-            if len(financing_start) > 0:
-                financing_section = df_clean.iloc[financing_start[0]+1:]
-                financing_cf = financing_section['Amount'].sum()
+            # Section totals from the line items (subtotal rows are not added again)
+            totals = section_totals(df_clean)
+            operating_cf = totals['operating']
+            investing_cf = totals['investing']
+            financing_cf = totals['financing']
             
             # Net change in cash
             net_cash_change = operating_cf + investing_cf + financing_cf
@@ -514,67 +548,11 @@ class FinancialAnalyzer:
             # Key metrics
             fcf = operating_cf + investing_cf  # Free Cash Flow
             
-            # Get ONLY actual cash transactions from Investing and Financing sections
             # Operating section contains reconciliation items (A/R, A/P, credit cards, etc.) which aren't actual cash
             # Only Investing and Financing sections show actual cash transactions
-            
-            # Find section boundaries
-            operating_start_idx = operating_start[0] if len(operating_start) > 0 else 0
-            investing_start_idx = investing_start[0] if len(investing_start) > 0 else len(df_clean)
-            financing_start_idx = financing_start[0] if len(financing_start) > 0 else len(df_clean)
-            
-            # Extract only Investing and Financing sections (actual cash transactions)
-            investing_items = pd.DataFrame()
-            financing_items = pd.DataFrame()
-            
-            if len(investing_start) > 0:
-                end_idx = financing_start_idx if len(financing_start) > 0 else len(df_clean)
-                investing_items = df_clean.iloc[investing_start_idx+1:end_idx].copy()
-            
-            if len(financing_start) > 0:
-                # Find where financing section ends (before "Net cash increase")
-                net_increase_idx = df_clean[df_clean['Line_Item'].str.contains('Net cash increase|Net cash decrease', case=False, na=False)].index
-                end_idx = net_increase_idx[0] if len(net_increase_idx) > 0 else len(df_clean)
-                financing_items = df_clean.iloc[financing_start_idx+1:end_idx].copy()
-            
-            # Combine investing and financing items
-            actual_cash_items = pd.concat([investing_items, financing_items], ignore_index=True)
-            
-            # Extract Operating Activities items (reconciliation items from Net Income to Cash)
-            operating_items = pd.DataFrame()
-            if len(operating_start) > 0:
-                # In QuickBooks, operating items might be:
-                # 1. Between "OPERATING ACTIVITIES" and "INVESTING ACTIVITIES"
-                # 2. OR between "Net Income" and "Net cash provided by operating"
-                
-                # Try to find Net Income line as starting point
-                net_income_idx = df_clean[df_clean['Line_Item'].str.contains('Net Income', case=False, na=False)].index
-                net_cash_operating_idx = df_clean[df_clean['Line_Item'].str.contains('Net cash provided by operating|Net cash used in operating', case=False, na=False)].index
-                
-                # Use Net Income to Net Cash Operating as the operating section
-                if len(net_income_idx) > 0 and len(net_cash_operating_idx) > 0:
-                    # Get all items from Net Income through to (but not including) net cash summary
-                    operating_items = df_clean.iloc[net_income_idx[0]:net_cash_operating_idx[0]].copy()
-                elif len(investing_start) > 0:
-                    # Fallback: use section headers
-                    operating_items = df_clean.iloc[operating_start_idx+1:investing_start_idx].copy()
-                
-                # Exclude section summaries and headers
-                operating_items = operating_items[
-                    ~operating_items['Line_Item'].str.contains('net cash provided|net cash used|total|OPERATING ACTIVITIES', case=False, na=False)
-                ]
-            
-            # Filter out section summaries and cash balance lines
-            exclude_keywords = [
-                'net cash provided', 'net cash used', 'total',
-                'cash at beginning', 'cash at end', 'net cash increase', 'net cash decrease'
-            ]
-            actual_cash_items = actual_cash_items[
-                ~actual_cash_items['Line_Item'].str.contains('|'.join(exclude_keywords), case=False, na=False)
-            ]
-            
-            # Remove zero amounts
-            actual_cash_items = actual_cash_items[actual_cash_items['Amount'] != 0]
+            operating_items = items[items['Section'] == 'operating'][['Line_Item', 'Amount']]
+            actual_cash_items = items[items['Section'].isin(['investing', 'financing']) & (items['Amount'] != 0)]
+            actual_cash_items = actual_cash_items[['Line_Item', 'Amount']].reset_index(drop=True)
             
             # Separate into inflows and outflows
             top_outflows = actual_cash_items[actual_cash_items['Amount'] < 0].nsmallest(5, 'Amount')
@@ -590,14 +568,16 @@ class FinancialAnalyzer:
                 'top_outflows': top_outflows,
                 'top_inflows': top_inflows,
                 'raw_data': df_clean,
-                'operating_items': operating_items
+                'operating_items': operating_items,
+                'period_flows': period_flows(df_clean)
             }
         except Exception as e:
             print(f"Cash Flow Statement Error: {e}")
             return None
 
     @staticmethod
-    def detect_anomalies(dfs, spike_threshold=300, drop_threshold=-50, z_score_threshold=3):
+    @cached_analysis
+    def detect_anomalies(dfs, spike_threshold=300, drop_threshold=-50, z_score_threshold=3, detector=None):
         """
         Detect anomalies in month-on-month product revenue
         
@@ -606,74 +586,28 @@ class FinancialAnalyzer:
             spike_threshold: % growth above which is considered a spike (default: 300%)
             drop_threshold: % growth below which is considered a drop (default: -50%)
             z_score_threshold: Z-score threshold for statistical anomalies (default: 3)
+            detector: scorer for statistical anomalies - None/"zscore", "mad", "rolling"
+                      or a detector instance (see anomaly_detection)
             
         Returns:
             DataFrame with columns: Month, Product, Revenue, MoM_Growth_Pct, Anomaly_Type, Z_Score
         """
-        import numpy as np
-        from scipy import stats
-        
         # Get sales analysis data
-        sales_data = FinancialAnalyzer.analyze_sales(dfs)
+        return FinancialAnalyzer._anomalies_from(FinancialAnalyzer.analyze_sales(dfs), spike_threshold,
+                                                 drop_threshold, z_score_threshold, detector)
+
+    @staticmethod
+    def _anomalies_from(sales_data, spike_threshold=300, drop_threshold=-50, z_score_threshold=3, detector=None):
+        """detect_anomalies over an analyze_sales result."""
         product_monthly = sales_data.get('product_monthly', pd.DataFrame())
         product_mom_growth = sales_data.get('product_mom_growth', pd.DataFrame())
         
         if product_monthly.empty or product_mom_growth.empty:
-            return pd.DataFrame(columns=['Month', 'Product', 'Revenue', 'MoM_Growth_Pct', 'Anomaly_Type', 'Z_Score'])
-        
-        anomalies = []
-        
-        # Iterate through each product
-        for product in product_mom_growth.index:
-            revenue_values = product_monthly.loc[product].values
-            growth_values = product_mom_growth.loc[product].values
-            months = product_monthly.columns
-            
-            # Calculate Z-scores for growth values (excluding zeros and infinities)
-            valid_growth = growth_values[(~np.isinf(growth_values)) & (growth_values != 0)]
-            if len(valid_growth) > 2:
-                z_scores = np.abs(stats.zscore(valid_growth, nan_policy='omit'))
-                z_score_dict = dict(zip(range(len(growth_values)), [0] * len(growth_values)))
-                valid_indices = np.where((~np.isinf(growth_values)) & (growth_values != 0))[0]
-                for idx, z in zip(valid_indices, z_scores):
-                    z_score_dict[idx] = z
-            else:
-                z_score_dict = {i: 0 for i in range(len(growth_values))}
-            
-            # Check each month for anomalies
-            for i, (month, revenue, growth) in enumerate(zip(months, revenue_values, growth_values)):
-                if i == 0:  # Skip first month (no MoM comparison)
-                    continue
-                
-                anomaly_types = []
-                z_score = z_score_dict.get(i, 0)
-                
-                # Threshold-based detection
-                if growth > spike_threshold:
-                    anomaly_types.append('Spike')
-                if growth < drop_threshold:
-                    anomaly_types.append('Drop')
-                
-                # Statistical detection (Z-score)
-                if z_score > z_score_threshold and abs(growth) > 10:  # At least 10% change
-                    if 'Statistical' not in anomaly_types:
-                        anomaly_types.append('Statistical')
-                
-                # If any anomaly detected, add to list
-                if anomaly_types:
-                    anomalies.append({
-                        'Month': month.strftime('%b %Y') if hasattr(month, 'strftime') else str(month),
-                        'Product': product,
-                        'Revenue': revenue,
-                        'MoM_Growth_Pct': growth,
-                        'Anomaly_Type': ', '.join(anomaly_types),
-                        'Z_Score': z_score
-                    })
-        
-        # Create DataFrame and sort by absolute growth
-        anomalies_df = pd.DataFrame(anomalies)
-        if not anomalies_df.empty:
-            anomalies_df['Abs_Growth'] = anomalies_df['MoM_Growth_Pct'].abs()
-            anomalies_df = anomalies_df.sort_values('Abs_Growth', ascending=False).drop('Abs_Growth', axis=1)
-        
-        return anomalies_df
+            return pd.DataFrame(columns=ANOMALY_COLUMNS)
+        
+        return find_anomalies(
+            product_mom_growth.index, product_mom_growth.columns,
+            product_monthly.loc[product_mom_growth.index, product_mom_growth.columns].to_numpy(dtype=float),
+            product_mom_growth.to_numpy(dtype=float),
+            spike_threshold, drop_threshold, z_score_threshold, detector
+        )
@@ -0,0 +1,154 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ANOMALY_COLUMNS = ['Month', 'Product', 'Revenue', 'MoM_Growth_Pct', 'Anomaly_Type', 'Z_Score']
+
+# Anomaly_Type label for each combination of (spike, drop, statistical) flags, indexed by bitmask
+_TYPE_LABELS = np.array([', '.join(name for bit, name in enumerate(['Spike', 'Drop', 'Statistical']) if code >> bit & 1)
+                         for code in range(8)], dtype=object)
+
+
+class ZScoreDetector:
+    """
+    |z-score| of each month's growth against the product's own growth history.
+    Only non-zero, finite growth values take part; products with fewer than
+    `min_points` such values score 0 everywhere.
+    """
+
+    def __init__(self, min_points=3):
+        self.min_points = min_points
+
+    def __repr__(self):
+        return f"ZScoreDetector(min_points={self.min_points})"
+
+    def scores(self, growth):
+        valid = np.isfinite(growth) & (growth != 0)
+        counts = valid.sum(axis=1, keepdims=True)
+        safe_counts = np.maximum(counts, 1)
+        mean = np.where(valid, growth, 0).sum(axis=1, keepdims=True) / safe_counts
+        std = np.sqrt(np.where(valid, (growth - mean) ** 2, 0).sum(axis=1, keepdims=True) / safe_counts)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = np.abs((growth - mean) / std)
+        return np.where(valid & (counts >= self.min_points), z, 0.0)
+
+
+class MADDetector:
+    """
+    Robust z-score, 0.6745 * |x - median| / MAD, over the same values as ZScoreDetector.
+    Not dragged around by the outliers it is looking for; a product whose growth barely
+    varies (MAD of 0) scores 0.
+    """
+
+    def __init__(self, min_points=3):
+        self.min_points = min_points
+
+    def __repr__(self):
+        return f"MADDetector(min_points={self.min_points})"
+
+    def scores(self, growth):
+        valid = np.isfinite(growth) & (growth != 0)
+        masked = np.where(valid, growth, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN rows (no valid growth)
+            median = np.nanmedian(masked, axis=1, keepdims=True)
+            mad = np.nanmedian(np.abs(masked - median), axis=1, keepdims=True)
+            z = 0.6745 * np.abs(growth - median) / mad
+        counts = valid.sum(axis=1, keepdims=True)
+        return np.where(valid & (counts >= self.min_points) & (mad > 0), z, 0.0)
+
+
+class RollingZScoreDetector:
+    """
+    |z-score| of each month's growth against the previous `window` months only, so a
+    product's behaviour is judged against its recent history rather than the whole year.
+    """
+
+    def __init__(self, window=6, min_points=3):
+        self.window = window
+        self.min_points = min_points
+
+    def __repr__(self):
+        return f"RollingZScoreDetector(window={self.window}, min_points={self.min_points})"
+
+    def scores(self, growth):
+        valid = np.isfinite(growth) & (growth != 0)
+        values = np.where(valid, growth, 0.0)
+
+        # Trailing sums over the `window` months before each month, via cumulative sums
+        def trailing(a):
+            c = np.concatenate([np.zeros((a.shape[0], 1)), np.cumsum(a, axis=1)], axis=1)
+            end = np.arange(a.shape[1])
+            start = np.maximum(end - self.window, 0)
+            return c[:, end] - c[:, start]
+
+        n = trailing(valid.astype(float))
+        s = trailing(values)
+        sq = trailing(values ** 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = s / n
+            std = np.sqrt(np.maximum(sq / n - mean ** 2, 0))
+            z = np.abs((growth - mean) / std)
+        return np.where(valid & (n >= self.min_points) & (std > 0), z, 0.0)
+
+
+DETECTORS = {
+    'zscore': ZScoreDetector,
+    'mad': MADDetector,
+    'rolling': RollingZScoreDetector,
+}
+
+
+def get_detector(detector):
+    """Accepts a detector instance, a DETECTORS name, or None (plain z-score)."""
+    if detector is None:
+        return ZScoreDetector()
+    if isinstance(detector, str):
+        if detector not in DETECTORS:
+            raise ValueError(f"Unknown anomaly detector: {detector}")
+        return DETECTORS[detector]()
+    return detector
+
+
+def find_anomalies(products, months, revenue, growth, spike_threshold=300, drop_threshold=-50,
+                   z_score_threshold=3, detector=None):
+    """
+    Flags product x month growth anomalies across the whole matrix at once.
+
+    - 'Spike' / 'Drop': growth above `spike_threshold` / below `drop_threshold` percent
+    - 'Statistical': detector score above `z_score_threshold` with at least a 10% change
+    The first month has no MoM comparison and is never flagged.
+
+    Returns a DataFrame with ANOMALY_COLUMNS, largest absolute growth first.
+    """
+    revenue = np.asarray(revenue, dtype=np.float64)
+    growth = np.asarray(growth, dtype=np.float64)
+    if growth.size == 0:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+
+    scores = get_detector(detector).scores(growth)
+    with np.errstate(invalid='ignore'):
+        codes = ((growth > spike_threshold).astype(np.int8)
+                 | (growth < drop_threshold).astype(np.int8) << 1
+                 | ((scores > z_score_threshold) & (np.abs(growth) > 10)).astype(np.int8) << 2)
+    codes[:, 0] = 0
+
+    rows, cols = np.nonzero(codes)
+    if len(rows) == 0:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+
+    months = pd.Index(months)
+    labels = months.strftime('%b %Y') if isinstance(months, pd.DatetimeIndex) else months.astype(str)
+    anomalies_df = pd.DataFrame({
+        'Month': np.asarray(labels)[cols],
+        'Product': np.asarray(products, dtype=object)[rows],
+        'Revenue': revenue[rows, cols],
+        'MoM_Growth_Pct': growth[rows, cols],
+        'Anomaly_Type': _TYPE_LABELS[codes[rows, cols]],
+        'Z_Score': scores[rows, cols],
+    })
+
+    # Sort by absolute growth
+    anomalies_df['Abs_Growth'] = anomalies_df['MoM_Growth_Pct'].abs()
+    return anomalies_df.sort_values('Abs_Growth', ascending=False).drop('Abs_Growth', axis=1)
@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.analysis_cache import ResultCache
+from financial_analyzer.forecast_engine import ForecastEngine
+
+logger = logging.getLogger(__name__)
+
+# scores: one row per (Model, Series) with MAPE (%), MAE, Bias (mean forecast - actual) and N;
+# errors: long format, one row per (Model, Series, Origin, Horizon) forecast
+BacktestResult = namedtuple('BacktestResult', ['scores', 'errors'])
+
+SCORE_COLUMNS = ['Model', 'Series', 'MAPE', 'MAE', 'Bias', 'N']
+
+
+def growth_forecast(values, dates, horizon):
+    """analyze_forecast's default rule: last month compounded by the capped L6M average growth."""
+    recent = pd.DataFrame(np.nan_to_num(values[:, -6:], nan=0.0)).T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = recent.pct_change().mean().to_numpy()
+    growth = np.where(np.isnan(growth), 0.0, np.clip(growth, -0.2, 0.2))
+    last = np.nan_to_num(values[:, -1], nan=0.0)
+    return last[:, None] * (1 + growth[:, None]) ** np.arange(1, horizon + 1)[None, :]
+
+
+def naive_forecast(values, dates, horizon):
+    """Last observed month repeated (the baseline every model should beat)."""
+    last = pd.DataFrame(values).T.ffill().iloc[-1].to_numpy()
+    return np.repeat(last[:, None], horizon, axis=1)
+
+
+# name -> fn(values (series x months), dates, horizon) -> forecasts (series x horizon)
+MODELS = {
+    'naive': naive_forecast,
+    'growth': growth_forecast,
+    'linear': lambda values, dates, horizon: ForecastEngine.forecast_batch(values, dates, horizon).future_values,
+    'holt_winters': lambda values, dates, horizon: ForecastEngine.holt_winters_batch(values, dates, horizon).future_values,
+}
+
+# Forecasts per (model, training window, horizon); survives between backtests in this process
+fit_cache = ResultCache(maxsize=int(os.getenv('BACKTEST_CACHE_SIZE', 512)))
+
+
+def _window_key(model, train, dates, horizon):
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(train, dtype=np.float64).tobytes())
+    h.update(np.asarray(dates, dtype='datetime64[ns]').tobytes())
+    return (model, train.shape, h.hexdigest(), horizon)
+
+
+def _fit_window(model, train, dates, horizon):
+    """Process pool entry point: one model fitted on one training window (all series)."""
+    return MODELS[model](train, pd.DatetimeIndex(dates), horizon)
+
+
+def _run_fits(tasks, max_workers):
+    if max_workers is None:
+        max_workers = int(os.getenv('BACKTEST_WORKERS', 0)) or min(len(tasks), os.cpu_count() or 1)
+    if max_workers <= 1 or len(tasks) <= 1:
+        return [_fit_window(*task) for task in tasks]
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(_fit_window, *zip(*tasks)))
+    except Exception as e:
+        logger.warning(f"Backtest process pool failed ({e}); fitting serially")
+        return [_fit_window(*task) for task in tasks]
+
+
+def backtest(matrix, models=None, horizon=3, min_train=6, max_workers=None):
+    """
+    Rolling-origin backtest of forecast models over a series x months DataFrame
+    (e.g. analyze_sales' product_monthly, or a one-row frame of the revenue trend).
+
+    For every origin from `min_train` months on, each model is fitted on the months before
+    the origin (all series at once) and its next `horizon` forecasts are scored against the
+    actual months. Fits run on a process pool (BACKTEST_WORKERS caps it; 1 runs serially)
+    and are cached per training window, so re-running a backtest only fits what changed.
+    Months with no actual value (NaN) are not scored; MAPE skips zero actuals.
+    """
+    models = list(models or MODELS)
+    unknown = [m for m in models if m not in MODELS]
+    if unknown:
+        raise ValueError(f"Unknown forecast model(s): {', '.join(unknown)}")
+
+    values = matrix.to_numpy(dtype=np.float64)
+    dates = pd.DatetimeIndex(matrix.columns)
+    n_months = values.shape[1]
+    origins = list(range(min_train, n_months))
+    if not origins or values.shape[0] == 0:
+        return BacktestResult(pd.DataFrame(columns=SCORE_COLUMNS), pd.DataFrame())
+
+    # Cached fits first; only the misses go to the pool
+    tasks, keys, forecasts = [], [], {}
+    for model in models:
+        for origin in origins:
+            train, train_dates = values[:, :origin], dates[:origin].values
+            key = _window_key(model, train, train_dates, horizon)
+            hit, result = fit_cache.get(key)
+            if hit:
+                forecasts[(model, origin)] = result
+            else:
+                tasks.append((model, train, train_dates, horizon))
+                keys.append((model, origin, key))
+    for (model, origin, key), result in zip(keys, _run_fits(tasks, max_workers)):
+        fit_cache.put(key, result)
+        forecasts[(model, origin)] = result
+
+    # Long-format errors for every scored forecast
+    frames = []
+    series = np.asarray(matrix.index, dtype=object)
+    for model in models:
+        for origin in origins:
+            forecast = forecasts[(model, origin)]
+            steps = min(horizon, n_months - origin)
+            actual = values[:, origin:origin + steps]
+            predicted = forecast[:, :steps]
+            rows, cols = np.nonzero(np.isfinite(actual) & np.isfinite(predicted))
+            frames.append(pd.DataFrame({
+                'Model': model,
+                'Series': series[rows],
+                'Origin': dates[origin],
+                'Horizon': cols + 1,
+                'Actual': actual[rows, cols],
+                'Forecast': predicted[rows, cols],
+            }))
+    errors = pd.concat(frames, ignore_index=True)
+    errors['Error'] = errors['Forecast'] - errors['Actual']
+    errors['Abs_Error'] = errors['Error'].abs()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        errors['APE'] = np.where(errors['Actual'] != 0, np.abs(errors['Error'] / errors['Actual']) * 100, np.nan)
+
+    grouped = errors.groupby(['Model', 'Series'], sort=False)
+    scores = pd.DataFrame({
+        'MAPE': grouped['APE'].mean(),
+        'MAE': grouped['Abs_Error'].mean(),
+        'Bias': grouped['Error'].mean(),
+        'N': grouped['Error'].size(),
+    }).reset_index()
+    return BacktestResult(scores[SCORE_COLUMNS], errors)
+
+
+def summarize(result):
+    """Average scores per model across series, best MAPE first."""
+    if result.scores.empty:
+        return pd.DataFrame(columns=['MAPE', 'MAE', 'Bias', 'N'])
+    summary = result.scores.groupby('Model')[['MAPE', 'MAE', 'Bias']].mean()
+    summary['N'] = result.scores.groupby('Model')['N'].sum()
+    return summary.sort_values('MAPE')
@@ -0,0 +1,83 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+SECTIONS = ['operating', 'investing', 'financing']
+
+# One anchored pattern per row role; the first alternative that matches wins
+STATEMENT_PATTERN = re.compile(
+    r"^\s*(?:"
+    r"(?P<net_change>net cash (?:increase|decrease))"
+    r"|(?P<subtotal>total\b|net cash (?:provided|used))"
+    r"|(?P<balance>cash at (?:beginning|end))"
+    r"|(?P<section>operating|investing|financing) activities\s*$"
+    r"|(?P<group>adjustments to reconcile)"
+    r"|(?P<net_income>net income\s*$)"
+    r")",
+    re.IGNORECASE,
+)
+
+
+def _period_columns(df):
+    """Value columns of a statement: every column after the line items except a 'Total' column."""
+    return [c for c in df.columns[1:] if str(c).strip().lower() != 'total']
+
+
+def tag_statement(df):
+    """
+    Tags every row of a QuickBooks Statement of Cash Flows in one regex sweep.
+
+    Returns a frame with Line_Item, one numeric column per period (multi-period exports),
+    Amount (the 'Total' column, or the sum of the periods) and:
+        Section: operating / investing / financing (None before the first section header)
+        Role:    header, item, subtotal or balance
+        Is_Net_Income: True on the 'Net Income' line the indirect method starts from
+    Net change lines ('Net cash increase for period') are subtotals outside any section.
+    """
+    line_items = df.iloc[:, 0].fillna('').astype(str)
+    periods = _period_columns(df)
+    tagged = pd.DataFrame({'Line_Item': line_items}, index=df.index)
+    for col in periods:
+        tagged[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    total_cols = [c for c in df.columns[1:] if c not in periods]
+    if total_cols:
+        tagged['Amount'] = pd.to_numeric(df[total_cols[0]], errors='coerce').fillna(0)
+    else:
+        tagged['Amount'] = tagged[periods].sum(axis=1) if periods else 0.0
+
+    matches = line_items.str.extract(STATEMENT_PATTERN)
+    section = matches['section'].str.lower()
+    # Net change / balance rows close the last section
+    section = section.mask(matches['net_change'].notna() | matches['balance'].notna(), '')
+    section = section.ffill()
+    tagged['Section'] = section.where(section != '')
+
+    role = np.select(
+        [matches['section'].notna() | matches['group'].notna(),
+         matches['subtotal'].notna() | matches['net_change'].notna(),
+         matches['balance'].notna()],
+        ['header', 'subtotal', 'balance'], default='item')
+    tagged['Role'] = role
+    tagged['Is_Net_Income'] = matches['net_income'].notna()
+    return tagged
+
+
+def section_totals(tagged, value_col='Amount'):
+    """Sum of the line items of each section (subtotal rows are not double counted)."""
+    items = tagged[(tagged['Role'] == 'item') & tagged['Section'].notna()]
+    return items.groupby('Section')[value_col].sum().reindex(SECTIONS, fill_value=0)
+
+
+def period_flows(tagged):
+    """operating / investing / financing cash flow per period column of a multi-period statement."""
+    periods = [c for c in tagged.columns if c not in ('Line_Item', 'Amount', 'Section', 'Role', 'Is_Net_Income')]
+    if not periods:
+        return pd.DataFrame(columns=['operating_cf', 'investing_cf', 'financing_cf', 'net_cash_change', 'free_cash_flow'])
+    items = tagged[(tagged['Role'] == 'item') & tagged['Section'].notna()]
+    flows = items.groupby('Section')[periods].sum().reindex(SECTIONS, fill_value=0).T
+    flows.columns = [f"{s}_cf" for s in SECTIONS]
+    flows['net_cash_change'] = flows[['operating_cf', 'investing_cf', 'financing_cf']].sum(axis=1)
+    flows['free_cash_flow'] = flows['operating_cf'] + flows['investing_cf']
+    flows.index.name = 'Period'
+    return flows
@@ -0,0 +1,174 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import openpyxl
+import pytest
+
+
+MONTH_HEADERS = ['January 2025', 'February 2025', 'March 2025', 'April 2025', 'Dec 1 - Dec 18 2025']
+
+
+def _pnl_rows(n_accounts):
+    """QuickBooks 'Profit and Loss by Month' body: section headers, accounts and totals."""
+    def values(seed):
+        return [round(100.0 * seed + 17.5 * m, 2) for m in range(len(MONTH_HEADERS))]
+
+    rows = [['Income']]
+    rows += [[f"Sales {i}"] + values(i + 1) for i in range(n_accounts)]
+    rows += [['Total for Income'], ['Cost of Goods Sold'], ['Materials'] + values(3), ['Total for Cost of Goods Sold'], ['Gross Profit']]
+    rows += [['Expenses']]
+    rows += [[f"Expense {i}"] + values(i + 2) for i in range(n_accounts)]
+    rows += [['Total for Expenses'], ['Net Operating Income']]
+    rows += [['Other Income'], ['Interest earned'] + values(0.5), ['Total for Other Income']]
+    rows += [['Other Expenses'], ['Bank fees'] + values(0.25), ['Total for Other Expenses']]
+    rows += [['Net Other Income'], ['Net Income']]
+    return rows
+
+
+def build_quickbooks_workbook(n_accounts=4):
+    """Builds an in-memory workbook shaped like the QuickBooks exports the dashboard loads."""
+    wb = openpyxl.Workbook()
+
+    ws = wb.active
+    ws.title = 'MOM PL'
+    for row in [['Work Social'], ['Profit and Loss by Month'], ['January - December 2025'], []]:
+        ws.append(row)
+    ws.append(['Distribution account'] + MONTH_HEADERS + ['Total'])
+    for row in _pnl_rows(n_accounts):
+        ws.append(row)
+
+    ws = wb.create_sheet('AR')
+    ws.append(['A/R Aging Summary'])
+    ws.append([])
+    ws.append(['', 'Current', '1 - 30', '31 - 60', '61 - 90', '91 and over', 'Total'])
+    ws.append(['Acme Corp', 1000, 200, 0, 0, 50, 1250])
+    ws.append(['Globex', '$2,500.00', '(100.00)', 300, 0, 0, '2,700.00'])
+    ws.append(['TOTAL', 3500, 100, 300, 0, 50, 3950])
+
+    ws = wb.create_sheet('AP')
+    ws.append(['A/P Aging Summary'])
+    ws.append([])
+    ws.append(['', 'Current', '1 - 30', '31 - 60', '61 - 90', '91 and over', 'Total'])
+    ws.append(['Paper Co', 400, 0, 0, 0, 0, 400])
+    ws.append(['Cloud Host', 150, 150, 0, 0, 0, 300])
+    ws.append(['TOTAL', 550, 150, 0, 0, 0, 700])
+
+    ws = wb.create_sheet('Cash flow')
+    ws.append(['Statement of Cash Flows'])
+    ws.append([])
+    ws.append(['Full name', 'Total'])
+    for row in [
+        ['OPERATING ACTIVITIES'], ['Net Income', 5000],
+        ['Adjustments to reconcile Net Income to Net Cash provided by operations:'],
+        ['Accounts Receivable (A/R)', -1200], ['Accounts Payable (A/P)', 300], ['Depreciation', 250],
+        ['Total for Adjustments to reconcile Net Income to Net Cash provided by operations:', -650],
+        ['Net cash provided by operating activities', 4350],
+        ['INVESTING ACTIVITIES'], ['Equipment', -2000], ['Net cash provided by investing activities', -2000],
+        ['FINANCING ACTIVITIES'], ['Loan proceeds', 1500], ['Owner draws', -800],
+        ['Net cash provided by financing activities', 700],
+        ['NET CASH INCREASE FOR PERIOD', 3050], ['Cash at beginning of period', 10000], ['CASH AT END OF PERIOD', 13050],
+    ]:
+        ws.append(row)
+
+    ws = wb.create_sheet('Notes')
+    ws.append(['Prepared for internal use only'])
+
+    buf = BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def quickbooks_workbook():
+    return build_quickbooks_workbook()
+
+
+@pytest.fixture(autouse=True)
+def workbook_cache_dir(tmp_path, monkeypatch):
+    """Points the process-wide workbook cache at a throwaway directory."""
+    from financial_analyzer import workbook_cache
+
+    cache_dir = tmp_path / 'workbook_cache'
+    monkeypatch.setattr(workbook_cache, '_default_cache', workbook_cache.WorkbookCache(str(cache_dir)))
+    return cache_dir
+
+
+@pytest.fixture(autouse=True)
+def dataset_store(monkeypatch):
+    """Gives every test its own process-wide DatasetStore."""
+    from financial_analyzer import dataset_store
+
+    store = dataset_store.DatasetStore()
+    monkeypatch.setattr(dataset_store, '_default_store', store)
+    return store
+
+
+@pytest.fixture(autouse=True)
+def forecast_store(monkeypatch):
+    """Gives every test its own in-memory ForecastStore."""
+    from financial_analyzer import forecast_store
+
+    store = forecast_store.ForecastStore(store_dir='')
+    monkeypatch.setattr(forecast_store, '_default_store', store)
+    return store
+
+
+class WorkbookServer:
+    """
+    Local stand-in for a OneDrive download link: serves `content` with an ETag and
+    Last-Modified and answers conditional requests with 304. Records every request's headers.
+    """
+
+    def __init__(self, content):
+        self.content = content
+        self.etag = '"v1"'
+        self.last_modified = 'Wed, 01 Oct 2025 10:00:00 GMT'
+        self.requests = []
+        self.responses = []  # optional queue of status codes to return before serving normally
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                if server.responses:
+                    self.send_response(server.responses.pop(0))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if self.headers.get('If-None-Match') == server.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+                self.send_header('Content-Length', str(len(server.content)))
+                self.send_header('ETag', server.etag)
+                self.send_header('Last-Modified', server.last_modified)
+                self.end_headers()
+                self.wfile.write(server.content)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/workbook.xlsx"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def publish(self, content, etag):
+        """Replaces the served workbook, as if it was edited in OneDrive."""
+        self.content = content
+        self.etag = etag
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def workbook_server(quickbooks_workbook):
+    server = WorkbookServer(quickbooks_workbook)
+    yield server
+    server.close()
@@ -22,13 +22,14 @@ st.experimental_set_query_params = _shim_set_query_params
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from financial_analyzer.microsoft_excel import ExcelHandler
 from financial_analyzer.analysis_modes import FinancialAnalyzer
 from financial_analyzer.forecast_engine import ForecastEngine
 from financial_analyzer.llm_insights import AIAnalyst
 from financial_analyzer.render_layouts import render_overview, render_sales, render_ar, render_ap, render_cash, render_profit, render_forecast, render_spending
 from financial_analyzer.ai_insights_tab import render_ai_insights
 from financial_analyzer.auth import check_password
+from financial_analyzer.data_refresh import WorkbookRefresher
+from financial_analyzer.dataset_store import get_dataset_store
 import os
 import time
 
@@ -866,9 +867,9 @@ st.markdown("""
 # Configuration
 DEFAULT_ONEDRIVE_LINK = "https://myworksocial-my.sharepoint.com/:x:/p/dannya/EbB6qC0KAuVMtZRaFub_DgsBgirK7ySgwixiWLUOB-kZQA"
 
-# Application State
-if 'data' not in st.session_state:
-    st.session_state.data = None
+# Application State: a handle on the shared, read-only dataset this session renders
+if 'dataset' not in st.session_state:
+    st.session_state['dataset'] = None
 
 # Cleanup old cache entries to prevent memory bloat
 if 'cache_size' not in st.session_state:
@@ -878,6 +879,30 @@ if 'cache_size' not in st.session_state:
 if 'sidebar_collapsed' not in st.session_state:
     st.session_state['sidebar_collapsed'] = False
 
+# Seconds a cold start (nothing downloaded or cached yet) waits for the first download
+COLD_START_WAIT_SECONDS = 20
+
+
+@st.cache_resource
+def get_workbook_refresher():
+    """One background refresher per server process, shared by every session."""
+    return WorkbookRefresher(DEFAULT_ONEDRIVE_LINK, token=os.getenv('ONEDRIVE_TOKEN', '')).start()
+
+
+def use_snapshot(snapshot):
+    """Points this session at `snapshot` if it is newer than what the session renders."""
+    current = st.session_state.get('dataset')
+    if snapshot is None or (current is not None and current.version == snapshot.version):
+        return
+    handle = get_dataset_store().acquire(snapshot.version)
+    if handle is None:
+        return
+    if current is not None:
+        current.release()  # lets the store drop the old version once no session uses it
+    st.session_state['dataset'] = handle
+    st.session_state['data_loaded_at'] = snapshot.loaded_at
+
+
 def collapse_sidebar():
     st.session_state['sidebar_collapsed'] = True
     st.experimental_rerun()
@@ -911,18 +936,15 @@ def main():
     if not check_password():
         st.stop()  # Stop execution if not authenticated
     
-    # Auto-load configured OneDrive Excel into session (preserve auth)
-    if not st.session_state.get('data'):
-        try:
-            st.session_state.data = ExcelHandler.load_data(
-                source="onedrive",
-                onedrive_config={'url': DEFAULT_ONEDRIVE_LINK, 'token': os.getenv('ONEDRIVE_TOKEN', '')}
-            )
-            if st.session_state.data:
-                st.session_state['data_loaded_at'] = time.time()
-        except Exception:
-            # If OneDrive load fails, continue and allow user to click Reload
-            pass
+    # Render from the latest shared snapshot; the background refresher keeps it current
+    refresher = get_workbook_refresher()
+    snapshot = refresher.snapshot
+    if snapshot is None and st.session_state.get('dataset') is None:
+        with st.spinner("Loading data from OneDrive..."):
+            snapshot = refresher.wait_for_snapshot(timeout=COLD_START_WAIT_SECONDS)
+        if snapshot is None and refresher.last_error is not None:
+            st.error(f"Error loading data from OneDrive: {refresher.last_error}")
+    use_snapshot(snapshot)
     
     # --- SIDEBAR ---
     with st.sidebar:
@@ -975,16 +997,16 @@ def main():
 
         if st.button("Reload Data from OneDrive"):
             with st.spinner("Reloading data from OneDrive..."):
-                try:
-                    st.session_state.data = ExcelHandler.load_data(
-                        source="onedrive",
-                        onedrive_config={'url': DEFAULT_ONEDRIVE_LINK, 'token': os.getenv('ONEDRIVE_TOKEN', '')}
-                    )
-                    if st.session_state.data:
-                        st.success("Data Loaded Successfully")
-                        st.session_state['data_loaded_at'] = time.time()
-                except Exception as e:
-                    st.error(f"Error loading data from OneDrive: {e}")
+                snapshot = refresher.refresh_now()
+                if refresher.last_error is not None:
+                    st.error(f"Error loading data from OneDrive: {refresher.last_error}")
+                elif snapshot is not None:
+                    use_snapshot(snapshot)
+                    st.success("Data Loaded Successfully")
+
+        if st.session_state.get('data_loaded_at'):
+            loaded_at = time.strftime('%H:%M', time.localtime(st.session_state['data_loaded_at']))
+            st.caption(f"Data version {st.session_state['dataset'].version} · loaded {loaded_at}")
 
         st.divider()
         st.caption("Enterprise Edition v1.1.0")
@@ -1016,11 +1038,12 @@ def main():
         """, unsafe_allow_html=True)
 
     # --- MAIN CONTENT ---
-    if not st.session_state.data:
+    dataset = st.session_state.get('dataset')
+    dfs = dataset.data if dataset is not None else None
+    if not dfs:
         st.info("👈 Please load data from the sidebar to begin analysis.")
         return
 
-    dfs = st.session_state.data
     ai = AIAnalyst(preferred_model=st.session_state.get('preferred_model'))
     ai_enabled = st.session_state.get('enable_ai', False)
     # Inform user if AI quota is exhausted so they understand why LLM may not run
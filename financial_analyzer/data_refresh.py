@@ -0,0 +1,121 @@
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from financial_analyzer.dataset_store import get_dataset_store
+from financial_analyzer.microsoft_excel import ExcelHandler
+from financial_analyzer.pnl_cube import PnLCube
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_SECONDS = 300
+
+# Immutable view of one loaded workbook. `version` increases every time different
+# workbook content is swapped in; `checked_at` is the last successful poll.
+WorkbookSnapshot = namedtuple('WorkbookSnapshot', ['version', 'data', 'digest', 'loaded_at', 'checked_at'])
+
+
+class WorkbookRefresher:
+    """
+    Keeps the latest parse of a OneDrive workbook available to every session.
+
+    A daemon thread polls the link every `interval` seconds (conditional requests, so an
+    unchanged file costs a 304) and parses off the request thread. New content is published
+    by swapping `snapshot` in a single assignment; readers always get a complete snapshot
+    and keep rendering the last good one while a refresh is in flight or failing.
+    Each version is registered in the shared DatasetStore, so `snapshot.data` is read-only.
+    """
+
+    def __init__(self, url, token='', interval=None, parse_mode=None, store=None):
+        self.url = url
+        self.token = token
+        if interval is None:
+            interval = float(os.getenv('ONEDRIVE_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS))
+        self.interval = interval
+        self.parse_mode = parse_mode
+        self.store = store or get_dataset_store()
+        self.snapshot = None
+        self.last_error = None
+
+        self._refresh_lock = threading.Lock()
+        self._attempted = threading.Event()  # set once the first poll finished, even if it failed
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._seed_from_cache()
+
+    def _seed_from_cache(self):
+        """Publishes the last downloaded workbook from the on-disk cache, if any."""
+        try:
+            cached = ExcelHandler._load_cached_download(self.url, self.parse_mode)
+        except Exception as e:
+            logger.warning(f"Could not read cached workbook for {self.url}: {e}")
+            return
+        if cached:
+            dfs, digest = cached
+            self._publish(dfs, digest)
+
+    def _publish(self, dfs, digest):
+        now = time.time()
+        current = self.snapshot
+        if current is not None and current.digest == digest:
+            self.snapshot = current._replace(checked_at=now)
+        else:
+            version = current.version + 1 if current else 1
+            dataset = self.store.publish(version, dfs)
+            try:
+                PnLCube.for_dataset(dataset)  # build the P&L cube before the first render needs it
+            except Exception as e:
+                logger.warning(f"Could not build P&L cube for v{version}: {e}")
+            self.snapshot = WorkbookSnapshot(version, dataset, digest, now, now)
+            logger.info(f"Published workbook snapshot v{version}")
+
+    def refresh_now(self):
+        """
+        Polls the link once and publishes the result. Returns the current snapshot;
+        on failure the previous snapshot is kept and the error is stored in `last_error`.
+        """
+        with self._refresh_lock:
+            try:
+                current = self.snapshot
+                # An unchanged workbook comes back as (None, digest): nothing is loaded or re-published
+                dfs, digest = ExcelHandler._fetch_workbook({'url': self.url, 'token': self.token}, self.parse_mode,
+                                                           known_digest=current.digest if current else None)
+                self._publish(dfs, digest)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                logger.warning(f"Workbook refresh failed: {e}")
+            finally:
+                self._attempted.set()
+        return self.snapshot
+
+    def wait_for_snapshot(self, timeout=None):
+        """
+        Blocks until a snapshot is available, the first poll has failed or `timeout`
+        elapses; returns the snapshot (None if there is none, see `last_error`).
+        """
+        if self.snapshot is None:
+            self._attempted.wait(timeout)
+        return self.snapshot
+
+    def start(self):
+        """Starts the background polling thread (no-op if already running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='workbook-refresher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh_now()
+            self._stop.wait(self.interval)
@@ -0,0 +1,129 @@
+import logging
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class ReadOnlyDataset(dict):
+    """
+    Sheet name -> DataFrame mapping shared by every session.
+
+    Still a dict (so `isinstance(dfs, dict)` and SchemaMatcher keep working) but refuses
+    to be modified; the frames' value arrays are marked read-only by `freeze_frame`.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Shared datasets are read-only; copy the frame before modifying it")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+
+def freeze_frame(df):
+    """
+    Marks every value array backing `df` as non-writeable, so in-place edits
+    (df.loc[...] = x, fillna(inplace=True), ...) raise instead of changing data
+    other sessions are rendering. Operations returning new frames are unaffected.
+    """
+    for arr in df._mgr.arrays:
+        arr = getattr(arr, '_ndarray', arr)  # datetime / categorical arrays wrap an ndarray
+        if isinstance(arr, np.ndarray):
+            arr.flags.writeable = False
+    return df
+
+
+class DatasetHandle:
+    """
+    A session's reference to one dataset version. The dataset stays registered while
+    any handle to it is alive; handles release themselves when garbage collected.
+    """
+
+    def __init__(self, store, version):
+        self.version = version
+        self._store = store
+        self._finalizer = weakref.finalize(self, store._release, version)
+
+    @property
+    def data(self):
+        return self._store.get(self.version)
+
+    def release(self):
+        self._finalizer()
+
+
+class DatasetStore:
+    """
+    Process-wide registry of parsed workbooks keyed by version.
+
+    Each version is stored once, with read-only frames, and reference counted by the
+    handles sessions hold. The newest version stays registered even without handles;
+    older versions are dropped as soon as their last handle is released.
+    """
+
+    def __init__(self):
+        self._datasets = {}
+        self._refcounts = {}
+        self.latest_version = None
+        self._lock = threading.Lock()
+
+    def publish(self, version, dfs):
+        """Registers `dfs` as `version` (the new latest) and returns the shared read-only dataset."""
+        with self._lock:
+            dataset = self._datasets.get(version)
+            if dataset is None:
+                dataset = ReadOnlyDataset(
+                    (name, freeze_frame(df) if isinstance(df, pd.DataFrame) else df) for name, df in dfs.items())
+                self._datasets[version] = dataset
+                self._refcounts.setdefault(version, 0)
+            previous, self.latest_version = self.latest_version, version
+            if previous is not None and previous != version and self._refcounts.get(previous, 0) == 0:
+                self._drop(previous)
+            return dataset
+
+    def acquire(self, version=None):
+        """Returns a handle on `version` (default: latest), or None if it is not registered."""
+        with self._lock:
+            if version is None:
+                version = self.latest_version
+            if version not in self._datasets:
+                return None
+            self._refcounts[version] += 1
+        return DatasetHandle(self, version)
+
+    def get(self, version):
+        return self._datasets.get(version)
+
+    def _release(self, version):
+        with self._lock:
+            if version not in self._refcounts:
+                return
+            self._refcounts[version] -= 1
+            if self._refcounts[version] <= 0 and version != self.latest_version:
+                self._drop(version)
+
+    def _drop(self, version):
+        self._datasets.pop(version, None)
+        self._refcounts.pop(version, None)
+        logger.info(f"Released dataset version {version}")
+
+    def stats(self):
+        """Returns {version: handle count} for every registered dataset."""
+        with self._lock:
+            return dict(self._refcounts)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_dataset_store():
+    """Returns the process-wide DatasetStore."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = DatasetStore()
+        return _default_store
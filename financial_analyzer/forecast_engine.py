@@ -1,13 +1,247 @@
+import warnings
+
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
+from collections import namedtuple
 from datetime import timedelta
 
+from financial_analyzer.forecast_store import get_forecast_store
+
+# Result of ForecastEngine.forecast_batch; one row per series. `slopes` are per day
+# (date ordinals, like forecast_series), `future_values` is series x months_ahead.
+BatchForecast = namedtuple('BatchForecast', ['slopes', 'intercepts', 'future_dates', 'future_values'])
+
+# Result of ForecastEngine.holt_winters_batch; `params` is series x (alpha, beta, gamma) of the
+# best grid point, `sse` its one-step-ahead squared error, `seasonal` (series,) whether a
+# seasonal component was fitted (needs two full seasons of history).
+HoltWintersForecast = namedtuple('HoltWintersForecast', ['params', 'sse', 'seasonal', 'future_dates', 'future_values'])
+
+
 class ForecastEngine:
     """
     Handles simple linear regression forecasting for financial metrics.
     """
-    
+
+    MIN_POINTS = 3
+
+    @staticmethod
+    def _add_months(last_date, months_ahead):
+        """last_date + DateOffset(months=i) for i = 1..months_ahead, as one DatetimeIndex."""
+        last_date = pd.Timestamp(last_date)
+        periods = pd.Period(last_date, freq='M') + np.arange(1, months_ahead + 1)
+        starts = pd.PeriodIndex(periods).to_timestamp()
+        # Same day of month, clipped to the month's length (as DateOffset does), same time of day
+        days = np.minimum(last_date.day, starts.days_in_month) - 1
+        return starts + pd.to_timedelta(days, unit='D') + (last_date - last_date.normalize())
+
+    @staticmethod
+    def _ordinals(dates):
+        """Proleptic Gregorian ordinals (date.toordinal()) of a DatetimeIndex, as floats."""
+        days = pd.DatetimeIndex(dates).values.astype('datetime64[D]').astype(np.int64)
+        return (days + pd.Timestamp('1970-01-01').toordinal()).astype(np.float64)
+
+    @staticmethod
+    def _fit_lines(x, y, mask=None):
+        """
+        Closed-form least squares of every row of y (series x points) against x.
+        Returns (slopes, intercepts, x_mean, y_mean); rows with fewer than MIN_POINTS
+        observed points get NaN.
+        """
+        y = np.asarray(y, dtype=np.float64)
+        x = np.broadcast_to(np.asarray(x, dtype=np.float64), y.shape)
+        if mask is None:
+            mask = np.isfinite(y)
+        n = mask.sum(axis=1)
+        safe_n = np.maximum(n, 1)
+        x_mean = np.where(mask, x, 0).sum(axis=1) / safe_n
+        y_mean = np.where(mask, y, 0).sum(axis=1) / safe_n
+        dx = np.where(mask, x - x_mean[:, None], 0)
+        dy = np.where(mask, y - y_mean[:, None], 0)
+        sxx = (dx * dx).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slopes = np.where(sxx > 0, (dx * dy).sum(axis=1) / sxx, 0.0)
+        enough = n >= ForecastEngine.MIN_POINTS
+        slopes = np.where(enough, slopes, np.nan)
+        intercepts = np.where(enough, y_mean - slopes * x_mean, np.nan)
+        return slopes, intercepts, x_mean, y_mean
+
+    @staticmethod
+    def forecast_batch(values, dates, months_ahead=3):
+        """
+        Fits a linear trend to every row of a series x months matrix at once and projects
+        each `months_ahead` months past the last date. NaN cells are ignored; series with
+        fewer than 3 observed months get NaN slopes and forecasts.
+
+        Args:
+            values: 2D array-like (series x months); a DataFrame's rows / columns are used as is
+            dates: the month of each column
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        dates = pd.DatetimeIndex(dates)
+        x = ForecastEngine._ordinals(dates)
+
+        slopes, intercepts, x_mean, y_mean = ForecastEngine._fit_lines(x, values)
+
+        future_dates = ForecastEngine._add_months(dates.max(), months_ahead)
+        future_x = ForecastEngine._ordinals(future_dates)
+        # Predict around the mean ordinal to keep precision with ~7e5-sized ordinals
+        future_values = y_mean[:, None] + slopes[:, None] * (future_x[None, :] - x_mean[:, None])
+        return BatchForecast(slopes, intercepts, future_dates, future_values)
+
+    @staticmethod
+    def forecast_frame(matrix, months_ahead=3):
+        """
+        forecast_batch over a DataFrame with one row per series and one column per month
+        (e.g. analyze_sales' product_monthly). Returns series x future months.
+        Fits go through the forecast store, so only products whose months changed are refitted.
+        """
+        res = ForecastEngine.fit_stored('linear', matrix.to_numpy(dtype=float), matrix.columns, months_ahead)
+        return pd.DataFrame(res.future_values, index=matrix.index, columns=res.future_dates)
+
+    # Smoothing parameter grid searched per series by holt_winters_batch
+    HW_ALPHAS = (0.1, 0.3, 0.5, 0.8)
+    HW_BETAS = (0.05, 0.2)
+    HW_GAMMAS = (0.05, 0.2, 0.5)
+
+    @staticmethod
+    def _holt_winters_run(y, alpha, beta, gamma, season_length, multiplicative):
+        """
+        Runs the Holt-Winters recursion for every series x parameter combination at once.
+
+        y: (series, months); alpha / beta / gamma: (grid,), gamma None for no seasonal
+        component; multiplicative: (series,) bool. Returns (level, trend, seasons, sse):
+        level / trend / sse are (series, grid), seasons (series, grid, season_length), all
+        the states after the last month. A series' states are NaN if it cannot be initialized.
+        """
+        n_series, n_months = y.shape
+        n_grid = len(alpha)
+        m = season_length if gamma is not None else 1
+        mult = multiplicative[:, None]
+        a, b = alpha[None, :], beta[None, :]
+        g = gamma[None, :] if gamma is not None else 0.0
+
+        observed = np.isfinite(y)
+        if gamma is not None:
+            # Trend from the means of the first two seasons; level at the end of the first season;
+            # seasonal indices from the first season with the trend taken out
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)  # a season without observations
+                first, second = np.nanmean(y[:, :m], axis=1), np.nanmean(y[:, m:2 * m], axis=1)
+            trend0 = (second - first) / m
+            level0 = first + trend0 * (m - 1) / 2
+            line = first[:, None] + trend0[:, None] * (np.arange(m)[None, :] - (m - 1) / 2)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                season0 = np.where(mult, y[:, :m] / line, y[:, :m] - line)
+            season0 = np.where(observed[:, :m], season0, np.where(mult, 1.0, 0.0))
+            start = np.full(n_series, m)
+        else:
+            # Level from the first observation, trend from the step to the next month (0 if missing)
+            start = np.argmax(observed, axis=1)
+            rows = np.arange(n_series)
+            level0 = y[rows, start]
+            step = y[rows, np.minimum(start + 1, n_months - 1)] - level0
+            trend0 = np.where(np.isfinite(step), step, 0.0)
+            season0 = np.where(mult, 1.0, 0.0)
+            start = start + 1
+
+        level = np.repeat(level0[:, None], n_grid, axis=1)
+        trend = np.repeat(trend0[:, None], n_grid, axis=1)
+        seasons = np.repeat(np.broadcast_to(season0, (n_series, m))[:, None, :], n_grid, axis=1).copy()
+        sse = np.zeros((n_series, n_grid))
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            for t in range(int(start.min()), n_months):
+                k = t % m
+                s = seasons[:, :, k]
+                base = level + trend
+                pred = np.where(mult, base * s, base + s)
+                active = (t >= start)[:, None]
+                hit = active & observed[:, t][:, None]
+                # A missing month carries the prediction forward
+                obs = np.where(hit, y[:, t][:, None], pred)
+                sse += np.where(hit, (obs - pred) ** 2, 0.0)
+
+                new_level = a * np.where(mult, obs / s, obs - s) + (1 - a) * base
+                new_trend = b * (new_level - level) + (1 - b) * trend
+                seasons[:, :, k] = np.where(active, g * np.where(mult, obs / new_level, obs - new_level) + (1 - g) * s, s)
+                level = np.where(active, new_level, level)
+                trend = np.where(active, new_trend, trend)
+        return level, trend, seasons, sse
+
+    @staticmethod
+    def holt_winters_batch(values, dates, months_ahead=3, seasonal='additive', season_length=12,
+                           alphas=None, betas=None, gammas=None):
+        """
+        Holt-Winters forecasts for every row of a series x months matrix.
+
+        Every (alpha, beta, gamma) combination of the grid is smoothed for every series in
+        the same vectorized recursion, and each series keeps the combination with the lowest
+        one-step-ahead squared error. `seasonal` is 'additive' or 'multiplicative'
+        (series with non-positive values fall back to additive). With fewer than two full
+        seasons of history, or no observation in one of the first two seasons, a series is
+        fitted without the seasonal component (Holt's linear trend).
+        Series with fewer than 3 observed months get NaN forecasts.
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        dates = pd.DatetimeIndex(dates)
+        n_series, n_months = values.shape
+        future_dates = ForecastEngine._add_months(dates.max(), months_ahead)
+
+        alphas = np.asarray(ForecastEngine.HW_ALPHAS if alphas is None else alphas, dtype=np.float64)
+        betas = np.asarray(ForecastEngine.HW_BETAS if betas is None else betas, dtype=np.float64)
+        gammas = np.asarray(ForecastEngine.HW_GAMMAS if gammas is None else gammas, dtype=np.float64)
+        grid = np.array([(a, b, g) for a in alphas for b in betas for g in gammas])
+
+        multiplicative = np.full(n_series, seasonal == 'multiplicative')
+        multiplicative &= ~(np.nan_to_num(values, nan=1.0) <= 0).any(axis=1)
+        rows = np.arange(n_series)
+        steps = np.arange(1, months_ahead + 1)
+
+        def fit(alpha, beta, gamma):
+            level, trend, seasons, sse = ForecastEngine._holt_winters_run(
+                values, alpha, beta, gamma, season_length, multiplicative)
+            best = np.argmin(np.where(np.isfinite(sse), sse, np.inf), axis=1)
+            base = level[rows, best][:, None] + steps[None, :] * trend[rows, best][:, None]
+            if gamma is None:
+                return best, sse[rows, best], base
+            s = seasons[rows, best][:, (n_months - 1 + steps) % season_length]
+            return best, sse[rows, best], np.where(multiplicative[:, None], base * s, base + s)
+
+        # Holt's linear trend for every series; the seasonal fit replaces it where it can be initialized
+        trend_grid = np.unique(grid[:, :2], axis=0)
+        best, sse, future_values = fit(trend_grid[:, 0], trend_grid[:, 1], None)
+        params = np.column_stack([trend_grid[best], np.zeros(n_series)])
+        is_seasonal = np.zeros(n_series, dtype=bool)
+        if n_months >= 2 * season_length:
+            s_best, s_sse, s_future = fit(grid[:, 0], grid[:, 1], grid[:, 2])
+            is_seasonal = np.isfinite(s_future).all(axis=1)
+            params = np.where(is_seasonal[:, None], grid[s_best], params)
+            sse = np.where(is_seasonal, s_sse, sse)
+            future_values = np.where(is_seasonal[:, None], s_future, future_values)
+
+        enough = np.isfinite(values).sum(axis=1) >= ForecastEngine.MIN_POINTS
+        return HoltWintersForecast(np.where(enough[:, None], params, np.nan), np.where(enough, sse, np.nan),
+                                   is_seasonal & enough, future_dates, np.where(enough[:, None], future_values, np.nan))
+
+    @staticmethod
+    def fit_stored(model, values, dates, months_ahead=3, **params):
+        """
+        forecast_batch ('linear') or holt_winters_batch ('holt_winters') through the forecast
+        store: series fitted before (same values, dates, horizon and parameters) are served
+        from it, only new or changed series are fitted.
+        """
+        if model == 'holt_winters':
+            fit = ForecastEngine.holt_winters_batch
+            # The grid decides the fit, so it is part of the key
+            params.setdefault('alphas', ForecastEngine.HW_ALPHAS)
+            params.setdefault('betas', ForecastEngine.HW_BETAS)
+            params.setdefault('gammas', ForecastEngine.HW_GAMMAS)
+        elif model == 'linear':
+            fit = ForecastEngine.forecast_batch
+        else:
+            raise ValueError(f"Unknown forecast model: {model}")
+        return get_forecast_store().fit_rows(model, fit, values, dates, months_ahead, params)
+
     @staticmethod
     def forecast_series(df, date_col='Month', value_col='Revenue', months_ahead=3):
         """
@@ -15,34 +249,14 @@ class ForecastEngine:
         """
         if df is None or len(df) < 3:
             return None # Not enough data
-            
+        
         # Prepare Data
         df = df.sort_values(date_col)
-        df['ordinal'] = df[date_col].map(pd.Timestamp.toordinal)
-        
-        X = df[['ordinal']].values
-        y = df[value_col].values
-        
-        # Fit Model
-        model = LinearRegression()
-        model.fit(X, y)
-        
-        # Future Dates
-        last_date = df[date_col].max()
-        future_dates = []
-        future_ordinals = []
-        
-        for i in range(1, months_ahead + 1):
-            next_date = last_date + pd.DateOffset(months=i)
-            future_dates.append(next_date)
-            future_ordinals.append([next_date.toordinal()])
-            
-        # Predict
-        future_preds = model.predict(future_ordinals)
+        res = ForecastEngine.fit_stored('linear', df[value_col].to_numpy(dtype=float)[None, :], df[date_col], months_ahead)
         
         future_df = pd.DataFrame({
-            date_col: future_dates,
-            value_col: future_preds,
+            date_col: res.future_dates,
+            value_col: res.future_values[0],
             'Type': 'Forecast'
         })
         
@@ -52,7 +266,7 @@ class ForecastEngine:
         
         combined = pd.concat([original_df, future_df], ignore_index=True)
         
-        return combined, model.coef_[0] # Return DF and Trend Slope
+        return combined, res.slopes[0] # Return DF and Trend Slope
 
     @staticmethod
     def run_cash_forecast(df_cash, months_ahead=3):
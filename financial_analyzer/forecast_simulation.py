@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.backtesting import backtest
+
+DEFAULT_PATHS = 10000
+DEFAULT_MAX_MB = 64
+HISTOGRAM_BINS = 4096
+
+
+def _band_columns(quantiles):
+    return [f"P{q:g}" for q in quantiles]
+
+
+def simulate_paths(point, residuals, n_paths, rng, cumulative=True):
+    """
+    Residual-bootstrap paths around a point forecast, drawn at once as an (n_paths, horizon)
+    array. With `cumulative` the drawn errors accumulate over the horizon (one-step forecast
+    errors compounding); otherwise each month gets one independent draw (deviations from a
+    fitted trend).
+    """
+    point = np.asarray(point, dtype=np.float64)
+    draws = rng.choice(np.asarray(residuals, dtype=np.float64), size=(n_paths, len(point)))
+    if cumulative:
+        np.cumsum(draws, axis=1, out=draws)
+    draws += point[None, :]
+    return draws
+
+
+def _histogram_quantiles(counts, quantiles):
+    """
+    Quantiles (0-100) of each row of `counts` (fixed-width bins over [0, 1]), as positions
+    in [0, 1] linearly interpolated within the bin the quantile falls in.
+    """
+    horizon, bins = counts.shape
+    rows = np.arange(horizon)
+    totals = counts.sum(axis=1)
+    cdf = np.cumsum(counts, axis=1) / totals[:, None]
+    out = np.empty((horizon, len(quantiles)))
+    for j, q in enumerate(np.asarray(quantiles, dtype=np.float64) / 100):
+        idx = np.minimum((cdf < q).sum(axis=1), bins - 1)
+        below = np.where(idx > 0, cdf[rows, np.maximum(idx - 1, 0)], 0.0)
+        in_bin = counts[rows, idx] / totals
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = np.where(in_bin > 0, (q - below) / in_bin, 0.0)
+        out[:, j] = (idx + np.clip(frac, 0, 1)) / bins
+    return out
+
+
+def prediction_bands(point, residuals, n_paths=DEFAULT_PATHS, quantiles=(10, 50, 90), seed=None,
+                     cumulative=True, chunk_paths=None):
+    """
+    P10 / P50 / P90 (or other `quantiles`) of residual-bootstrap paths per horizon.
+
+    All paths are simulated as one array unless that would exceed SIMULATION_MAX_MB (or
+    `chunk_paths` is given): then paths are drawn `chunk_paths` at a time and only a
+    fixed-bin histogram per horizon is kept, so memory stays bounded for 100k+ paths.
+    The histogram range is exact (extreme residuals at every step), and quantiles are
+    interpolated within a bin of (range / HISTOGRAM_BINS).
+    `seed` makes the draws reproducible. Returns a DataFrame indexed by horizon (1..n).
+    """
+    point = np.asarray(point, dtype=np.float64)
+    residuals = np.asarray(residuals, dtype=np.float64)
+    residuals = residuals[np.isfinite(residuals)]
+    horizon = len(point)
+    columns = _band_columns(quantiles)
+    index = pd.RangeIndex(1, horizon + 1, name='Horizon')
+    if len(residuals) == 0:
+        return pd.DataFrame(np.repeat(point[:, None], len(columns), axis=1), index=index, columns=columns)
+
+    rng = np.random.default_rng(seed)
+    if chunk_paths is None:
+        max_bytes = float(os.getenv('SIMULATION_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024
+        if n_paths * horizon * 8 > max_bytes:
+            chunk_paths = max(1, int(max_bytes // (horizon * 8)))
+
+    if chunk_paths is None or chunk_paths >= n_paths:
+        paths = simulate_paths(point, residuals, n_paths, rng, cumulative)
+        return pd.DataFrame(np.percentile(paths, quantiles, axis=0).T, index=index, columns=columns)
+
+    steps = np.arange(1, horizon + 1) if cumulative else np.ones(horizon)
+    low = point + steps * residuals.min()
+    high = point + steps * residuals.max()
+    span = np.where(high > low, high - low, 1.0)
+    counts = np.zeros((horizon, HISTOGRAM_BINS), dtype=np.int64)
+    offsets = np.arange(horizon)[None, :] * HISTOGRAM_BINS
+    for start in range(0, n_paths, chunk_paths):
+        paths = simulate_paths(point, residuals, min(chunk_paths, n_paths - start), rng, cumulative)
+        bins = np.clip(((paths - low) / span * HISTOGRAM_BINS).astype(np.int64), 0, HISTOGRAM_BINS - 1)
+        counts += np.bincount((bins + offsets).ravel(), minlength=horizon * HISTOGRAM_BINS).reshape(horizon, -1)
+    bands = low[:, None] + _histogram_quantiles(counts, quantiles) * (high - low)[:, None]
+    return pd.DataFrame(bands, index=index, columns=columns)
+
+
+def revenue_bands(history, forecast, method='growth', n_paths=DEFAULT_PATHS, seed=0, chunk_paths=None):
+    """
+    Bands around an analyze_forecast result: bootstraps the method's one-step-ahead errors
+    from a rolling-origin backtest of `history` and lets them compound over the forecast
+    months. Returns Month + P10 / P50 / P90, or None with fewer than 3 backtest errors.
+    """
+    trend_row = history.set_index('Month')[['Revenue']].T
+    errors = backtest(trend_row, models=[method], horizon=1, min_train=3, max_workers=1).errors
+    if len(errors) < 3:
+        return None
+    residuals = (errors['Actual'] - errors['Forecast']).to_numpy()
+    bands = prediction_bands(forecast['Revenue'].to_numpy(), residuals, n_paths, seed=seed, chunk_paths=chunk_paths)
+    bands.insert(0, 'Month', forecast['Month'].to_numpy())
+    return bands.reset_index(drop=True)
+
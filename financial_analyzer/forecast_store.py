@@ -0,0 +1,236 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_SIZE = 2048
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+
+class ForecastStore:
+    """
+    Fitted forecasts memoized per series: the key is a hash of one series' values and dates,
+    the model, the horizon and the model parameters, so an unchanged series is never refitted
+    and a refreshed workbook only refits the series whose numbers moved.
+
+    Entries live in an in-process LRU of `maxsize` series and expire after `ttl` seconds
+    (0 = never). With `store_dir` (FORECAST_STORE_DIR) every entry is also pickled to disk,
+    so fits survive a restart; the directory is pruned to the same size and age limits.
+    """
+
+    def __init__(self, maxsize=None, ttl=None, store_dir=None):
+        if maxsize is None:
+            maxsize = int(os.getenv('FORECAST_STORE_SIZE', DEFAULT_STORE_SIZE))
+        if ttl is None:
+            ttl = float(os.getenv('FORECAST_TTL_SECONDS', DEFAULT_TTL_SECONDS))
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.store_dir = (os.getenv('FORECAST_STORE_DIR') if store_dir is None else store_dir) or None
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def series_keys(model, values, dates, horizon, params=None):
+        """One key per row of a series x months matrix."""
+        prefix = hashlib.sha1()
+        prefix.update(f"{model}|{horizon}|{sorted((params or {}).items())!r}".encode('utf-8'))
+        prefix.update(np.asarray(pd.DatetimeIndex(dates), dtype='datetime64[ns]').tobytes())
+        keys = []
+        for row in np.ascontiguousarray(values, dtype=np.float64):
+            h = prefix.copy()
+            h.update(row.tobytes())
+            keys.append(h.hexdigest())
+        return keys
+
+    def _expired(self, stored_at, now):
+        return self.ttl > 0 and now - stored_at > self.ttl
+
+    def _path(self, key):
+        return os.path.join(self.store_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """Returns (True, value) on a hit, (False, None) on a miss or an expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                del self._entries[key]
+                self.expirations += 1
+
+        entry = self._read(key, now) if self.store_dir else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return True, entry[1]
+
+    def put(self, key, value):
+        self.put_many({key: value})
+
+    def put_many(self, values):
+        """Stores key -> value pairs (and writes them to the store directory, if any)."""
+        if self.maxsize <= 0 or not values:
+            return
+        now = time.time()
+        with self._lock:
+            for key, value in values.items():
+                self._remember(key, (now, value))
+        if self.store_dir:
+            for key, value in values.items():
+                self._write(key, (now, value))
+            self._prune_disk(now)
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _read(self, key, now):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable forecast store entry {key}: {e}")
+            self._remove(path)
+            return None
+        if self._expired(entry[0], now):
+            self._remove(path)
+            with self._lock:
+                self.expirations += 1
+            return None
+        try:
+            os.utime(path, (now, now))  # mark as recently used
+        except OSError:
+            pass
+        return entry
+
+    def _write(self, key, entry):
+        # Write next to the target and rename, so readers never see a half-written file
+        path = self._path(key)
+        staging = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            with open(staging, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(staging, path)
+            os.utime(path, (entry[0], entry[0]))
+        except Exception as e:
+            self._remove(staging)
+            logger.warning(f"Could not write forecast store entry {key}: {e}")
+
+    def _prune_disk(self, now):
+        """Drops expired files, then the least recently used beyond `maxsize`."""
+        try:
+            names = [n for n in os.listdir(self.store_dir) if n.endswith('.pkl')]
+        except OSError:
+            return
+        entries = []
+        for name in names:
+            path = os.path.join(self.store_dir, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if self._expired(mtime, now):
+                self._remove(path)
+            else:
+                entries.append((mtime, path))
+        for _, path in sorted(entries)[:max(0, len(entries) - self.maxsize)]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def fit_rows(self, model, fit, values, dates, horizon, params=None):
+        """
+        Runs `fit(values, dates, horizon, **params)` -- a batch forecaster returning a
+        namedtuple of per-series arrays plus a shared `future_dates` (BatchForecast,
+        HoltWintersForecast) -- only for the rows of `values` not in the store, and
+        returns the full result as if every row had been fitted.
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        params = params or {}
+        if len(values) == 0:
+            return fit(values, dates, horizon, **params)
+
+        keys = self.series_keys(model, values, dates, horizon, params)
+        rows = [None] * len(keys)
+        missing = []
+        for i, key in enumerate(keys):
+            hit, row = self.get(key)
+            if hit:
+                rows[i] = row
+            else:
+                missing.append(i)
+
+        if missing:
+            res = fit(values[missing], dates, horizon, **params)
+            fresh = {}
+            for j, i in enumerate(missing):
+                # One single-series result per row: `future_dates` as is, the j-th row of the rest
+                rows[i] = type(res)(**{field: value if field == 'future_dates' else np.copy(value[j])
+                                       for field, value in res._asdict().items()})
+                fresh[keys[i]] = rows[i]
+            self.put_many(fresh)
+
+        cls = type(rows[0])
+        return cls(**{field: rows[0].future_dates if field == 'future_dates' else np.stack([getattr(row, field) for row in rows])
+                      for field in cls._fields})
+
+    def clear(self, disk=True):
+        """Forgets every entry (and deletes the store directory's files with `disk`)."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = self.expirations = 0
+        if disk and self.store_dir and os.path.isdir(self.store_dir):
+            for name in os.listdir(self.store_dir):
+                if name.endswith('.pkl') or name.endswith('.tmp'):
+                    self._remove(os.path.join(self.store_dir, name))
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'maxsize': self.maxsize, 'ttl': self.ttl,
+                    'store_dir': self.store_dir, 'hits': self.hits, 'disk_hits': self.disk_hits,
+                    'misses': self.misses, 'evictions': self.evictions, 'expirations': self.expirations}
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_forecast_store():
+    """Returns the process-wide ForecastStore configured from the environment."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ForecastStore()
+        return _default_store
@@ -1,10 +1,161 @@
+import hashlib
 import pandas as pd
+import numpy as np
 import os
+import random
+import re
+import threading
+import time
+import logging
 import requests
+import openpyxl
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from io import BytesIO
+from itertools import chain, islice
+from tempfile import SpooledTemporaryFile
 import warnings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from financial_analyzer.schema_matcher import SchemaMatcher
+from financial_analyzer.workbook_cache import get_workbook_cache
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
+# Partial-month headers such as "Dec 1 - Dec 18 2025" or "December 1-18 2025": month name + year
+_MONTH_RANGE_PATTERN = re.compile(
+    r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|January|February|March|April|May|June|July|August|September|October|November|December)\s*\d*\s*-?\s*\w*\s*\d*\s*(\d{4})',
+    re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _parse_month_label(m_str):
+    """
+    Converts a MOM PL month column header to the first day of that month (NaT if unparseable).
+    Memoized: a report only has a dozen or so distinct headers.
+    """
+    # Try standard datetime parsing first
+    result = pd.to_datetime(m_str, errors='coerce')
+    if pd.notna(result):  # Only return if parsing succeeded
+        return result
+
+    # Handle "Dec 1 - Dec 18 2025" format - extract month and year
+    match = _MONTH_RANGE_PATTERN.search(m_str)
+    if match:
+        month_name = match.group(1)
+        year = match.group(2)
+        # Create date string with first day of month
+        date_str = f"{month_name} 1, {year}"
+        return pd.to_datetime(date_str, errors='coerce')
+
+    return pd.NaT
+
+# Single-pass amount cleanup: drop '$' , ')' and turn '(' into a minus sign
+_AMOUNT_CLEAN_TABLE = str.maketrans({'$': None, ',': None, ')': None, '(': '-'})
+
+# (sheet name, column count) -> (header row position, lower-cased header cells) from earlier loads;
+# LRU bounded by ExcelHandler.HEADER_CACHE_SIZE. Parses run on the background refresher and on
+# request threads, so every access holds the lock.
+_header_row_cache = OrderedDict()
+_header_row_lock = threading.Lock()
+
+# Workbook bytes shared with process-pool workers (set once per worker by the initializer)
+_worker_content = None
+
+
+def _init_parse_worker(content):
+    global _worker_content
+    _worker_content = content
+
+
+def _parse_sheet(content, sheet_name):
+    """Reads and header-detects a single sheet; returns (sheet name, frame or None, seconds)."""
+    start = time.perf_counter()
+    raw_df = pd.read_excel(BytesIO(content), sheet_name=sheet_name, header=None)
+    parsed_df = ExcelHandler._autodetect_table(raw_df, sheet_name)
+    return sheet_name, parsed_df, time.perf_counter() - start
+
+
+def _parse_sheet_worker(sheet_name):
+    """_parse_sheet inside a parse worker process, on the bytes its initializer received."""
+    return _parse_sheet(_worker_content, sheet_name)
+
+
+class _JitteredRetry(Retry):
+    """
+    Exponential backoff with full jitter, so concurrent reloads that hit the same
+    throttled link (429) or server error (5xx) do not all retry in lockstep.
+    A Retry-After header still takes precedence over the computed backoff.
+    """
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
+
+# Shared keep-alive session for workbook downloads (created on first use)
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def _get_http_session():
+    """Returns the process-wide pooled, retrying requests session used for downloads."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            retry = _JitteredRetry(
+                total=ExcelHandler.HTTP_RETRIES,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(['GET']),
+                raise_on_status=False,  # hand the last response to raise_for_status()
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = session
+        return _http_session
+
+
+class _NumericColumn:
+    """
+    Incrementally built amount column for the streaming reader.
+
+    Mirrors the default cleaning (strip '$' and ',', '(x)' -> '-x', unparseable -> 0) while
+    storing parsed floats in a compact array instead of a list of cell objects.
+    """
+
+    def __init__(self):
+        self.values = array('d')
+        self.all_int = True  # matches pd.to_numeric returning int64 for all-integer input
+
+    def append(self, v):
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            num = float(v)
+            if isinstance(v, float) and not num.is_integer():
+                self.all_int = False
+        else:
+            text = '' if v is None else str(v).translate(_AMOUNT_CLEAN_TABLE).strip()
+            try:
+                num = float(text)
+                if not text.lstrip('-').isdigit():
+                    self.all_int = False
+            except ValueError:
+                num = float('nan')
+        if num != num:  # NaN
+            self.all_int = False
+            num = 0.0
+        self.values.append(num)
+
+    def to_series(self):
+        arr = np.frombuffer(self.values, dtype=np.float64) if len(self.values) else np.empty(0)
+        return pd.Series(arr.astype(np.int64) if self.all_int and len(arr) else arr.copy())
+
 class ExcelHandler:
     """
     Handles loading financial data from either a local sample file or Microsoft OneDrive via Graph API.
@@ -12,8 +163,49 @@ class ExcelHandler:
     
     REQUIRED_SHEETS = ['GL', 'AR', 'AP', 'Cash', 'Sales_Monthly', 'Expenses_Monthly']
 
+    # Sheets the analysis modes read (SchemaMatcher aliases apply); streaming mode skips the rest
+    ANALYZED_SHEETS = ['MOM PL', 'Cash flow', 'GL', 'AR', 'AP', 'Cash', 'Sales_Monthly', 'Expenses_Monthly',
+                       'Other_Income_Monthly', 'Other_Expenses_Monthly']
+
+    PARSE_MODES = ('default', 'streaming', 'parallel')
+
+    # MOM PL section header (lower-cased) -> Type assigned to the rows below it
+    PNL_SECTION_TYPES = {
+        'income': 'Operating Income',
+        'cost of goods sold': 'COGS',
+        'expenses': 'Operating Expense',
+        'expense': 'Operating Expense',
+        'other income': 'Other Income',
+        'other expenses': 'Other Expense',
+        'other expense': 'Other Expense',
+    }
+    HEADER_SCAN_ROWS = 20
+    HEADER_CACHE_SIZE = 256
+    # Strategy: Look for specific keywords in the first 20 rows
+    # Prioritize rows that look like table headers (have multiple non-null values)
+    HEADER_KEYWORDS = ['Date', 'Account', 'Total', 'Current', 'Distribution account', 'Type', '1 - 30', 'Balance', 'Amount']
+    NUMERIC_COLUMN_HINTS = ['amount', 'balance', 'total', 'current', '1 - 30', '31 - 60', '61 - 90']
+
+    # Repeated label columns stored as pandas 'category'
+    CATEGORY_COLUMNS = ['product', 'type', 'customer', 'vendor']
+
+    # Workbook downloads: (connect, read) timeout in seconds, retries on 429/5xx, and the
+    # size above which the body is spooled to disk instead of kept in memory
+    HTTP_TIMEOUT = (5, 60)
+    HTTP_RETRIES = 3
+    DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+    DOWNLOAD_SPOOL_BYTES = 16 * 1024 * 1024
+
+    # Bump whenever _parse_excel output changes so cached parses are not reused
+    PARSER_VERSION = 2
+
+    # Seconds spent per sheet during the most recent parse (parallel mode + MOM PL segments)
+    last_parse_timings = {}
+    # Bytes (before, after) per sheet for the dtype compaction of the most recent parse
+    last_memory_savings = {}
+
     @staticmethod
-    def load_data(source="sample", file_path=None, onedrive_config=None):
+    def load_data(source="sample", file_path=None, onedrive_config=None, parse_mode=None):
         """
         Main entry point to load data.
         
@@ -21,6 +213,7 @@ class ExcelHandler:
             source (str): "sample" or "onedrive"
             file_path (str): Path to local file (used if source="sample" or "local")
             onedrive_config (dict): Config for OneDrive (url, token)
+            parse_mode (str): "default", "streaming" or "parallel"; falls back to EXCEL_PARSE_MODE
             
         Returns:
             dict: Dictionary of DataFrames for each sheet.
@@ -38,17 +231,17 @@ class ExcelHandler:
                 if not os.path.exists(file_path):
                      raise FileNotFoundError(f"File not found: {file_path}")
                      
-                return ExcelHandler._parse_excel(file_path)
+                return ExcelHandler._parse_cached(ExcelHandler._read_bytes(file_path), parse_mode)
                 
             elif source == "onedrive":
                 if not onedrive_config:
                     raise ValueError("OneDrive configuration missing")
-                return ExcelHandler._fetch_from_graph(onedrive_config)
+                return ExcelHandler._fetch_from_graph(onedrive_config, parse_mode)
             
             elif source == "upload":
                 if not file_path:
                     raise ValueError("No file uploaded")
-                return ExcelHandler._parse_excel(file_path)
+                return ExcelHandler._parse_cached(ExcelHandler._read_bytes(file_path), parse_mode)
 
             else:
                 raise ValueError(f"Unknown source: {source}")
@@ -59,192 +252,408 @@ class ExcelHandler:
             return None
 
     @staticmethod
-    def _parse_excel(file_content):
+    def _read_bytes(source):
+        """
+        Returns the raw workbook bytes from a path, bytes or file-like object (e.g. a Streamlit upload).
+        """
+        if isinstance(source, (bytes, bytearray)):
+            return bytes(source)
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                return f.read()
+        if hasattr(source, 'getvalue'):
+            return source.getvalue()
+        source.seek(0)
+        return source.read()
+
+    @staticmethod
+    def _parse_cached(content, parse_mode=None, digest=None):
+        """
+        Parses workbook bytes, reusing the on-disk parse of an identical workbook when available.
+        `content` may also be a seekable file whose content hash is passed as `digest`.
+        """
+        parse_mode = ExcelHandler._resolve_parse_mode(parse_mode)
+        cache = get_workbook_cache()
+        key = ExcelHandler._cache_key(digest or cache.digest(content), parse_mode)
+
+        dfs = cache.get(key)
+        if dfs is not None:
+            return dfs
+
+        if isinstance(content, (bytes, bytearray)):
+            content = BytesIO(content)
+        else:
+            content.seek(0)
+        dfs = ExcelHandler._parse_excel(content, parse_mode)
+        cache.put(key, dfs)
+        return dfs
+
+    @staticmethod
+    def _cache_key(digest, parse_mode):
+        """
+        Returns the workbook cache key for a content digest parsed with `parse_mode`.
+        """
+        return f"{digest}-v{ExcelHandler.PARSER_VERSION}-{parse_mode}"
+
+    @staticmethod
+    def _resolve_parse_mode(parse_mode):
+        """
+        Returns the parse mode to use: the explicit argument, else EXCEL_PARSE_MODE, else "default".
+        """
+        parse_mode = parse_mode or os.getenv('EXCEL_PARSE_MODE', 'default')
+        if parse_mode not in ExcelHandler.PARSE_MODES:
+            raise ValueError(f"Unknown parse mode: {parse_mode}")
+        return parse_mode
+
+    @staticmethod
+    def _parse_excel(file_content, parse_mode=None):
         """
         Reads excel content and intelligently parses QuickBooks-style reports.
+
+        parse_mode:
+            "default"   - pandas reads every sheet, then the header row is detected per sheet.
+            "streaming" - openpyxl read-only row iteration; only analyzed sheets are read and
+                          preamble rows are never materialized (for very large GL exports).
+            "parallel"  - sheets are read and header-detected concurrently in a process pool
+                          (EXCEL_PARSE_WORKERS caps the pool size).
         """
-        dfs = {}
+        parse_mode = ExcelHandler._resolve_parse_mode(parse_mode)
+        timings = {}
         try:
-            # Load all sheets, no header initially to find it dynamically
-            xls = pd.read_excel(file_content, sheet_name=None, header=None)
-            
-            for sheet, raw_df in xls.items():
-                parsed_df = ExcelHandler._autodetect_table(raw_df, sheet)
-                if parsed_df is not None:
-                    dfs[sheet] = parsed_df
-            
-            # Post-Processing for MOM PL -> Sales_Monthly
+            if parse_mode == 'streaming':
+                dfs = ExcelHandler._read_sheets_streaming(file_content)
+            elif parse_mode == 'parallel':
+                dfs = ExcelHandler._read_sheets_parallel(ExcelHandler._read_bytes(file_content), timings)
+            else:
+                dfs = {}
+                # Load all sheets, no header initially to find it dynamically
+                xls = pd.read_excel(file_content, sheet_name=None, header=None)
+
+                for sheet, raw_df in xls.items():
+                    parsed_df = ExcelHandler._autodetect_table(raw_df, sheet)
+                    if parsed_df is not None:
+                        dfs[sheet] = parsed_df
+
+            start = time.perf_counter()
+            ExcelHandler._build_pnl_segments(dfs)
             if 'MOM PL' in dfs:
-                # Transform MOM PL into Sales_Monthly format
-                # Expect cols: 'Distribution account', 'January 2025', ... 'Total'
-                mom_df = dfs['MOM PL']
-                
-                # Identify Month Columns (exclude 'Distribution account' and 'Total')
-                id_vars = [c for c in mom_df.columns if 'account' in str(c).lower() or 'source' in str(c).lower()]
-                if not id_vars: id_vars = [mom_df.columns[0]] # Default to first col
-                
-                # --- Categorization Logic ---
-                # Assign a 'Type' (Income, Expense, Other Income, Other Expense)
-                col_0 = id_vars[0]
-                mom_df['Type'] = 'Other'
-                current_main_type = 'Other' # Income, Expense
-                current_sub_type = 'Operating' # Operating, Other
-                
-                for idx, row in mom_df.iterrows():
-                    val = str(row[col_0]).strip().lower()
-                    
-                    # Section Headers detection
-                    if val == 'income':
-                        current_main_type = 'Income'
-                        current_sub_type = 'Operating'
-                    elif val == 'cost of goods sold':
-                        current_main_type = 'COGS'
-                        current_sub_type = 'Operating'
-                    elif val == 'expenses' or val == 'expense':
-                        current_main_type = 'Expense'
-                        current_sub_type = 'Operating'
-                    elif val == 'other income':
-                        current_main_type = 'Income'
-                        current_sub_type = 'Other'
-                    elif val == 'other expenses' or val == 'other expense':
-                        current_main_type = 'Expense'
-                        current_sub_type = 'Other'
-                    
-                    # Composite Type
-                    if current_main_type == 'COGS':
-                        mom_df.at[idx, 'Type'] = 'COGS'
-                    else:
-                        mom_df.at[idx, 'Type'] = f"{current_sub_type} {current_main_type}"
-                
-                # Add Type to id_vars so it persists after melt
-                id_vars.append('Type')
-                
-                val_vars = [c for c in mom_df.columns if c not in id_vars and 'total' not in str(c).lower()]
-                
-                unpivoted = mom_df.melt(id_vars=id_vars, value_vars=val_vars, var_name='Month', value_name='Amount')
-                
-                # Clean up formatting
-                acct_col = id_vars[0]
-                unpivoted = unpivoted[~unpivoted[acct_col].astype(str).str.contains('Total', na=False)]
-                unpivoted = unpivoted[~unpivoted[acct_col].astype(str).str.contains('Net ', na=False)]
-                unpivoted = unpivoted[~unpivoted[acct_col].isin(['Income', 'Expenses', 'Cost of Goods Sold', 'Gross Profit', 'Other Income', 'Other Expenses'])]
-                
-                # Convert Month to Date - Handle various formats including "Dec 1 - Dec 18 2025"
-                def parse_month(m):
-                    m_str = str(m).strip()
-                    
-                    # Try standard datetime parsing first
-                    result = pd.to_datetime(m_str, errors='coerce')
-                    if pd.notna(result):  # Only return if parsing succeeded
-                        return result
-                    
-                    # Handle "Dec 1 - Dec 18 2025" format - extract month and year
-                    import re
-                    # Match patterns like "Dec 1 - Dec 18 2025" or "December 1-18 2025"
-                    match = re.search(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|January|February|March|April|May|June|July|August|September|October|November|December)\s*\d*\s*-?\s*\w*\s*\d*\s*(\d{4})', m_str, re.IGNORECASE)
-                    if match:
-                        month_name = match.group(1)
-                        year = match.group(2)
-                        # Create date string with first day of month
-                        date_str = f"{month_name} 1, {year}"
-                        return pd.to_datetime(date_str, errors='coerce')
-                    
-                    return pd.NaT
-                
-                unpivoted['Month'] = unpivoted['Month'].apply(parse_month)
-                unpivoted = unpivoted.dropna(subset=['Month', 'Amount'])
-                
-                # Map to standard names
-                unpivoted.rename(columns={acct_col: 'Product', 'Amount': 'Revenue'}, inplace=True)
-                
-                # Segregate into 4 buckets
-                dfs['Sales_Monthly'] = unpivoted[unpivoted['Type'] == 'Operating Income'].copy()
-                dfs['Expenses_Monthly'] = unpivoted[unpivoted['Type'] == 'Operating Expense'].copy()
-                dfs['Other_Income_Monthly'] = unpivoted[unpivoted['Type'] == 'Other Income'].copy()
-                dfs['Other_Expenses_Monthly'] = unpivoted[unpivoted['Type'] == 'Other Expense'].copy()
-                
-                print("Generated P&L Segments: Sales (Op Income), Expenses (Op Exp), Other Income, Other Expenses")
+                timings['MOM PL (segments)'] = time.perf_counter() - start
+
+            savings = {sheet: ExcelHandler._compact_frame(df) for sheet, df in dfs.items()}
+            ExcelHandler.last_memory_savings = savings
+            for sheet, (before, after) in savings.items():
+                logger.info(f"Compacted {sheet!r}: {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB")
 
+            ExcelHandler.last_parse_timings = timings
+            for sheet, elapsed in sorted(timings.items(), key=lambda kv: kv[1], reverse=True):
+                logger.info(f"Parsed {sheet!r} in {elapsed:.3f}s")
             return dfs
             
         except Exception as e:
             raise RuntimeError(f"Failed to parse Excel file: {str(e)}")
 
     @staticmethod
-    def _autodetect_table(df, sheet_name):
+    def _read_sheets_parallel(content, timings):
         """
-        Finds the header row and returns the cleaned dataframe.
+        Parses each sheet in its own worker process and merges the results in workbook order.
+        Per-sheet wall time (read + header detection) is recorded into `timings`.
+
+        Every worker receives its own pickled copy of the workbook bytes, so the pool costs
+        roughly (workers x file size) extra memory and start-up time; it only pays off for
+        large workbooks with several big sheets. If worker processes cannot be started or
+        one dies, the sheets are parsed one after another in this process instead.
         """
-        # Strategy: Look for specific keywords in the first 20 rows
-        # Prioritize rows that look like table headers (have multiple non-null values)
-        keywords = ['Date', 'Account', 'Total', 'Current', 'Distribution account', 'Type', '1 - 30', 'Balance', 'Amount']
-        
-        header_idx = -1
-        max_score = 0
-        
-        for i, row in df.head(20).iterrows():
-            row_str = row.astype(str).str.lower().tolist()
-            # Score based on how many keywords match
-            score = sum(1 for k in keywords if any(k.lower() in s for s in row_str))
+        wb = openpyxl.load_workbook(BytesIO(content), read_only=True)
+        sheet_names = wb.sheetnames
+        wb.close()
+
+        max_workers = int(os.getenv('EXCEL_PARSE_WORKERS', 0)) or min(len(sheet_names), os.cpu_count() or 1)
+        try:
+            with ProcessPoolExecutor(max_workers=max(1, max_workers), initializer=_init_parse_worker,
+                                     initargs=(content,)) as pool:
+                results = list(pool.map(_parse_sheet_worker, sheet_names))
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Parse worker pool failed ({e}); parsing sheets serially")
+            results = [_parse_sheet(content, sheet) for sheet in sheet_names]
+
+        dfs = {}
+        for sheet, parsed_df, elapsed in results:
+            timings[sheet] = elapsed
+            if parsed_df is not None:
+                dfs[sheet] = parsed_df
+        return dfs
+
+    @staticmethod
+    def _classify_pnl_sections(labels):
+        """
+        Tags every P&L row with the section it belongs to.
+
+        Section header rows (Income, Cost of Goods Sold, Expenses, Other Income, Other Expenses)
+        are found with one vectorized lookup and their label is forward-filled down to the next
+        header; rows before the first header are 'Operating Other'.
+        """
+        keys = labels.astype(str).str.strip().str.lower()
+        sections = keys.map(ExcelHandler.PNL_SECTION_TYPES)
+        return sections.ffill().fillna('Operating Other')
+
+    @staticmethod
+    def _build_pnl_segments(dfs):
+        """
+        Unpivots the 'MOM PL' sheet (if present) into the Sales/Expenses/Other monthly segments.
+        """
+        # Post-Processing for MOM PL -> Sales_Monthly
+        if 'MOM PL' in dfs:
+            # Transform MOM PL into Sales_Monthly format
+            # Expect cols: 'Distribution account', 'January 2025', ... 'Total'
+            mom_df = dfs['MOM PL']
+            
+            # Identify Month Columns (exclude 'Distribution account' and 'Total')
+            id_vars = [c for c in mom_df.columns if 'account' in str(c).lower() or 'source' in str(c).lower()]
+            if not id_vars: id_vars = [mom_df.columns[0]] # Default to first col
             
-            # Special check for Aging headers
-            if 'current' in row_str and 'total' in row_str:
-                score += 5
+            # --- Categorization Logic ---
+            # Assign a 'Type' (Income, Expense, Other Income, Other Expense)
+            col_0 = id_vars[0]
+            mom_df['Type'] = ExcelHandler._classify_pnl_sections(mom_df[col_0])
             
-            if score > max_score and score > 0:
-                max_score = score
-                header_idx = i
+            # Add Type to id_vars so it persists after melt
+            id_vars.append('Type')
+            
+            val_vars = [c for c in mom_df.columns if c not in id_vars and 'total' not in str(c).lower()]
+            month_dates = {c: _parse_month_label(str(c).strip()) for c in val_vars}
+            
+            unpivoted = mom_df.melt(id_vars=id_vars, value_vars=val_vars, var_name='Month', value_name='Amount')
+            
+            # Clean up formatting
+            acct_col = id_vars[0]
+            unpivoted = unpivoted[~unpivoted[acct_col].astype(str).str.contains('Total', na=False)]
+            unpivoted = unpivoted[~unpivoted[acct_col].astype(str).str.contains('Net ', na=False)]
+            unpivoted = unpivoted[~unpivoted[acct_col].isin(['Income', 'Expenses', 'Cost of Goods Sold', 'Gross Profit', 'Other Income', 'Other Expenses'])]
+            
+            # Convert Month to Date - parsed once per distinct column header, then mapped onto the rows
+            unpivoted['Month'] = unpivoted['Month'].map(month_dates)
+            unpivoted = unpivoted.dropna(subset=['Month', 'Amount'])
+            
+            # Map to standard names
+            unpivoted.rename(columns={acct_col: 'Product', 'Amount': 'Revenue'}, inplace=True)
+            
+            # Segregate into 4 buckets
+            dfs['Sales_Monthly'] = unpivoted[unpivoted['Type'] == 'Operating Income'].copy()
+            dfs['Expenses_Monthly'] = unpivoted[unpivoted['Type'] == 'Operating Expense'].copy()
+            dfs['Other_Income_Monthly'] = unpivoted[unpivoted['Type'] == 'Other Income'].copy()
+            dfs['Other_Expenses_Monthly'] = unpivoted[unpivoted['Type'] == 'Other Expense'].copy()
+            
+            print("Generated P&L Segments: Sales (Op Income), Expenses (Op Exp), Other Income, Other Expenses")
+
+    @staticmethod
+    def _autodetect_table(df, sheet_name):
+        """
+        Finds the header row and returns the cleaned dataframe.
+        """
+        header_idx = ExcelHandler._detect_header_row(df.head(ExcelHandler.HEADER_SCAN_ROWS), sheet_name)
         
         if header_idx != -1:
             # set header
             df.columns = df.iloc[header_idx]
             df = df.iloc[header_idx+1:].reset_index(drop=True)
-            
-            # Clean columns: handle 'nan' columns
-            new_cols = []
-            for c in df.columns:
-                c_str = str(c).strip().replace('\n', ' ')
-                if c_str.lower() == 'nan': c_str = f"Unnamed_{len(new_cols)}"
-                new_cols.append(c_str)
-            df.columns = new_cols
+            df.columns = ExcelHandler._clean_header(df.columns)
             
             # Remove purely empty rows or rows that are just separators
             df.dropna(how='all', inplace=True)
             
-            # Type conversion
-            for col in df.columns:
-                 col_lower = str(col).lower()
-                 # Check if date-like
-                 if 'date' in col_lower or 'month' in col_lower:
-                     try:
-                        df[col] = pd.to_datetime(df[col])
-                     except:
-                        pass
-                 # Check if numeric
-                 elif any(x in col_lower for x in ['amount', 'balance', 'total', 'current', '1 - 30', '31 - 60', '61 - 90']):
-                     # Remove currency symbols and parens
-                     try:
-                        clean_series = df[col].astype(str).str.replace('$', '', regex=False).str.replace(',', '', regex=False).str.replace(')', '', regex=False).str.replace('(', '-', regex=False)
-                        df[col] = pd.to_numeric(clean_series, errors='coerce').fillna(0)
-                     except:
-                        pass
-            
+            ExcelHandler._coerce_types(df)
             return df
         
         return None # Could not detect structure
 
     @staticmethod
-    def _fetch_from_graph(config):
+    def _detect_header_row(head, sheet_name=None):
+        """
+        Returns the index of the most header-like row in `head`, or -1 if none qualifies.
+
+        All candidate rows are scored at once. The result is remembered per
+        (sheet name, column count) together with the header cells, so a repeat load of the
+        same report layout only re-checks that one row instead of scoring again.
+        """
+        if head.empty:
+            return -1
+        cells = np.char.lower(head.astype(str).to_numpy(dtype=str))
+
+        memo_key = (sheet_name, cells.shape[1])
+        with _header_row_lock:
+            cached = _header_row_cache.get(memo_key)
+        if cached is not None:
+            pos, header_cells = cached
+            if pos < len(cells) and tuple(cells[pos]) == header_cells:
+                with _header_row_lock:
+                    if memo_key in _header_row_cache:
+                        _header_row_cache.move_to_end(memo_key)
+                return head.index[pos]
+
+        # Score based on how many keywords match anywhere in the row
+        scores = np.zeros(len(cells), dtype=int)
+        for k in ExcelHandler.HEADER_KEYWORDS:
+            scores += (np.char.find(cells, k.lower()) >= 0).any(axis=1)
+        # Special check for Aging headers
+        scores += 5 * ((cells == 'current').any(axis=1) & (cells == 'total').any(axis=1))
+
+        pos = int(np.argmax(scores))  # first row wins ties
+        if scores[pos] <= 0:
+            return -1
+
+        with _header_row_lock:
+            _header_row_cache[memo_key] = (pos, tuple(cells[pos]))
+            _header_row_cache.move_to_end(memo_key)
+            while len(_header_row_cache) > ExcelHandler.HEADER_CACHE_SIZE:
+                _header_row_cache.popitem(last=False)
+        return head.index[pos]
+
+    @staticmethod
+    def _clean_header(columns):
+        """
+        Normalizes raw header cells into column names; empty cells become 'Unnamed_<n>'.
+        """
+        new_cols = []
+        for c in columns:
+            c_str = str(c).strip().replace('\n', ' ')
+            if c_str.lower() == 'nan': c_str = f"Unnamed_{len(new_cols)}"
+            new_cols.append(c_str)
+        return new_cols
+
+    @staticmethod
+    def _is_date_column(col):
+        col_lower = str(col).lower()
+        return 'date' in col_lower or 'month' in col_lower
+
+    @staticmethod
+    def _is_numeric_column(col):
+        col_lower = str(col).lower()
+        return not ExcelHandler._is_date_column(col) and any(x in col_lower for x in ExcelHandler.NUMERIC_COLUMN_HINTS)
+
+    @staticmethod
+    def _coerce_types(df):
+        """
+        Converts date-like and amount-like columns in place.
+        """
+        for col in df.columns:
+             # Check if date-like
+             if ExcelHandler._is_date_column(col):
+                 try:
+                    df[col] = pd.to_datetime(df[col])
+                 except:
+                    pass
+             # Check if numeric
+             elif ExcelHandler._is_numeric_column(col):
+                 # Already numeric (e.g. built by the streaming reader): only fill gaps
+                 if pd.api.types.is_numeric_dtype(df[col]):
+                     df[col] = df[col].fillna(0)
+                     continue
+                 # Remove currency symbols and parens
+                 try:
+                    clean_series = df[col].astype(str).str.translate(_AMOUNT_CLEAN_TABLE)
+                    df[col] = pd.to_numeric(clean_series, errors='coerce').fillna(0)
+                 except:
+                    pass
+
+    @staticmethod
+    def _compact_frame(df):
+        """
+        Shrinks a parsed frame in place and returns its (before, after) memory in bytes.
+
+        - object columns holding only numbers become float64/int64
+        - integer-valued amounts become int32 when even the column total fits in int32
+          (so sums and groupby totals cannot overflow); fractional amounts stay float64
+        - repeated Product/Type/Customer/Vendor labels become 'category'
+        """
+        before = int(df.memory_usage(deep=True).sum())
+        int32_max = np.iinfo(np.int32).max
+
+        for i, col in enumerate(df.columns):
+            series = df.iloc[:, i]
+
+            if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in ('integer', 'floating', 'mixed-integer-float'):
+                series = pd.to_numeric(series)
+
+            if pd.api.types.is_float_dtype(series) or pd.api.types.is_integer_dtype(series):
+                values = series.to_numpy()
+                if len(values) and np.isfinite(values).all() and (values == np.round(values)).all() \
+                        and np.abs(values).max() * len(values) <= int32_max:
+                    series = series.astype(np.int32)
+            elif series.dtype == object and str(col).lower() in ExcelHandler.CATEGORY_COLUMNS \
+                    and series.nunique() <= len(series) // 2:
+                series = series.astype('category')
+
+            if series is not df.iloc[:, i] and series.dtype != df.dtypes.iloc[i]:
+                df.isetitem(i, series)
+
+        return before, int(df.memory_usage(deep=True).sum())
+
+    @staticmethod
+    def _is_analyzed_sheet(sheet_name):
+        """
+        True if any analysis mode can pick this sheet up (directly or via SchemaMatcher aliases).
+        """
+        probe = {sheet_name: sheet_name}
+        return any(SchemaMatcher.get_sheet(probe, target) is not None for target in ExcelHandler.ANALYZED_SHEETS)
+
+    @staticmethod
+    def _read_sheets_streaming(file_content):
+        """
+        Parses the workbook with openpyxl read-only row iteration.
+
+        Sheets no analysis mode reads are skipped without loading them, the header row is
+        detected from the first HEADER_SCAN_ROWS rows only, and amount columns are converted
+        to floats row by row instead of holding the whole sheet as object cells.
+        """
+        wb = openpyxl.load_workbook(file_content, read_only=True, data_only=True)
+        dfs = {}
+        try:
+            for ws in wb.worksheets:
+                if not ExcelHandler._is_analyzed_sheet(ws.title):
+                    continue
+
+                rows = ws.iter_rows(values_only=True)
+                head = [list(r) for r in islice(rows, ExcelHandler.HEADER_SCAN_ROWS)]
+                if not head:
+                    continue
+                width = max(len(r) for r in head)
+                header_idx = ExcelHandler._detect_header_row(pd.DataFrame(head, columns=range(width)), ws.title)
+                if header_idx == -1:
+                    continue
+
+                header = head[header_idx] + [None] * (width - len(head[header_idx]))
+                columns = ExcelHandler._clean_header([np.nan if c is None else c for c in header])
+                builders = [_NumericColumn() if ExcelHandler._is_numeric_column(c) else [] for c in columns]
+
+                for row in chain(head[header_idx + 1:], rows):
+                    if all(v is None for v in row):
+                        continue
+                    for i, builder in enumerate(builders):
+                        v = row[i] if i < len(row) else None
+                        builder.append(np.nan if v is None and isinstance(builder, list) else v)
+
+                df = pd.DataFrame({i: (b.to_series() if isinstance(b, _NumericColumn) else pd.Series(b, dtype=object))
+                                   for i, b in enumerate(builders)})
+                df.columns = columns
+                ExcelHandler._coerce_types(df)
+                dfs[ws.title] = df
+        finally:
+            wb.close()
+        return dfs
+
+    @staticmethod
+    def _fetch_from_graph(config, parse_mode=None):
         """
         Fetches file bytes from URL (OneDrive/SharePoint or graph).
         Auto-converts share links to download links.
         """
-        url = config.get('url')
-        token = config.get('token')
-        
-        if not url:
-             raise ValueError("OneDrive URL missing")
-        
+        return ExcelHandler._fetch_workbook(config, parse_mode)[0]
+
+    @staticmethod
+    def _download_url(url):
+        """
+        Turns a SharePoint/OneDrive share link into a direct download link.
+        """
         # TRANSFORMATION: Handle standard SharePoint/OneDrive share links
         # If it's a view link (contains sharepoint.com or onedrive.live.com/...)
         if "sharepoint.com" in url or "onedrive.live.com" in url:
@@ -252,21 +661,97 @@ class ExcelHandler:
                 separator = "&" if "?" in url else "?"
                 url = f"{url}{separator}download=1"
                 print(f"Transformed to download link: {url}")
+        return url
+
+    @staticmethod
+    def _load_cached_download(url, parse_mode=None):
+        """
+        Returns (dfs, digest) for the last workbook downloaded from `url` if its parse is
+        still in the workbook cache, else None. Never touches the network.
+        """
+        cache = get_workbook_cache()
+        validators = cache.get_validators(ExcelHandler._download_url(url))
+        if not validators:
+            return None
+        dfs = cache.get(ExcelHandler._cache_key(validators['digest'], ExcelHandler._resolve_parse_mode(parse_mode)))
+        return (dfs, validators['digest']) if dfs is not None else None
+
+    @staticmethod
+    def _fetch_workbook(config, parse_mode=None, known_digest=None):
+        """
+        Downloads and parses the workbook at config['url'].
+        Returns (dfs, digest), where digest identifies the workbook content.
+        `known_digest` is the digest the caller already holds a parse of: when the server
+        answers 304 for exactly that workbook, (None, digest) is returned without loading it.
+        """
+        url = config.get('url')
+        token = config.get('token')
+        
+        if not url:
+             raise ValueError("OneDrive URL missing")
+
+        url = ExcelHandler._download_url(url)
 
         headers = {}
         if token and token != "MOCK_TOKEN": # Only add if real token
             headers['Authorization'] = f'Bearer {token}'
-        
+
+        parse_mode = ExcelHandler._resolve_parse_mode(parse_mode)
+        cache = get_workbook_cache()
+
+        # Conditional request: only worth sending if the parse it points to is still cached
+        validators = cache.get_validators(url)
+        cached_key = None
+        held = bool(validators) and validators['digest'] == known_digest
+        if validators and cache.contains(ExcelHandler._cache_key(validators['digest'], parse_mode)):
+            cached_key = ExcelHandler._cache_key(validators['digest'], parse_mode)
+        if cached_key or held:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        session = _get_http_session()
         try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status() # Raise error for 4xx/5xx
-            
-            # Check if we got HTML (which means download failed or auth page)
-            content_type = response.headers.get('Content-Type', '')
-            if 'text/html' in content_type:
-                raise ValueError("Link returned HTML page instead of Excel file. Ensure the link is public or direct download.")
-                
-            return ExcelHandler._parse_excel(BytesIO(response.content))
+            response = session.get(url, headers=headers, timeout=ExcelHandler.HTTP_TIMEOUT, stream=True)
+
+            if response.status_code == 304 and held:
+                response.close()
+                logger.info("Workbook not modified")
+                return None, validators['digest']
+
+            if response.status_code == 304 and cached_key:
+                response.close()
+                dfs = cache.get(cached_key)
+                if dfs is not None:
+                    logger.info("Workbook not modified; using cached parse")
+                    return dfs, validators['digest']
+                # Entry vanished between the check and the read: fetch the full file
+                headers.pop('If-None-Match', None)
+                headers.pop('If-Modified-Since', None)
+                response = session.get(url, headers=headers, timeout=ExcelHandler.HTTP_TIMEOUT, stream=True)
+
+            with response:
+                response.raise_for_status() # Raise error for 4xx/5xx
+
+                # Check if we got HTML (which means download failed or auth page)
+                content_type = response.headers.get('Content-Type', '')
+                if 'text/html' in content_type:
+                    raise ValueError("Link returned HTML page instead of Excel file. Ensure the link is public or direct download.")
+
+                # Stream the body to memory, rolling over to a temp file for large workbooks,
+                # and hash it on the way so the cache lookup needs no second pass
+                with SpooledTemporaryFile(max_size=ExcelHandler.DOWNLOAD_SPOOL_BYTES) as spool:
+                    hasher = hashlib.sha256()
+                    for chunk in response.iter_content(chunk_size=ExcelHandler.DOWNLOAD_CHUNK_BYTES):
+                        hasher.update(chunk)
+                        spool.write(chunk)
+                    digest = hasher.hexdigest()
+
+                    dfs = ExcelHandler._parse_cached(spool, parse_mode, digest=digest)
+
+            cache.put_validators(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), digest)
+            return dfs, digest
             
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Network Error: {str(e)}")
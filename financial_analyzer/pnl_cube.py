@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.analysis_cache import cached_analysis
+from financial_analyzer.schema_matcher import SchemaMatcher
+
+
+class PnLCube:
+    """
+    Month x Account x Type fact cube over the four unpivoted P&L segments.
+
+    Built with a single groupby when a dataset is first analyzed; the P&L analyses then
+    slice and reduce its dense arrays instead of each re-running concat/groupby/pivot_table.
+
+    Attributes:
+        rows:    DataFrame (Segment, Type, Product), one row per account, in first-appearance order
+        months:  sorted DatetimeIndex of every month present in any segment
+        values:  float64 array (rows x months), summed Revenue, 0 where there is no fact
+        present: bool array (rows x months), True where the account has a fact for the month
+        undated: float64 array (rows), Revenue of facts without a parseable month
+        has_type: whether any segment carries a 'Type' column
+    """
+
+    SEGMENTS = ['Sales_Monthly', 'Expenses_Monthly', 'Other_Income_Monthly', 'Other_Expenses_Monthly']
+
+    def __init__(self, rows, months, values, present, undated, has_type):
+        self.rows = rows
+        self.months = months
+        self.values = values
+        self.present = present
+        self.undated = undated
+        self.has_type = has_type
+
+    @staticmethod
+    @cached_analysis
+    def for_dataset(dfs):
+        """Returns the cube for a dataset, building it once per dataset content."""
+        return PnLCube.build(dfs)
+
+    @staticmethod
+    def build(dfs):
+        frames = []
+        has_type = False
+        for segment in PnLCube.SEGMENTS:
+            df = SchemaMatcher.get_sheet(dfs, segment)
+            if df is None or df.empty:
+                continue
+            prod_col = SchemaMatcher.get_column(df, 'Product') or 'Product'
+            rev_col = SchemaMatcher.get_column(df, 'Revenue') or 'Amount'
+            month_col = SchemaMatcher.get_column(df, 'Month') or 'Date'
+            if prod_col not in df.columns or rev_col not in df.columns:
+                continue
+            has_type = has_type or 'Type' in df.columns
+            frames.append(pd.DataFrame({
+                'Segment': segment,
+                'Type': df['Type'].astype(object) if 'Type' in df.columns else np.nan,
+                'Product': df[prod_col].astype(object),
+                'Month': pd.to_datetime(df[month_col]) if month_col in df.columns else pd.NaT,
+                'Revenue': pd.to_numeric(df[rev_col], errors='coerce'),
+            }))
+
+        if not frames:
+            return PnLCube(pd.DataFrame(columns=['Segment', 'Type', 'Product']), pd.DatetimeIndex([], name='Month'),
+                           np.zeros((0, 0)), np.zeros((0, 0), dtype=bool), np.zeros(0), has_type)
+
+        facts = pd.concat(frames, ignore_index=True)
+        cells = facts.groupby(['Segment', 'Type', 'Product', 'Month'], dropna=False, sort=False)['Revenue'].sum()
+        keys = cells.index.to_frame(index=False)
+
+        row_cols = ['Segment', 'Type', 'Product']
+        row_codes = keys.groupby(row_cols, dropna=False, sort=False).ngroup().to_numpy()
+        rows = keys[row_cols].drop_duplicates().reset_index(drop=True)
+
+        dated = keys['Month'].notna().to_numpy()
+        months = pd.DatetimeIndex(np.unique(keys['Month'][dated].to_numpy()), name='Month')
+        month_codes = months.get_indexer(keys['Month'][dated])
+
+        n_rows, n_months = len(rows), len(months)
+        amounts = cells.to_numpy(dtype=np.float64)
+        flat = row_codes[dated] * n_months + month_codes
+        values = np.bincount(flat, weights=amounts[dated], minlength=n_rows * n_months).reshape(n_rows, n_months)
+        present = np.bincount(flat, minlength=n_rows * n_months).reshape(n_rows, n_months) > 0
+        undated = np.bincount(row_codes[~dated], weights=amounts[~dated], minlength=n_rows)
+
+        return PnLCube(rows, months, values, present, undated, has_type)
+
+    def _mask(self, segments):
+        return self.rows['Segment'].isin(segments).to_numpy()
+
+    def has_facts(self, *segments):
+        """True if any account row of `segments` made it into the cube."""
+        return bool(self._mask(segments).any())
+
+    def monthly_totals(self, *segments):
+        """Revenue per month over `segments`; only months with at least one fact are included."""
+        mask = self._mask(segments)
+        months_present = self.present[mask].any(axis=0)
+        totals = self.values[mask][:, months_present].sum(axis=0)
+        return pd.Series(totals, index=self.months[months_present], name='Revenue')
+
+    def account_totals(self, *segments):
+        """Total Revenue per account (Product) over `segments`, sorted by account name."""
+        mask = self._mask(segments) & self.rows['Product'].notna().to_numpy()
+        totals = self.values[mask].sum(axis=1) + self.undated[mask]
+        return pd.Series(totals, index=pd.Index(self.rows['Product'][mask], name='Product'),
+                         name='Revenue').groupby(level=0).sum()
+
+    def account_matrix(self, *segments, by=('Product',)):
+        """
+        Accounts x months Revenue matrix over `segments`, grouped by the `by` row keys
+        (sorted, missing keys dropped) and limited to the months those accounts have facts for.
+        """
+        by = list(by)
+        mask = self._mask(segments) & self.rows[by].notna().all(axis=1).to_numpy()
+        months_present = self.present[mask].any(axis=0)
+        matrix = pd.DataFrame(self.values[mask][:, months_present], columns=self.months[months_present])
+        index = pd.MultiIndex.from_frame(self.rows.loc[mask, by].reset_index(drop=True)) if len(by) > 1 \
+            else pd.Index(self.rows.loc[mask, by[0]].to_numpy(), name=by[0])
+        matrix.index = index
+        return matrix.groupby(level=list(range(len(by)))).sum()
+
+    def facts(self, *segments, products=None):
+        """
+        Long-format (Product, Type, Month, Revenue) facts for `segments`, optionally limited
+        to the given accounts, ordered like the segment sheets concatenated in `segments`
+        order: segment by segment, month-major within a segment. The index is a fresh RangeIndex.
+        """
+        mask = self._mask(segments)
+        if products is not None:
+            mask &= self.rows['Product'].isin(products).to_numpy()
+        row_idx = np.flatnonzero(mask)
+        month_pos, row_pos = np.nonzero(self.present[row_idx].T)
+        rows = row_idx[row_pos]
+        segment_rank = pd.Index(segments).get_indexer(self.rows['Segment'].to_numpy()[rows])
+        order = np.argsort(segment_rank, kind='stable')
+        rows, month_pos = rows[order], month_pos[order]
+        return pd.DataFrame({
+            'Product': self.rows['Product'].to_numpy()[rows],
+            'Type': self.rows['Type'].to_numpy()[rows],
+            'Month': self.months[month_pos],
+            'Revenue': self.values[rows, month_pos],
+        })
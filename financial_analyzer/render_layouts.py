@@ -2,6 +2,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from financial_analyzer.analysis_graph import get_analysis_graph
 from financial_analyzer.analysis_modes import FinancialAnalyzer
 from financial_analyzer.forecast_engine import ForecastEngine
 
@@ -16,6 +17,25 @@ _global_insight_cache = {
 }
 
 
+# Insight section -> analysis graph node
+INSIGHT_NODES = {
+    "Overview": 'overview',
+    "Sales Trends": 'sales',
+    "AR Collections": 'ar',
+    "AP Management": 'ap',
+    "Cash Flow Statement": 'cash_flow_statement',
+    "Profitability": 'profit',
+    "Forecast": 'forecast',
+    "Spending": 'spending',
+}
+
+
+def _compute_insight_requests(graph):
+    """Runs the section analyses concurrently; returns {section: result} in INSIGHT_NODES order."""
+    results = graph.compute(INSIGHT_NODES.values())
+    return {mode: results[node] for mode, node in INSIGHT_NODES.items()}
+
+
 def _get_batched_insights(ai, dfs, ai_enabled=True):
     """Collect data for all sections and retrieve batched insights.
 
@@ -23,18 +43,11 @@ def _get_batched_insights(ai, dfs, ai_enabled=True):
     and per `ai_enabled` flag so insights are invalidated when the user loads new data
     or toggles AI on/off.
     """
+    graph = get_analysis_graph(dfs)
+
     # If AI disabled, return rule-based fallback for each section
     if not ai_enabled:
-        insight_requests = {
-            "Overview": FinancialAnalyzer.analyze_overview(dfs),
-            "Sales Trends": FinancialAnalyzer.analyze_sales(dfs),
-            "AR Collections": FinancialAnalyzer.analyze_ar(dfs),
-            "AP Management": FinancialAnalyzer.analyze_ap(dfs),
-            "Cash Flow Statement": FinancialAnalyzer.analyze_cash_flow_statement(dfs),
-            "Profitability": FinancialAnalyzer.analyze_profit(dfs),
-            "Forecast": FinancialAnalyzer.analyze_forecast(dfs),
-            "Spending": FinancialAnalyzer.analyze_spending(dfs)
-        }
+        insight_requests = _compute_insight_requests(graph)
         return {mode: {"bullets": ai.generate_fallback_insights(mode, data), "raw": None} for mode, data in insight_requests.items()}
 
     # Determine current dataset timestamp and fingerprint for intelligent caching
@@ -54,16 +67,7 @@ def _get_batched_insights(ai, dfs, ai_enabled=True):
         return _global_insight_cache['data']
 
     # Build requests and call batch LLM
-    insight_requests = {
-        "Overview": FinancialAnalyzer.analyze_overview(dfs),
-        "Sales Trends": FinancialAnalyzer.analyze_sales(dfs),
-        "AR Collections": FinancialAnalyzer.analyze_ar(dfs),
-        "AP Management": FinancialAnalyzer.analyze_ap(dfs),
-        "Cash Flow Statement": FinancialAnalyzer.analyze_cash_flow_statement(dfs),
-        "Profitability": FinancialAnalyzer.analyze_profit(dfs),
-        "Forecast": FinancialAnalyzer.analyze_forecast(dfs),
-        "Spending": FinancialAnalyzer.analyze_spending(dfs)
-    }
+    insight_requests = _compute_insight_requests(graph)
 
     try:
         res = ai.get_all_insights(insight_requests)
@@ -100,7 +104,7 @@ def render_overview(dfs, ai, ai_enabled=True):
     # --- FINANCIAL PERFORMANCE METRICS ---
     st.subheader("💰 Financial Performance (YTD)")
     c1, c2, c3 = st.columns(3)
-    ov = FinancialAnalyzer.analyze_overview(dfs)
+    ov = get_analysis_graph(dfs)['overview']
     
     c1.metric("YTD Sales", f"${ov.get('ytd_sales', 0):,.0f}")
     c2.metric("YTD Expenses", f"${ov.get('ytd_expense', 0):,.0f}", delta_color="inverse")
@@ -162,7 +166,7 @@ def render_sales(dfs, ai, ai_enabled=True):
     st.caption("Revenue trends and product performance analysis")
     
     # Load Data
-    res = FinancialAnalyzer.analyze_sales(dfs)
+    res = FinancialAnalyzer.analyze_sales(dfs, as_arrays=True)
     by_prod = res.get('by_product', pd.DataFrame())
     trend = res.get('trend', pd.DataFrame())
     
@@ -344,11 +348,12 @@ def render_sales(dfs, ai, ai_enabled=True):
                 import numpy as np
                 
                 # Get top 10 products by total revenue
-                top_products = product_monthly.sum(axis=1).nlargest(10).index
-                growth_subset = product_mom_growth.loc[top_products]
+                arrays = res['growth_arrays']
+                top_rows = np.argsort(-arrays.revenue.sum(axis=1), kind='stable')[:10]
+                growth_values = arrays.growth[top_rows]
                 
                 # Format month labels
-                month_labels = [col.strftime('%b %Y') for col in growth_subset.columns]
+                month_labels = [col.strftime('%b %Y') for col in arrays.months]
                 
                 # Premium color scale with smooth gradients
                 colorscale = [
@@ -363,25 +368,16 @@ def render_sales(dfs, ai, ai_enabled=True):
                     [1.0, '#059669']     # Deep green for strong positive
                 ]
                 
-                # Format text with better readability using list comprehension
-                text_values = []
-                for row in growth_subset.values:
-                    row_text = []
-                    for val in row:
-                        if val == 0:
-                            row_text.append('0%')
-                        elif val > 0:
-                            row_text.append(f'+{val:.1f}%')
-                        else:
-                            row_text.append(f'{val:.1f}%')
-                    text_values.append(row_text)
-                text_values = np.array(text_values)
+                # Format text with better readability: '+12.5%', '-3.0%', '0%'
+                text_values = np.where(
+                    growth_values == 0, '0%',
+                    np.char.add(np.where(growth_values > 0, '+', ''), np.char.mod('%.1f%%', growth_values)))
                 
                 # Create premium heatmap
                 fig = go.Figure(data=go.Heatmap(
-                    z=growth_subset.values,
+                    z=growth_values,
                     x=month_labels,
-                    y=growth_subset.index,
+                    y=arrays.products[top_rows],
                     colorscale=colorscale,
                     zmid=0,
                     text=text_values,
@@ -734,7 +730,18 @@ def render_cash(dfs, ai, ai_enabled=True):
         
         apply_chart_style(fig_waterfall)
         st.plotly_chart(fig_waterfall, use_container_width=True)
-        
+
+        # Monthly exports: cash flow by activity per period
+        period_flows = res.get('period_flows', pd.DataFrame())
+        if len(period_flows) > 1:
+            st.subheader("Cash Flow by Period")
+            flows_long = period_flows[['operating_cf', 'investing_cf', 'financing_cf']].rename(
+                columns={'operating_cf': 'Operating', 'investing_cf': 'Investing', 'financing_cf': 'Financing'}
+            ).reset_index().melt(id_vars='Period', var_name='Activity', value_name='Amount')
+            fig_periods = px.bar(flows_long, x='Period', y='Amount', color='Activity', barmode='relative')
+            apply_chart_style(fig_periods)
+            st.plotly_chart(fig_periods, use_container_width=True)
+
         # Top Cash Sources and Uses
         st.subheader("Actual Cash Transactions (Investing & Financing Activities Only)")
         c1, c2 = st.columns(2)
@@ -889,9 +896,18 @@ def render_forecast(dfs, ai, ai_enabled=True):
     st.header("🔮 Income Forecast (Beta)")
     st.caption("Predictive analytics based on historical trends")
     
-    st.info("📊 **Methodology:** Using last 6 months average growth rate (capped at ±20%) to project next 3 months")
+    method_label = st.radio("Forecast method", ["Growth (L6M average)", "Seasonal (Holt-Winters)"],
+                            horizontal=True, key="forecast_method")
+    method = 'holt_winters' if method_label.startswith("Seasonal") else 'growth'
     
-    res = FinancialAnalyzer.analyze_forecast(dfs)
+    if method == 'holt_winters':
+        st.info("📊 **Methodology:** Holt-Winters exponential smoothing (level, trend and monthly seasonality; "
+                "smoothing parameters picked per series by backtest error). Needs 24+ months for seasonality.")
+    else:
+        st.info("📊 **Methodology:** Using last 6 months average growth rate (capped at ±20%) to project next 3 months")
+    
+    # Same results as analyze_forecast(dfs, method), shared with the insights through the graph
+    res = get_analysis_graph(dfs)['seasonal_forecast' if method == 'holt_winters' else 'forecast']
     
     if res and res.get('forecast') is not None and not res['forecast'].empty:
         history = res['history']
@@ -912,8 +928,12 @@ def render_forecast(dfs, ai, ai_enabled=True):
         
         # Display Growth Metric
         c1, c2 = st.columns(2)
-        c1.metric("Historical Trend", "L6M Average")
-        c2.metric("Projected Growth Rate", f"{growth_rate*100:.1f}%", help="Capped at ±20% for realism")
+        if method == 'holt_winters':
+            c1.metric("Model", "Holt-Winters" if res.get('seasonal') else "Holt (trend only)")
+            c2.metric("Implied Monthly Growth", f"{growth_rate*100:.1f}%")
+        else:
+            c1.metric("Historical Trend", "L6M Average")
+            c2.metric("Projected Growth Rate", f"{growth_rate*100:.1f}%", help="Capped at ±20% for realism")
         
         # Chart
         # Concatenate for single source
@@ -946,6 +966,20 @@ def render_forecast(dfs, ai, ai_enabled=True):
             hovertemplate='<b>%{x|%b %Y}</b><br>Forecast: $%{y:,.0f}<extra></extra>'
         ))
         
+        # P10-P90 band from bootstrapped backtest errors
+        from financial_analyzer.forecast_simulation import revenue_bands
+        bands = revenue_bands(history, forecast, method)
+        if bands is not None:
+            fig.add_trace(go.Scatter(
+                x=bands['Month'], y=bands['P90'], mode='lines', line=dict(width=0),
+                showlegend=False, hovertemplate='<b>%{x|%b %Y}</b><br>P90: $%{y:,.0f}<extra></extra>'
+            ))
+            fig.add_trace(go.Scatter(
+                x=bands['Month'], y=bands['P10'], name='P10-P90 range', mode='lines', line=dict(width=0),
+                fill='tonexty', fillcolor='rgba(245, 158, 11, 0.2)',
+                hovertemplate='<b>%{x|%b %Y}</b><br>P10: $%{y:,.0f}<extra></extra>'
+            ))
+        
         fig.update_layout(
             title="Projected Operating Income (Next 3 Months)",
             xaxis=dict(tickformat="%b %Y"),
@@ -963,7 +997,22 @@ def render_forecast(dfs, ai, ai_enabled=True):
         if 'Month' in f_display.columns:
              f_display['Month'] = pd.to_datetime(f_display['Month']).dt.strftime('%b %Y')
              
-        st.dataframe(f_display[['Month', 'Revenue']].style.format({'Revenue': '${:,.0f}'}))
+        display_cols = ['Month', 'Revenue']
+        if bands is not None:
+            f_display['P10'], f_display['P90'] = bands['P10'].to_numpy(), bands['P90'].to_numpy()
+            display_cols += ['P10', 'P90']
+        st.dataframe(f_display[display_cols].style.format({c: '${:,.0f}' for c in display_cols[1:]}))
+        
+        # Rolling-origin accuracy of each method on this revenue history
+        with st.expander("📏 Forecast accuracy (backtest)"):
+            from financial_analyzer.backtesting import backtest, summarize
+            trend_row = history.set_index('Month')[['Revenue']].T
+            accuracy = summarize(backtest(trend_row, horizon=3, min_train=6, max_workers=1))
+            if accuracy.empty:
+                st.info("Need more than 6 months of history to backtest the forecast methods.")
+            else:
+                st.caption("Each method re-fitted at every past month and scored on the following 3 months.")
+                st.dataframe(accuracy.style.format({'MAPE': '{:.1f}%', 'MAE': '${:,.0f}', 'Bias': '${:,.0f}'}))
         
         # AI Insights (Forecast)
         insights_map = _get_batched_insights(ai, dfs, ai_enabled).get("Forecast", {})
@@ -1,6 +1,77 @@
+import threading
+
 import pandas as pd
 import numpy as np
 
+
+class CompiledResolver:
+    """
+    Resolves a target name against a set of names (frame columns or sheet names):
+    exact match, then case-insensitive, then each alias in order - whole name first,
+    then the first name containing it.
+
+    Aliases are lowercased once up front, and every resolution is memoized per
+    (names signature, target), so repeated lookups against the same frame layout
+    are a single dict hit. `stats()` reports hits / misses.
+    """
+
+    MAX_ENTRIES = 4096
+
+    def __init__(self, aliases):
+        self.aliases = {target: tuple(a.lower() for a in names) for target, names in aliases.items()}
+        self._resolved = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, names, target_name):
+        """Returns the matching entry of `names`, or None."""
+        names = tuple(names)
+        key = (names, target_name)
+        with self._lock:
+            if key in self._resolved:
+                self.hits += 1
+                return self._resolved[key]
+            self.misses += 1
+
+        resolved = self._match(names, target_name)
+        with self._lock:
+            if len(self._resolved) >= self.MAX_ENTRIES:
+                self._resolved.clear()
+            self._resolved[key] = resolved
+        return resolved
+
+    def _match(self, names, target_name):
+        # Exact match
+        if target_name in names:
+            return target_name
+
+        # Case insensitive
+        lower_map = {n.lower(): n for n in names}
+        lower_target = target_name.lower()
+        if lower_target in lower_map:
+            return lower_map[lower_target]
+
+        # Aliases
+        for alias in self.aliases.get(target_name, ()):
+            if alias in lower_map:
+                return lower_map[alias]
+            # Partial match (careful with this)
+            for lower_name in lower_map:
+                if alias in lower_name:
+                    return lower_map[lower_name]
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._resolved.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._resolved), 'hits': self.hits, 'misses': self.misses}
+
+
 class SchemaMatcher:
     """
     Helper to map expected column names to actual columns in the dataframe using fuzzy matching.
@@ -19,32 +90,25 @@ class SchemaMatcher:
         'Balance': ['balance', 'total', 'net']
     }
 
+    SHEET_ALIASES = {
+        'GL': ['general ledger', 'journal', 'transactions', 'data'],
+        'AR': ['accounts receivable', 'receivables', 'invoices', 'open invoices'],
+        'AP': ['accounts payable', 'payables', 'bills'],
+        'Cash': ['cash flow', 'bank', 'banking', 'treasury'],
+        'Sales_Monthly': ['sales', 'revenue', 'income'],
+        'Expenses_Monthly': ['expenses', 'costs', 'expenditure']
+    }
+
+    _columns = CompiledResolver(ALIASES)
+    _sheets = CompiledResolver(SHEET_ALIASES)
+
     @staticmethod
     def get_column(df, target_name):
         """
         Returns the actual column name in df that matches target_name.
         Returns None if no match found.
         """
-        # Exact match
-        if target_name in df.columns:
-            return target_name
-            
-        # Case insensitive
-        col_map = {c.lower(): c for c in df.columns}
-        if target_name.lower() in col_map:
-            return col_map[target_name.lower()]
-            
-        # Aliases
-        possible_names = SchemaMatcher.ALIASES.get(target_name, [])
-        for alias in possible_names:
-            if alias in col_map:
-                return col_map[alias]
-            # Partial match (careful with this)
-            for col_lower in col_map:
-                if alias in col_lower:
-                    return col_map[col_lower]
-                    
-        return None
+        return SchemaMatcher._columns.resolve(df.columns, target_name)
 
     @staticmethod
     def get_sheet(dfs, target_name):
@@ -53,34 +117,13 @@ class SchemaMatcher:
         """
         if target_name in dfs:
             return dfs[target_name]
-            
-        # Aliases for sheets
-        SHEET_ALIASES = {
-            'GL': ['general ledger', 'journal', 'transactions', 'data'],
-            'AR': ['accounts receivable', 'receivables', 'invoices', 'open invoices'],
-            'AP': ['accounts payable', 'payables', 'bills'],
-            'Cash': ['cash flow', 'bank', 'banking', 'treasury'],
-            'Sales_Monthly': ['sales', 'revenue', 'income'],
-            'Expenses_Monthly': ['expenses', 'costs', 'expenditure']
-        }
-        
-        # Case insensitive match
-        keys_map = {k.lower(): k for k in dfs.keys()}
-        lower_target = target_name.lower()
-        if lower_target in keys_map:
-            return dfs[keys_map[lower_target]]
-            
-        # Alias match
-        aliases = SHEET_ALIASES.get(target_name, [])
-        for alias in aliases:
-            if alias in keys_map:
-                return dfs[keys_map[alias]]
-            # Partial?
-            for k in keys_map:
-                if alias in k:
-                    return dfs[keys_map[k]]
-                    
-        return None
+        sheet = SchemaMatcher._sheets.resolve(dfs.keys(), target_name)
+        return dfs[sheet] if sheet is not None else None
+
+    @staticmethod
+    def stats():
+        """Resolution cache hit / miss counts for column and sheet lookups."""
+        return {'columns': SchemaMatcher._columns.stats(), 'sheets': SchemaMatcher._sheets.stats()}
 
     @staticmethod
     def safe_get(df, target_name, default=None):
@@ -0,0 +1,78 @@
+from io import BytesIO
+
+import pytest
+
+from financial_analyzer.analysis_cache import ResultCache, analysis_cache, dataset_fingerprint
+from financial_analyzer.analysis_modes import FinancialAnalyzer
+from financial_analyzer.conftest import build_quickbooks_workbook
+from financial_analyzer.microsoft_excel import ExcelHandler
+
+
+def parse(content):
+    return ExcelHandler._parse_excel(BytesIO(content))
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    analysis_cache.clear()
+
+
+def test_results_are_keyed_by_content_not_identity(quickbooks_workbook):
+    first = FinancialAnalyzer.analyze_sales(parse(quickbooks_workbook))
+    before = analysis_cache.stats()
+
+    again = FinancialAnalyzer.analyze_sales(parse(quickbooks_workbook))
+    assert again is first
+    assert analysis_cache.stats()['hits'] == before['hits'] + 1
+    assert analysis_cache.stats()['misses'] == before['misses']
+
+    other = FinancialAnalyzer.analyze_sales(parse(build_quickbooks_workbook(n_accounts=6)))
+    assert other is not first
+    assert len(other['by_product']) == 6
+
+
+def test_parameters_are_part_of_the_key(quickbooks_workbook):
+    dfs = parse(quickbooks_workbook)
+    FinancialAnalyzer.detect_anomalies(dfs)
+    misses = analysis_cache.stats()['misses']
+
+    FinancialAnalyzer.detect_anomalies(dfs, spike_threshold=50)
+    assert analysis_cache.stats()['misses'] == misses + 1
+
+
+def test_equivalent_calls_share_one_entry(quickbooks_workbook):
+    dfs = parse(quickbooks_workbook)
+    first = FinancialAnalyzer.analyze_forecast(dfs)
+    misses = analysis_cache.stats()['misses']
+
+    assert FinancialAnalyzer.analyze_forecast(dfs, 'growth') is first
+    assert FinancialAnalyzer.analyze_forecast(dfs, method='growth') is first
+    assert analysis_cache.stats()['misses'] == misses
+    assert FinancialAnalyzer.analyze_forecast(dfs, 'holt_winters') is not first
+
+
+def test_forecast_leaves_cached_sales_trend_untouched(quickbooks_workbook):
+    dfs = parse(quickbooks_workbook)
+    FinancialAnalyzer.analyze_forecast(dfs)
+    assert 'Type' not in FinancialAnalyzer.analyze_sales(dfs)['trend'].columns
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = ResultCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_fingerprint_tracks_content(quickbooks_workbook):
+    dfs = parse(quickbooks_workbook)
+    copy = {name: df.copy() for name, df in dfs.items()}
+    assert dataset_fingerprint(copy) == dataset_fingerprint(dfs)
+
+    copy['AR'] = copy['AR'].assign(Current=0)
+    assert dataset_fingerprint(copy) != dataset_fingerprint(dfs)
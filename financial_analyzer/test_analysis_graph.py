@@ -0,0 +1,115 @@
+import gc
+import time
+import weakref
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from financial_analyzer.analysis_cache import analysis_cache, dataset_fingerprint
+from financial_analyzer.analysis_graph import AnalysisGraph, get_analysis_graph
+from financial_analyzer.analysis_modes import FinancialAnalyzer
+from financial_analyzer.conftest import build_quickbooks_workbook
+from financial_analyzer.microsoft_excel import ExcelHandler
+
+
+def test_nodes_match_the_standalone_analyses(quickbooks_workbook):
+    dfs = ExcelHandler._parse_excel(BytesIO(quickbooks_workbook))
+    graph = AnalysisGraph(dfs)
+
+    assert graph['overview'] == FinancialAnalyzer.analyze_overview(dfs)
+    forecast = FinancialAnalyzer.analyze_forecast(dfs)
+    pd.testing.assert_frame_equal(graph['forecast']['forecast'], forecast['forecast'])
+    pd.testing.assert_frame_equal(graph['anomalies'], FinancialAnalyzer.detect_anomalies(dfs))
+    seasonal = FinancialAnalyzer.analyze_forecast(dfs, 'holt_winters')
+    pd.testing.assert_frame_equal(graph['seasonal_forecast']['forecast'], seasonal['forecast'])
+
+
+def test_each_node_is_computed_once_after_its_dependencies(quickbooks_workbook):
+    dfs = ExcelHandler._parse_excel(BytesIO(quickbooks_workbook))
+    analysis_cache.clear()
+    graph = AnalysisGraph(dfs)
+
+    overview = graph['overview']
+    assert graph.computed() == ['profit', 'ar', 'ap', 'overview']
+    assert all(t >= 0 for t in graph.timings.values())
+
+    misses = analysis_cache.stats()['misses']
+    assert graph['overview'] is overview
+    assert graph['profit'] is graph['profit']
+    assert analysis_cache.stats()['misses'] == misses
+    assert 'sales' not in graph.timings  # not needed yet
+
+
+def test_failing_dependency_is_passed_as_none():
+    def broken(dfs):
+        raise ValueError("no AR sheet")
+
+    nodes = {
+        'ar': ((), broken),
+        'total': (('ar',), lambda dfs, ar: 0 if ar is None else ar),
+    }
+    graph = AnalysisGraph({}, nodes)
+
+    assert graph['total'] == 0
+    with pytest.raises(ValueError):
+        graph['ar']
+    with pytest.raises(KeyError):
+        graph['missing']
+
+
+def test_graph_is_shared_per_dataset_content(quickbooks_workbook):
+    first = ExcelHandler._parse_excel(BytesIO(quickbooks_workbook))
+    second = ExcelHandler._parse_excel(BytesIO(quickbooks_workbook))
+    assert get_analysis_graph(first) is get_analysis_graph(second)
+
+
+def test_compute_runs_nodes_concurrently_in_request_order(quickbooks_workbook):
+    dfs = ExcelHandler._parse_excel(BytesIO(quickbooks_workbook))
+    names = ['spending', 'overview', 'sales', 'forecast', 'ar', 'profit']
+
+    parallel = AnalysisGraph(dfs).compute(names, max_workers=4)
+    serial = AnalysisGraph(dfs).compute(names, max_workers=1)
+
+    assert list(parallel) == names
+    assert parallel['overview'] == serial['overview']
+    pd.testing.assert_frame_equal(parallel['sales']['trend'], serial['sales']['trend'])
+
+
+def test_shared_dependency_is_computed_once_under_concurrency():
+    calls = []
+
+    def slow_base(dfs):
+        calls.append('base')
+        time.sleep(0.05)
+        return 2
+
+    nodes = {'base': ((), slow_base)}
+    nodes.update({f"n{i}": (('base',), lambda dfs, base, i=i: base * i) for i in range(6)})
+
+    results = AnalysisGraph({}, nodes).compute([f"n{i}" for i in range(6)], max_workers=6)
+    assert list(results.values()) == [0, 2, 4, 6, 8, 10]
+    assert calls == ['base']
+
+
+def test_released_version_is_freed_after_its_graph_was_built(quickbooks_workbook, monkeypatch):
+    from financial_analyzer import analysis_graph
+    from financial_analyzer.dataset_store import DatasetStore
+
+    monkeypatch.setattr(analysis_graph, '_graphs', analysis_graph.OrderedDict())
+    store = DatasetStore()
+    store.publish(1, ExcelHandler._parse_excel(BytesIO(quickbooks_workbook)))
+    handle = store.acquire()
+    graph = get_analysis_graph(handle.data)
+    graph.compute(['overview', 'forecast', 'anomalies'], max_workers=1)
+    dataset_ref, frame_ref = weakref.ref(handle.data), weakref.ref(handle.data['Sales_Monthly'])
+    key = dataset_fingerprint(handle.data)
+    del graph
+
+    store.publish(2, ExcelHandler._parse_excel(BytesIO(build_quickbooks_workbook(n_accounts=6))))
+    handle.release()
+    gc.collect()
+
+    assert dataset_ref() is None
+    assert frame_ref() is None
+    assert key not in analysis_graph._graphs
@@ -0,0 +1,66 @@
+import pandas as pd
+
+from financial_analyzer.analysis_modes import FinancialAnalyzer
+
+
+def pnl_segments():
+    months = pd.to_datetime(['2025-01-01', '2025-02-01', '2025-03-01'])
+    return {
+        'Sales_Monthly': pd.DataFrame({'Product': ['Consulting'] * 2, 'Type': 'Operating Income',
+                                       'Month': months[:2], 'Revenue': [200.0, 100.0]}),
+        'Expenses_Monthly': pd.DataFrame({'Product': ['Rent'] * 3, 'Type': 'Operating Expense',
+                                          'Month': months, 'Revenue': [50.0, 50.0, 50.0]}),
+        'Other_Income_Monthly': pd.DataFrame({'Product': ['Interest'], 'Type': 'Other Income',
+                                              'Month': months[1:2], 'Revenue': [10.0]}),
+    }
+
+
+def test_profit_table_aligns_segments_by_month():
+    res = FinancialAnalyzer.analyze_profit(pnl_segments())
+    pnl = res['monthly_pnl']
+
+    assert pnl['Month'].tolist() == list(pd.to_datetime(['2025-01-01', '2025-02-01', '2025-03-01']))
+    assert pnl['OperatingIncome'].tolist() == [200.0, 100.0, 0.0]
+    assert pnl['NetProfit'].tolist() == [150.0, 60.0, -50.0]
+    assert pnl['Margin'].tolist() == [75.0, 60.0, 0.0]  # no income in March -> margin 0
+
+    metrics = res['metrics']
+    assert metrics['ytd_net_profit'] == 160.0
+    assert metrics['net_margin'] == 160.0 / 300.0 * 100
+
+
+def test_mom_growth_matrix_and_float32_arrays():
+    months = pd.to_datetime(['2025-01-01', '2025-02-01', '2025-03-01'])
+    sales = pd.DataFrame({'Product': ['A', 'A', 'A', 'B', 'B'], 'Type': 'Operating Income',
+                          'Month': [*months, months[1], months[2]], 'Revenue': [100.0, 150.0, 75.0, 40.0, 0.0]})
+    res = FinancialAnalyzer.analyze_sales({'Sales_Monthly': sales}, as_arrays=True)
+
+    growth = res['product_mom_growth']
+    assert growth.loc['A'].tolist() == [0.0, 50.0, -50.0]
+    assert growth.loc['B'].tolist() == [0.0, 4000.0, -100.0]  # growth from a zero month divides by 1
+
+    arrays = res['growth_arrays']
+    assert arrays.growth.dtype == 'float32'
+    assert list(arrays.products) == ['A', 'B']
+    assert list(arrays.months) == list(months)
+    assert arrays.revenue[1].tolist() == [0.0, 40.0, 0.0]
+
+
+def test_seasonal_forecast_mode_uses_holt_winters():
+    months = pd.date_range('2023-01-01', periods=26, freq='MS')
+    revenue = [1000 + 20 * i + (300 if m.month == 12 else 0) for i, m in enumerate(months)]
+    dfs = {'Sales_Monthly': pd.DataFrame({'Product': 'Consulting', 'Type': 'Operating Income',
+                                          'Month': months, 'Revenue': revenue})}
+
+    res = FinancialAnalyzer.analyze_forecast(dfs, 'holt_winters')
+
+    assert res['seasonal']
+    assert list(res['forecast']['Month']) == list(pd.date_range('2025-03-01', periods=3, freq='MS'))
+    assert len(FinancialAnalyzer.analyze_forecast(dfs)['forecast']) == 3
+
+
+def test_spending_without_resolvable_expense_rows_is_none():
+    # An Expenses_Monthly sheet without Product / Revenue columns (like financial_template.xlsx)
+    dfs = {'Expenses_Monthly': pd.DataFrame({'Category': ['Rent'], 'Amount ($)': [50.0]})}
+    assert FinancialAnalyzer.analyze_spending(dfs) is None
+    assert FinancialAnalyzer.analyze_spending(pnl_segments())['top_5_ytd']['Product'].tolist() == ['Rent']
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from financial_analyzer.anomaly_detection import ANOMALY_COLUMNS, find_anomalies
+
+
+def legacy_detect(product_monthly, product_mom_growth, spike_threshold=300, drop_threshold=-50, z_score_threshold=3):
+    """The original per-product loop from FinancialAnalyzer.detect_anomalies, kept as the golden reference."""
+    from scipy import stats
+
+    anomalies = []
+    for product in product_mom_growth.index:
+        revenue_values = product_monthly.loc[product].values
+        growth_values = product_mom_growth.loc[product].values
+        months = product_monthly.columns
+
+        valid_growth = growth_values[(~np.isinf(growth_values)) & (growth_values != 0)]
+        if len(valid_growth) > 2:
+            z_scores = np.abs(stats.zscore(valid_growth, nan_policy='omit'))
+            z_score_dict = dict(zip(range(len(growth_values)), [0] * len(growth_values)))
+            valid_indices = np.where((~np.isinf(growth_values)) & (growth_values != 0))[0]
+            for idx, z in zip(valid_indices, z_scores):
+                z_score_dict[idx] = z
+        else:
+            z_score_dict = {i: 0 for i in range(len(growth_values))}
+
+        for i, (month, revenue, growth) in enumerate(zip(months, revenue_values, growth_values)):
+            if i == 0:
+                continue
+            anomaly_types = []
+            z_score = z_score_dict.get(i, 0)
+            if growth > spike_threshold:
+                anomaly_types.append('Spike')
+            if growth < drop_threshold:
+                anomaly_types.append('Drop')
+            if z_score > z_score_threshold and abs(growth) > 10:
+                anomaly_types.append('Statistical')
+            if anomaly_types:
+                anomalies.append({
+                    'Month': month.strftime('%b %Y'),
+                    'Product': product,
+                    'Revenue': revenue,
+                    'MoM_Growth_Pct': growth,
+                    'Anomaly_Type': ', '.join(anomaly_types),
+                    'Z_Score': z_score
+                })
+
+    anomalies_df = pd.DataFrame(anomalies)
+    if not anomalies_df.empty:
+        anomalies_df['Abs_Growth'] = anomalies_df['MoM_Growth_Pct'].abs()
+        anomalies_df = anomalies_df.sort_values('Abs_Growth', ascending=False).drop('Abs_Growth', axis=1)
+    return anomalies_df
+
+
+def random_sales(seed, n_products=40, n_months=14):
+    rng = np.random.default_rng(seed)
+    revenue = rng.lognormal(7, 0.6, (n_products, n_months)).round(2)
+    revenue[rng.random(revenue.shape) < 0.1] = 0  # idle months
+    revenue[rng.random(revenue.shape) < 0.02] *= 8  # one-off spikes
+    months = pd.date_range('2024-01-01', periods=n_months, freq='MS')
+    monthly = pd.DataFrame(revenue, index=[f"SKU {i}" for i in range(n_products)], columns=months)
+    prev = monthly.shift(1, axis=1)
+    growth = ((monthly - prev) / prev.replace(0, 1) * 100).fillna(0)
+    return monthly, growth
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_legacy_loop(seed):
+    monthly, growth = random_sales(seed)
+    expected = legacy_detect(monthly, growth, z_score_threshold=2)
+
+    result = find_anomalies(growth.index, growth.columns, monthly.to_numpy(), growth.to_numpy(), z_score_threshold=2)
+
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False)
+
+
+@pytest.mark.parametrize('detector', ['mad', 'rolling'])
+def test_pluggable_detectors_keep_output_schema(detector):
+    monthly, growth = random_sales(0)
+    result = find_anomalies(growth.index, growth.columns, monthly.to_numpy(), growth.to_numpy(),
+                            z_score_threshold=2, detector=detector)
+
+    assert list(result.columns) == ANOMALY_COLUMNS
+    assert result['Anomaly_Type'].str.contains('Statistical').any()
+    assert (result['MoM_Growth_Pct'].abs().diff().dropna() <= 0).all()
+
+
+def test_unknown_detector_is_rejected():
+    monthly, growth = random_sales(0, n_products=2)
+    with pytest.raises(ValueError):
+        find_anomalies(growth.index, growth.columns, monthly.to_numpy(), growth.to_numpy(), detector='prophet')
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from financial_analyzer import backtesting
+from financial_analyzer.analysis_modes import FinancialAnalyzer
+
+
+def matrix(n_months=18, seed=3):
+    rng = np.random.default_rng(seed)
+    months = pd.date_range('2024-01-01', periods=n_months, freq='MS')
+    t = np.arange(n_months)
+    rows = {
+        'Line': 500 + 25.0 * t,
+        'Noisy': rng.normal(1000, 150, n_months),
+        'Sparse': np.where(t % 4 == 0, np.nan, 300 + 5.0 * t),
+    }
+    return pd.DataFrame.from_dict(rows, orient='index', columns=months)
+
+
+def test_scores_every_model_and_series():
+    backtesting.fit_cache.clear()
+    res = backtesting.backtest(matrix(), horizon=3, min_train=6, max_workers=1)
+
+    assert set(res.scores['Model']) == set(backtesting.MODELS)
+    assert len(res.scores) == len(backtesting.MODELS) * 3
+    line = res.scores.set_index(['Model', 'Series']).loc[('linear', 'Line')]
+    assert line['MAPE'] < 1  # linear in months, fitted on day ordinals
+    # 12 origins; the last two only have 2 and 1 months left to score
+    assert line['N'] == 10 * 3 + 2 + 1
+    assert not res.errors['Actual'].isna().any()
+
+
+def test_growth_model_replays_analyze_forecast():
+    history = matrix().loc[['Noisy']]
+    origin = 10
+    forecast = backtesting.growth_forecast(history.to_numpy()[:, :origin], history.columns[:origin], 3)
+
+    months = history.columns[:origin]
+    dfs = {'Sales_Monthly': pd.DataFrame({'Product': 'Noisy', 'Type': 'Operating Income', 'Month': months,
+                                          'Revenue': history.iloc[0, :origin].to_numpy()})}
+    expected = FinancialAnalyzer.analyze_forecast(dfs)['forecast']['Revenue'].to_numpy()
+    assert np.allclose(forecast[0], expected)
+
+
+def test_process_pool_matches_serial_and_fits_are_cached():
+    backtesting.fit_cache.clear()
+    serial = backtesting.backtest(matrix(), models=['linear', 'holt_winters'], max_workers=1)
+    backtesting.fit_cache.clear()
+    pooled = backtesting.backtest(matrix(), models=['linear', 'holt_winters'], max_workers=2)
+    pd.testing.assert_frame_equal(serial.scores, pooled.scores)
+
+    misses = backtesting.fit_cache.stats()['misses']
+    again = backtesting.backtest(matrix(), models=['linear', 'holt_winters'], max_workers=2)
+    assert backtesting.fit_cache.stats()['misses'] == misses
+    pd.testing.assert_frame_equal(again.errors, pooled.errors)
+
+
+def test_summary_ranks_models_by_mape():
+    res = backtesting.backtest(matrix(), models=['naive', 'linear'], max_workers=1)
+    summary = backtesting.summarize(res)
+
+    assert list(summary.index) == sorted(summary.index, key=lambda m: summary.loc[m, 'MAPE'])
+    assert summary['N'].sum() == len(res.errors)
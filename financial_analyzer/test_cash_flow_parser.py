@@ -0,0 +1,62 @@
+from io import BytesIO
+
+import pandas as pd
+
+from financial_analyzer.analysis_modes import FinancialAnalyzer
+from financial_analyzer.cash_flow_parser import period_flows, tag_statement
+from financial_analyzer.microsoft_excel import ExcelHandler
+
+
+def multi_period_statement():
+    rows = [
+        ['OPERATING ACTIVITIES', None, None, None],
+        ['Net Income', 1000, 2000, 3000],
+        ['Adjustments to reconcile Net Income to Net Cash provided by operations:', None, None, None],
+        ['Accounts Receivable (A/R)', -100, 50, -50],
+        ['Total for Adjustments to reconcile Net Income to Net Cash provided by operations:', -100, 50, -50],
+        ['Net cash provided by operating activities', 900, 2050, 2950],
+        ['INVESTING ACTIVITIES', None, None, None],
+        ['Equipment', -500, 0, -500],
+        ['Net cash provided by investing activities', -500, 0, -500],
+        ['FINANCING ACTIVITIES', None, None, None],
+        ['Loan proceeds', 0, 700, 700],
+        ['Net cash provided by financing activities', 0, 700, 700],
+        ['NET CASH INCREASE FOR PERIOD', 400, 2750, 3150],
+        ['Cash at beginning of period', 100, 500, 100],
+        ['CASH AT END OF PERIOD', 500, 3250, 3250],
+    ]
+    return pd.DataFrame(rows, columns=['Full name', 'Jan 2025', 'Feb 2025', 'Total'])
+
+
+def test_rows_are_tagged_with_section_and_role():
+    tagged = tag_statement(multi_period_statement())
+
+    assert tagged['Role'].tolist() == ['header', 'item', 'header', 'item', 'subtotal', 'subtotal',
+                                       'header', 'item', 'subtotal', 'header', 'item', 'subtotal',
+                                       'subtotal', 'balance', 'balance']
+    assert tagged['Section'].tolist()[:12] == ['operating'] * 6 + ['investing'] * 3 + ['financing'] * 3
+    assert tagged['Section'].iloc[12:].isna().all()
+    assert tagged.loc[tagged['Is_Net_Income'], 'Line_Item'].tolist() == ['Net Income']
+
+
+def test_totals_match_the_statement_subtotals(quickbooks_workbook):
+    dfs = ExcelHandler._parse_excel(BytesIO(quickbooks_workbook))
+    res = FinancialAnalyzer.analyze_cash_flow_statement(dfs)
+
+    assert (res['net_income'], res['operating_cf'], res['investing_cf'], res['financing_cf']) == (5000, 4350, -2000, 700)
+    assert res['net_cash_change'] == 3050
+    assert res['operating_items']['Line_Item'].tolist() == ['Net Income', 'Accounts Receivable (A/R)',
+                                                            'Accounts Payable (A/P)', 'Depreciation']
+    assert res['top_outflows']['Line_Item'].tolist() == ['Equipment', 'Owner draws']
+    assert res['top_inflows']['Line_Item'].tolist() == ['Loan proceeds']
+
+
+def test_multi_period_statement_has_flows_per_month():
+    res = FinancialAnalyzer.analyze_cash_flow_statement({'Cash flow': multi_period_statement()})
+    flows = period_flows(tag_statement(multi_period_statement()))
+
+    assert res['operating_cf'] == 2950
+    pd.testing.assert_frame_equal(res['period_flows'], flows)
+    assert flows.index.tolist() == ['Jan 2025', 'Feb 2025']
+    assert flows['operating_cf'].tolist() == [900, 2050]
+    assert flows['net_cash_change'].tolist() == [400, 2750]
@@ -0,0 +1,82 @@
+import time
+
+from financial_analyzer.conftest import build_quickbooks_workbook
+from financial_analyzer.data_refresh import WorkbookRefresher
+
+
+def test_first_poll_publishes_version_one(workbook_server):
+    refresher = WorkbookRefresher(workbook_server.url, interval=60).start()
+    try:
+        snapshot = refresher.wait_for_snapshot(timeout=10)
+    finally:
+        refresher.stop(timeout=5)
+
+    assert snapshot.version == 1
+    assert 'Sales_Monthly' in snapshot.data
+
+
+def test_only_changed_content_bumps_the_version(workbook_server):
+    refresher = WorkbookRefresher(workbook_server.url, interval=60)
+    first = refresher.refresh_now()
+
+    unchanged = refresher.refresh_now()
+    assert unchanged.version == 1
+    assert unchanged.data is first.data
+
+    workbook_server.publish(build_quickbooks_workbook(n_accounts=6), '"v2"')
+    changed = refresher.refresh_now()
+    assert changed.version == 2
+    assert changed.data['Sales_Monthly']['Product'].nunique() == 6
+
+
+def test_unchanged_workbook_is_not_reloaded_from_the_cache(workbook_server, monkeypatch):
+    from financial_analyzer.workbook_cache import WorkbookCache
+
+    refresher = WorkbookRefresher(workbook_server.url, interval=60)
+    first = refresher.refresh_now()
+
+    def fail(self, key):
+        raise AssertionError("cached workbook was loaded for a 304")
+
+    monkeypatch.setattr(WorkbookCache, 'get', fail)
+    again = refresher.refresh_now()
+
+    assert refresher.last_error is None
+    assert again.version == 1 and again.data is first.data
+    assert again.checked_at >= first.checked_at
+    assert workbook_server.requests[-1].get('If-None-Match') == workbook_server.etag
+
+
+def test_failed_refresh_keeps_last_good_snapshot(workbook_server):
+    refresher = WorkbookRefresher(workbook_server.url, interval=60)
+    good = refresher.refresh_now()
+
+    workbook_server.responses = [404]
+    snapshot = refresher.refresh_now()
+    assert snapshot is good
+    assert refresher.last_error is not None
+
+
+def test_failed_first_poll_releases_waiters(workbook_server):
+    workbook_server.responses = [404]
+    refresher = WorkbookRefresher(workbook_server.url, interval=60).start()
+    try:
+        started = time.monotonic()
+        snapshot = refresher.wait_for_snapshot(timeout=20)
+        waited = time.monotonic() - started
+    finally:
+        refresher.stop(timeout=5)
+
+    assert snapshot is None
+    assert refresher.last_error is not None
+    assert waited < 5
+
+
+def test_new_refresher_is_seeded_from_disk_cache(workbook_server):
+    WorkbookRefresher(workbook_server.url, interval=60).refresh_now()
+    requests_so_far = len(workbook_server.requests)
+
+    seeded = WorkbookRefresher(workbook_server.url, interval=60)
+    assert seeded.snapshot is not None
+    assert 'Sales_Monthly' in seeded.snapshot.data
+    assert len(workbook_server.requests) == requests_so_far
@@ -0,0 +1,53 @@
+import gc
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from financial_analyzer.analysis_modes import FinancialAnalyzer
+from financial_analyzer.dataset_store import DatasetStore
+from financial_analyzer.microsoft_excel import ExcelHandler
+
+
+@pytest.fixture
+def parsed(quickbooks_workbook):
+    return ExcelHandler._parse_excel(BytesIO(quickbooks_workbook))
+
+
+def test_published_dataset_is_read_only(parsed):
+    dataset = DatasetStore().publish(1, parsed)
+
+    assert isinstance(dataset, dict)
+    with pytest.raises(TypeError):
+        dataset['AR'] = pd.DataFrame()
+    with pytest.raises(ValueError):
+        dataset['AR'].loc[0, 'Current'] = 0
+    with pytest.raises(ValueError):
+        dataset['Sales_Monthly'].iloc[0, 3] = 0.0
+
+    # Analyses only read their inputs
+    assert FinancialAnalyzer.analyze_profit(dataset)['metrics']['ytd_op_income'] > 0
+
+
+def test_old_versions_live_until_their_last_handle_is_released(parsed):
+    store = DatasetStore()
+    store.publish(1, parsed)
+    handle = store.acquire()
+
+    store.publish(2, parsed)
+    assert handle.data is not None
+    assert store.stats() == {1: 1, 2: 0}
+
+    handle.release()
+    assert store.get(1) is None
+    assert store.stats() == {2: 0}  # the latest version stays without handles
+
+
+def test_garbage_collected_handles_release_their_version(parsed):
+    store = DatasetStore()
+    store.publish(1, parsed)
+    store.acquire()  # handle dropped immediately, like an expired session
+    gc.collect()
+
+    store.publish(2, parsed)
+    assert store.get(1) is None
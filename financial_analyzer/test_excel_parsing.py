@@ -0,0 +1,113 @@
+from io import BytesIO
+
+import pandas as pd
+
+from financial_analyzer.microsoft_excel import ExcelHandler
+
+
+def parse(workbook, parse_mode):
+    return ExcelHandler._parse_excel(BytesIO(workbook), parse_mode)
+
+
+def test_streaming_mode_matches_default(quickbooks_workbook):
+    default = parse(quickbooks_workbook, 'default')
+    streaming = parse(quickbooks_workbook, 'streaming')
+
+    assert list(streaming) == list(default)
+    for sheet in default:
+        pd.testing.assert_frame_equal(streaming[sheet], default[sheet])
+
+
+def test_streaming_mode_skips_unanalyzed_sheets():
+    assert ExcelHandler._is_analyzed_sheet('Cash flow')
+    assert ExcelHandler._is_analyzed_sheet('Accounts Receivable Aging')
+    assert not ExcelHandler._is_analyzed_sheet('Notes')
+
+
+def test_parallel_mode_matches_default_and_reports_timings(quickbooks_workbook):
+    default = parse(quickbooks_workbook, 'default')
+    parallel = parse(quickbooks_workbook, 'parallel')
+
+    assert list(parallel) == list(default)
+    for sheet in default:
+        pd.testing.assert_frame_equal(parallel[sheet], default[sheet])
+    assert {'MOM PL', 'AR', 'AP', 'Cash flow', 'Notes', 'MOM PL (segments)'} <= set(ExcelHandler.last_parse_timings)
+
+
+def test_parallel_mode_falls_back_to_serial_without_worker_processes(quickbooks_workbook, monkeypatch):
+    from financial_analyzer import microsoft_excel
+
+    def no_processes(*args, **kwargs):
+        raise OSError("process spawning is not permitted")
+
+    monkeypatch.setattr(microsoft_excel, 'ProcessPoolExecutor', no_processes)
+    default = parse(quickbooks_workbook, 'default')
+    parallel = parse(quickbooks_workbook, 'parallel')
+
+    assert list(parallel) == list(default)
+    for sheet in default:
+        pd.testing.assert_frame_equal(parallel[sheet], default[sheet])
+    assert 'MOM PL' in ExcelHandler.last_parse_timings
+
+
+def test_month_headers_parse_to_first_of_month():
+    from financial_analyzer.microsoft_excel import _parse_month_label
+
+    assert _parse_month_label('January 2025') == pd.Timestamp('2025-01-01')
+    assert _parse_month_label('Dec 1 - Dec 18 2025') == pd.Timestamp('2025-12-01')
+    assert pd.isna(_parse_month_label('Distribution account'))
+
+
+def test_header_row_is_remembered_per_layout():
+    from financial_analyzer.microsoft_excel import _header_row_cache
+
+    report = pd.DataFrame([['A/R Aging Summary', None, None], [None, None, None],
+                           [None, 'Current', 'Total'], ['Acme', 10, 10]])
+    _header_row_cache.clear()
+
+    assert ExcelHandler._detect_header_row(report, 'AR') == 2
+    assert _header_row_cache[('AR', 3)][0] == 2
+
+    # Same layout with a longer preamble: the remembered row no longer matches, so it is re-detected
+    shifted = pd.concat([pd.DataFrame([[None, None, None]]), report], ignore_index=True)
+    assert ExcelHandler._detect_header_row(shifted, 'AR') == 3
+
+
+def test_header_row_memo_stays_bounded_under_concurrent_parses(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from financial_analyzer.microsoft_excel import _header_row_cache
+
+    monkeypatch.setattr(ExcelHandler, 'HEADER_CACHE_SIZE', 8)
+    _header_row_cache.clear()
+    report = pd.DataFrame([['Report', None], [None, 'Current'], ['Acme', 10]])
+
+    def detect(i):
+        return ExcelHandler._detect_header_row(report, f"Sheet {i % 50}")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert set(pool.map(detect, range(2000))) == {1}
+    assert len(_header_row_cache) <= 8
+
+
+def test_parsed_frames_are_compacted(quickbooks_workbook):
+    dfs = parse(quickbooks_workbook, 'default')
+
+    ar = dfs['AR']
+    assert ar['Current'].dtype == 'int32'
+    assert ar['Current'].tolist() == [1000, 2500, 3500]
+    assert ar['1 - 30'].tolist() == [200, -100, 100]
+
+    sales = dfs['Sales_Monthly']
+    assert sales['Revenue'].dtype == 'float64'
+    assert isinstance(sales['Product'].dtype, pd.CategoricalDtype)
+    before, after = ExcelHandler.last_memory_savings['Sales_Monthly']
+    assert after < before
+
+
+def test_int32_downcast_leaves_room_for_totals():
+    df = pd.DataFrame({'small': [1.0, -2.0, 3.0], 'large': [2_000_000_000, 1, 2], 'cents': [1.5, 2.0, 3.0]})
+    ExcelHandler._compact_frame(df)
+
+    assert df['small'].dtype == 'int32'
+    assert df['large'].dtype == 'int64'
+    assert df['cents'].dtype == 'float64'
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from financial_analyzer.forecast_engine import ForecastEngine
+
+
+def series(n=14, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'Month': pd.date_range('2024-01-01', periods=n, freq='MS'),
+                         'Revenue': rng.normal(1000, 200, n)})
+
+
+def test_forecast_series_matches_sklearn_fit():
+    df = series()
+    combined, slope = ForecastEngine.forecast_series(df)
+
+    X = df['Month'].map(pd.Timestamp.toordinal).to_numpy()[:, None]
+    model = LinearRegression().fit(X, df['Revenue'])
+    future = [df['Month'].max() + pd.DateOffset(months=i) for i in range(1, 4)]
+
+    assert np.isclose(slope, model.coef_[0])
+    forecast = combined[combined['Type'] == 'Forecast']
+    assert list(forecast['Month']) == future
+    assert np.allclose(forecast['Revenue'], model.predict([[d.toordinal()] for d in future]))
+
+
+def test_batch_fits_every_row_like_forecast_series():
+    frames = [series(seed=s) for s in range(5)]
+    matrix = np.vstack([f['Revenue'].to_numpy() for f in frames])
+    matrix[2, :9] = np.nan  # only 5 observed months
+    matrix[3, 2:] = np.nan  # too short to fit
+
+    res = ForecastEngine.forecast_batch(matrix, frames[0]['Month'], months_ahead=4)
+
+    assert res.future_values.shape == (5, 4)
+    for i in (0, 1, 4):
+        _, slope = ForecastEngine.forecast_series(frames[i], months_ahead=4)
+        assert np.isclose(res.slopes[i], slope)
+    _, slope = ForecastEngine.forecast_series(frames[2].iloc[9:], months_ahead=4)
+    assert np.isclose(res.slopes[2], slope)
+    assert np.isnan(res.slopes[3]) and np.isnan(res.future_values[3]).all()
+
+
+def test_future_months_clip_to_month_end():
+    dates = ForecastEngine._add_months(pd.Timestamp('2024-01-31'), 3)
+    assert list(dates) == [pd.Timestamp('2024-01-31') + pd.DateOffset(months=i) for i in range(1, 4)]
+
+
+def test_forecast_frame_keeps_series_labels():
+    matrix = pd.DataFrame([[1.0, 2.0, 3.0], [30.0, 20.0, 10.0]], index=['A', 'B'],
+                          columns=pd.date_range('2025-01-01', periods=3, freq='MS'))
+    frame = ForecastEngine.forecast_frame(matrix, months_ahead=2)
+
+    assert list(frame.index) == ['A', 'B']
+    assert list(frame.columns) == list(pd.date_range('2025-04-01', periods=2, freq='MS'))
+    assert frame.loc['A'].is_monotonic_increasing and frame.loc['B'].is_monotonic_decreasing
+
+
+def seasonal_matrix(n_series=4, n_months=36, horizon=3, seed=0, multiplicative=False):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_months + horizon)
+    rows = []
+    for i in range(n_series):
+        level, season = 1000 + 10 * (i + 1) * t, np.sin(2 * np.pi * (t + i) / 12)
+        rows.append(level * (1 + 0.2 * season) if multiplicative else level + 200 * season)
+    truth = np.vstack(rows)
+    observed = truth[:, :n_months] + rng.normal(0, 10, (n_series, n_months))
+    return observed, truth[:, n_months:], pd.date_range('2022-01-01', periods=n_months, freq='MS')
+
+
+def test_holt_winters_tracks_seasonality_better_than_a_line():
+    for seasonal in ('additive', 'multiplicative'):
+        observed, future, dates = seasonal_matrix(multiplicative=seasonal == 'multiplicative')
+        hw = ForecastEngine.holt_winters_batch(observed, dates, months_ahead=3, seasonal=seasonal)
+        linear = ForecastEngine.forecast_batch(observed, dates, months_ahead=3)
+
+        assert hw.seasonal.all()
+        assert list(hw.future_dates) == list(pd.date_range('2025-01-01', periods=3, freq='MS'))
+        assert np.abs(hw.future_values - future).mean() < np.abs(linear.future_values - future).mean() / 4
+
+
+def test_holt_winters_batch_matches_fitting_each_series_alone():
+    observed, _, dates = seasonal_matrix()
+    observed[1, 5] = np.nan
+
+    batch = ForecastEngine.holt_winters_batch(observed, dates)
+    for i in range(len(observed)):
+        single = ForecastEngine.holt_winters_batch(observed[i], dates)
+        assert np.allclose(batch.future_values[i], single.future_values[0])
+        assert np.array_equal(batch.params[i], single.params[0])
+
+
+def test_short_history_falls_back_to_trend_only():
+    observed, _, dates = seasonal_matrix(n_months=14)
+    observed[2] = np.nan
+    observed[3, :12] = np.nan  # only 2 observed months
+
+    hw = ForecastEngine.holt_winters_batch(observed, dates)
+
+    assert not hw.seasonal.any()
+    assert np.isfinite(hw.future_values[:2]).all()
+    assert np.isnan(hw.future_values[2:]).all()
+    assert (hw.params[:2, 2] == 0).all()
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.forecast_simulation import prediction_bands, revenue_bands, simulate_paths
+
+
+def residuals(n=40, seed=1):
+    return np.random.default_rng(seed).normal(0, 50, n)
+
+
+def test_paths_are_one_array_and_reproducible():
+    point = np.array([100.0, 110.0, 120.0])
+    first = simulate_paths(point, residuals(), 500, np.random.default_rng(7))
+    second = simulate_paths(point, residuals(), 500, np.random.default_rng(7))
+
+    assert first.shape == (500, 3)
+    assert np.array_equal(first, second)
+    flat = simulate_paths(point, [5.0], 10, np.random.default_rng(0), cumulative=False)
+    assert np.array_equal(flat, np.tile(point + 5.0, (10, 1)))
+
+
+def test_bands_widen_with_horizon_when_errors_compound():
+    point = np.full(6, 1000.0)
+    bands = prediction_bands(point, residuals(), n_paths=20000, seed=3)
+
+    width = bands['P90'] - bands['P10']
+    assert list(bands.columns) == ['P10', 'P50', 'P90']
+    assert width.is_monotonic_increasing
+    assert (bands['P10'] < bands['P50']).all() and (bands['P50'] < bands['P90']).all()
+    pd.testing.assert_frame_equal(bands, prediction_bands(point, residuals(), n_paths=20000, seed=3))
+
+
+def test_chunked_histogram_mode_matches_full_simulation():
+    point = np.linspace(1000, 1200, 12)
+    full = prediction_bands(point, residuals(), n_paths=50000, seed=5)
+    chunked = prediction_bands(point, residuals(), n_paths=50000, seed=5, chunk_paths=4000)
+
+    # Same draws; only the histogram binning differs
+    bin_width = (12 * np.ptp(residuals()) / 4096)
+    assert np.allclose(chunked.to_numpy(), full.to_numpy(), atol=2 * bin_width)
+
+
+def test_memory_budget_switches_to_chunks(monkeypatch):
+    monkeypatch.setenv('SIMULATION_MAX_MB', '0.01')
+    point = np.full(3, 500.0)
+    bands = prediction_bands(point, residuals(), n_paths=20000, seed=1)
+    full = prediction_bands(point, residuals(), n_paths=20000, seed=1, chunk_paths=20000)
+    assert np.allclose(bands.to_numpy(), full.to_numpy(), atol=1.0)
+
+
+def test_revenue_bands_bracket_the_point_forecast():
+    months = pd.date_range('2024-01-01', periods=14, freq='MS')
+    history = pd.DataFrame({'Month': months, 'Revenue': 1000 + 30.0 * np.arange(14) + residuals(14)})
+    forecast = pd.DataFrame({'Month': pd.date_range('2025-03-01', periods=3, freq='MS'),
+                             'Revenue': [1450.0, 1480.0, 1510.0], 'Type': 'Forecast'})
+
+    bands = revenue_bands(history, forecast, 'growth')
+
+    assert list(bands['Month']) == list(forecast['Month'])
+    assert (bands['P10'] < forecast['Revenue']).all() and (forecast['Revenue'] < bands['P90']).all()
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+from financial_analyzer import forecast_store
+from financial_analyzer.analysis_modes import FinancialAnalyzer
+from financial_analyzer.forecast_engine import ForecastEngine
+from financial_analyzer.forecast_store import ForecastStore
+
+
+def matrix(n_series=4, n_months=30, seed=5):
+    rng = np.random.default_rng(seed)
+    months = pd.date_range('2023-01-01', periods=n_months, freq='MS')
+    t = np.arange(n_months)
+    rows = [1000 + 20 * (i + 1) * t + 150 * np.sin(2 * np.pi * t / 12) + rng.normal(0, 20, n_months)
+            for i in range(n_series)]
+    return np.vstack(rows), months
+
+
+def assert_same(a, b):
+    assert type(a) is type(b)
+    for field in a._fields:
+        if field == 'future_dates':
+            assert a.future_dates.equals(b.future_dates)
+        else:
+            assert np.array_equal(getattr(a, field), getattr(b, field), equal_nan=True)
+
+
+def test_only_changed_series_are_refitted(forecast_store):
+    values, months = matrix()
+    calls = []
+
+    def fit(v, dates, horizon, **params):
+        calls.append(len(v))
+        return ForecastEngine.holt_winters_batch(v, dates, horizon, **params)
+
+    first = forecast_store.fit_rows('holt_winters', fit, values, months, 3)
+    assert_same(first, ForecastEngine.holt_winters_batch(values, months, 3))
+
+    values[2, -1] += 500  # one product's last month was revised
+    second = forecast_store.fit_rows('holt_winters', fit, values, months, 3)
+    assert calls == [4, 1]
+    assert_same(second, ForecastEngine.holt_winters_batch(values, months, 3))
+    assert forecast_store.stats()['hits'] == 3
+
+    forecast_store.fit_rows('holt_winters', fit, values, months, 6)  # another horizon is another fit
+    assert calls == [4, 1, 4]
+
+
+def test_entries_survive_a_restart_on_disk(tmp_path):
+    values, months = matrix()
+    store = ForecastStore(store_dir=str(tmp_path))
+    expected = store.fit_rows('linear', ForecastEngine.forecast_batch, values, months, 3)
+    assert len(list(tmp_path.glob('*.pkl'))) == 4
+
+    def fail(*args, **kwargs):
+        raise AssertionError('refitted a stored series')
+
+    restarted = ForecastStore(store_dir=str(tmp_path))
+    assert_same(restarted.fit_rows('linear', fail, values, months, 3), expected)
+    assert restarted.stats()['disk_hits'] == 4
+
+
+def test_lru_and_ttl_eviction(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(forecast_store.time, 'time', lambda: now[0])
+    store = ForecastStore(maxsize=2, ttl=60, store_dir=str(tmp_path))
+
+    store.put('a', 1)
+    store.put('b', 2)
+    assert store.get('a') == (True, 1)
+    store.put('c', 3)  # evicts b, the least recently used
+    assert store.stats()['evictions'] == 1
+    assert [store.get(k)[0] for k in 'ac'] == [True, True]
+
+    now[0] += 61
+    assert store.get('a') == (False, None)
+    assert store.stats()['expirations'] >= 1
+    store.put('d', 4)
+    assert sorted(p.stem for p in tmp_path.glob('*.pkl')) == ['d']
+
+
+def test_analyze_forecast_reuses_stored_holt_winters_fit(forecast_store):
+    values, months = matrix(n_series=1)
+    dfs = {'Sales_Monthly': pd.DataFrame({'Product': 'Widget', 'Type': 'Operating Income',
+                                          'Month': months, 'Revenue': values[0]})}
+    res = FinancialAnalyzer.analyze_forecast(dfs, 'holt_winters')
+    assert forecast_store.stats()['misses'] == 1
+
+    reloaded = {'Sales_Monthly': dfs['Sales_Monthly'].copy()}  # same numbers, new dataset object
+    again = FinancialAnalyzer._forecast_from(FinancialAnalyzer.analyze_sales(reloaded), 'holt_winters')
+    assert forecast_store.stats()['hits'] == 1
+    pd.testing.assert_frame_equal(again['forecast'], res['forecast'])
+
+
+def test_concurrent_first_calls_share_one_store(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(forecast_store, '_default_store', None)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        stores = list(pool.map(lambda _: forecast_store.get_forecast_store(), range(64)))
+    assert all(store is stores[0] for store in stores)
@@ -0,0 +1,70 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+from financial_analyzer.conftest import build_quickbooks_workbook
+from financial_analyzer.microsoft_excel import ExcelHandler
+from financial_analyzer.workbook_cache import get_workbook_cache
+
+
+def fetch(server):
+    return ExcelHandler._fetch_from_graph({'url': server.url})
+
+
+def test_unchanged_workbook_is_served_from_cache(workbook_server, monkeypatch):
+    first = fetch(workbook_server)
+    assert 'If-None-Match' not in workbook_server.requests[0]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("workbook was re-parsed")
+    monkeypatch.setattr(ExcelHandler, '_parse_excel', fail)
+
+    second = fetch(workbook_server)
+    assert workbook_server.requests[1]['If-None-Match'] == '"v1"'
+    assert workbook_server.requests[1]['If-Modified-Since'] == workbook_server.last_modified
+    pd.testing.assert_frame_equal(second['Sales_Monthly'], first['Sales_Monthly'])
+
+
+def test_changed_workbook_is_downloaded_again(workbook_server):
+    fetch(workbook_server)
+    workbook_server.publish(build_quickbooks_workbook(n_accounts=6), '"v2"')
+
+    dfs = fetch(workbook_server)
+    assert dfs['Sales_Monthly']['Product'].nunique() == 6
+    assert get_workbook_cache().get_validators(workbook_server.url)['etag'] == '"v2"'
+
+
+def test_validators_without_cached_parse_are_not_sent(workbook_server, workbook_cache_dir):
+    fetch(workbook_server)
+    for entry in workbook_cache_dir.iterdir():
+        if entry.is_dir():
+            shutil.rmtree(entry)
+    assert get_workbook_cache().get_validators(workbook_server.url) is not None
+
+    dfs = fetch(workbook_server)
+    assert 'If-None-Match' not in workbook_server.requests[1]
+    assert 'Sales_Monthly' in dfs
+
+
+def test_http_errors_are_raised(workbook_server):
+    workbook_server.responses = [404]
+    with pytest.raises(RuntimeError):
+        fetch(workbook_server)
+    assert len(workbook_server.requests) == 1  # client errors are not retried
+
+
+def test_server_errors_are_retried(workbook_server):
+    workbook_server.responses = [503, 429]
+
+    dfs = fetch(workbook_server)
+    assert len(workbook_server.requests) == 3
+    assert 'Sales_Monthly' in dfs
+
+
+def test_large_download_is_spooled_to_disk(workbook_server, monkeypatch):
+    monkeypatch.setattr(ExcelHandler, 'DOWNLOAD_SPOOL_BYTES', 1024)
+    monkeypatch.setattr(ExcelHandler, 'DOWNLOAD_CHUNK_BYTES', 512)
+
+    dfs = fetch(workbook_server)
+    assert sorted(dfs['AR'].columns)[:2] == ['1 - 30', '31 - 60']
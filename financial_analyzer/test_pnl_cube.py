@@ -0,0 +1,64 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.microsoft_excel import ExcelHandler
+from financial_analyzer.pnl_cube import PnLCube
+
+
+def segments():
+    months = pd.to_datetime(['2025-01-01', '2025-02-01', '2025-01-01', '2025-03-01', None])
+    sales = pd.DataFrame({'Product': ['Consulting', 'Consulting', 'Licenses', 'Licenses', 'Licenses'],
+                          'Type': 'Operating Income', 'Month': months, 'Revenue': [100.0, 120.0, 50.0, 70.0, 5.0]})
+    expenses = pd.DataFrame({'Product': ['Rent', 'Rent', 'Payroll'], 'Type': 'Operating Expense',
+                             'Month': pd.to_datetime(['2025-01-01', '2025-02-01', '2025-02-01']),
+                             'Revenue': [30.0, 30.0, 80.0]})
+    return {'Sales_Monthly': sales, 'Expenses_Monthly': expenses}
+
+
+def test_cube_reductions_match_groupby_and_pivot():
+    dfs = segments()
+    cube = PnLCube.build(dfs)
+    sales = dfs['Sales_Monthly']
+
+    pd.testing.assert_series_equal(cube.monthly_totals('Sales_Monthly'), sales.groupby('Month')['Revenue'].sum(),
+                                   check_freq=False)
+    pd.testing.assert_series_equal(cube.account_totals('Sales_Monthly'), sales.groupby('Product')['Revenue'].sum())
+    pivot = sales.pivot_table(index='Product', columns='Month', values='Revenue', aggfunc='sum', fill_value=0)
+    pd.testing.assert_frame_equal(cube.account_matrix('Sales_Monthly'), pivot.astype(float), check_freq=False)
+
+
+def test_segments_are_combined_on_a_shared_month_axis():
+    cube = PnLCube.build(segments())
+
+    assert list(cube.months) == list(pd.to_datetime(['2025-01-01', '2025-02-01', '2025-03-01']))
+    assert cube.monthly_totals('Expenses_Monthly').tolist() == [30.0, 110.0]
+    assert np.array_equal(cube.values.sum(axis=0), [180.0, 230.0, 70.0])
+
+    facts = cube.facts('Expenses_Monthly', products=['Rent'])
+    assert facts['Revenue'].tolist() == [30.0, 30.0]
+
+
+def test_cube_is_built_once_per_dataset(quickbooks_workbook):
+    dfs = ExcelHandler._parse_excel(BytesIO(quickbooks_workbook))
+    assert PnLCube.for_dataset(dfs) is PnLCube.for_dataset(dfs)
+
+
+def test_facts_keep_the_concatenated_sheet_order():
+    months = pd.date_range('2025-01-01', periods=3, freq='MS')
+
+    def sheet(names, kind, base):
+        return pd.DataFrame([{'Product': n, 'Type': kind, 'Month': m, 'Revenue': base * (i + 1) + j}
+                             for j, m in enumerate(months) for i, n in enumerate(names)])
+
+    dfs = {'Expenses_Monthly': sheet(['Rent', 'Payroll', 'Misc'], 'Operating Expense', 100.0),
+           'Other_Expenses_Monthly': sheet(['Interest', 'Bank fees'], 'Other Expense', 150.0)}
+    segments = ('Expenses_Monthly', 'Other_Expenses_Monthly')
+    names = ['Misc', 'Bank fees', 'Payroll', 'Interest', 'Rent']
+
+    # What analyze_spending's top_5_trend was before the cube: concat, then filter
+    combined = pd.concat([dfs[s] for s in segments])
+    expected = combined[combined['Product'].isin(names)].reset_index(drop=True)
+    facts = PnLCube.build(dfs).facts(*segments, products=names)
+    pd.testing.assert_frame_equal(facts, expected[facts.columns], check_dtype=False)
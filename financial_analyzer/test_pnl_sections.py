@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from financial_analyzer.microsoft_excel import ExcelHandler
+
+
+def legacy_classify(mom_df, col_0):
+    """The original row-by-row categorization loop from _parse_excel, kept as the golden reference."""
+    mom_df = mom_df.copy()
+    mom_df['Type'] = 'Other'
+    current_main_type = 'Other'
+    current_sub_type = 'Operating'
+
+    for idx, row in mom_df.iterrows():
+        val = str(row[col_0]).strip().lower()
+
+        if val == 'income':
+            current_main_type = 'Income'
+            current_sub_type = 'Operating'
+        elif val == 'cost of goods sold':
+            current_main_type = 'COGS'
+            current_sub_type = 'Operating'
+        elif val == 'expenses' or val == 'expense':
+            current_main_type = 'Expense'
+            current_sub_type = 'Operating'
+        elif val == 'other income':
+            current_main_type = 'Income'
+            current_sub_type = 'Other'
+        elif val == 'other expenses' or val == 'other expense':
+            current_main_type = 'Expense'
+            current_sub_type = 'Other'
+
+        if current_main_type == 'COGS':
+            mom_df.at[idx, 'Type'] = 'COGS'
+        else:
+            mom_df.at[idx, 'Type'] = f"{current_sub_type} {current_main_type}"
+    return mom_df['Type']
+
+
+def test_classifier_matches_legacy_loop_on_random_reports():
+    rng = np.random.default_rng(7)
+    vocabulary = ['Income', ' income ', 'INCOME', 'Cost of Goods Sold', 'Expenses', 'expense', 'Other Income',
+                  'Other Expenses', 'other expense', 'Sales', 'Rent', 'Total for Income', 'Net Income',
+                  'Gross Profit', None, np.nan, 42, 'Income tax']
+
+    for _ in range(50):
+        labels = rng.choice(np.array(vocabulary, dtype=object), size=int(rng.integers(1, 80)))
+        index = rng.permutation(len(labels) * 2)[:len(labels)]  # non-contiguous, like after dropna
+        mom_df = pd.DataFrame({'Distribution account': labels}, index=index)
+
+        expected = legacy_classify(mom_df, 'Distribution account')
+        actual = ExcelHandler._classify_pnl_sections(mom_df['Distribution account'])
+
+        pd.testing.assert_series_equal(actual, expected, check_names=False)
+
+
+def test_classifier_matches_legacy_loop_on_quickbooks_export(quickbooks_workbook):
+    from io import BytesIO
+
+    raw = pd.read_excel(BytesIO(quickbooks_workbook), sheet_name='MOM PL', header=None)
+    mom_df = ExcelHandler._autodetect_table(raw, 'MOM PL')
+
+    expected = legacy_classify(mom_df, 'Distribution account')
+    actual = ExcelHandler._classify_pnl_sections(mom_df['Distribution account'])
+
+    pd.testing.assert_series_equal(actual, expected, check_names=False)
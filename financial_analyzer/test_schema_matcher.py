@@ -0,0 +1,50 @@
+import random
+
+import pandas as pd
+
+from financial_analyzer.schema_matcher import CompiledResolver, SchemaMatcher
+
+
+def legacy_get_column(df, target_name):
+    """The original per-call scan, kept as the reference behaviour."""
+    if target_name in df.columns:
+        return target_name
+    col_map = {c.lower(): c for c in df.columns}
+    if target_name.lower() in col_map:
+        return col_map[target_name.lower()]
+    for alias in SchemaMatcher.ALIASES.get(target_name, []):
+        if alias in col_map:
+            return col_map[alias]
+        for col_lower in col_map:
+            if alias in col_lower:
+                return col_map[col_lower]
+    return None
+
+
+def test_resolutions_match_the_original_scan():
+    rng = random.Random(7)
+    vocabulary = ['Date', 'DATE', 'Txn Date', 'Amount', 'Net Amount', 'Total', 'Memo', 'Customer Name', 'Vendor',
+                  'Status', 'Due Date', 'Invoice #', 'Income', 'Sales', 'Balance', 'Credit', 'Product', 'Month']
+    for _ in range(300):
+        df = pd.DataFrame(columns=rng.sample(vocabulary, rng.randint(1, 8)))
+        for target in list(SchemaMatcher.ALIASES) + ['Product', 'Month', 'Missing']:
+            assert SchemaMatcher.get_column(df, target) == legacy_get_column(df, target)
+
+
+def test_get_sheet_uses_aliases():
+    dfs = {'Open Invoices': pd.DataFrame({'a': [1]}), 'bank': pd.DataFrame({'b': [2]})}
+
+    assert SchemaMatcher.get_sheet(dfs, 'AR') is dfs['Open Invoices']
+    assert SchemaMatcher.get_sheet(dfs, 'Cash') is dfs['bank']
+    assert SchemaMatcher.get_sheet(dfs, 'open invoices') is dfs['Open Invoices']
+    assert SchemaMatcher.get_sheet(dfs, 'GL') is None
+
+
+def test_repeated_lookups_are_cache_hits():
+    resolver = CompiledResolver({'Amount': ['amount', 'total']})
+    columns = pd.Index(['Name', 'Grand Total'])
+
+    assert resolver.resolve(columns, 'Amount') == 'Grand Total'
+    assert resolver.resolve(pd.Index(['Name', 'Grand Total']), 'Amount') == 'Grand Total'
+    assert resolver.resolve(columns, 'Missing') is None
+    assert resolver.stats() == {'size': 2, 'hits': 1, 'misses': 2}
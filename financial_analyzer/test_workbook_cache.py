@@ -0,0 +1,70 @@
+import json
+import os
+
+import pandas as pd
+
+from financial_analyzer.microsoft_excel import ExcelHandler
+from financial_analyzer.workbook_cache import WorkbookCache
+
+
+def test_cached_parse_round_trips(quickbooks_workbook, workbook_cache_dir):
+    fresh = ExcelHandler._parse_cached(quickbooks_workbook)
+    cached = ExcelHandler._parse_cached(quickbooks_workbook)
+
+    assert list(cached) == list(fresh)
+    for sheet in fresh:
+        pd.testing.assert_frame_equal(cached[sheet], fresh[sheet])
+    assert len(os.listdir(workbook_cache_dir)) == 1
+
+
+def test_cache_hit_skips_parsing(quickbooks_workbook, monkeypatch):
+    ExcelHandler._parse_cached(quickbooks_workbook)
+
+    def fail(_):
+        raise AssertionError("workbook was re-parsed")
+
+    monkeypatch.setattr(ExcelHandler, '_parse_excel', staticmethod(fail))
+    assert 'Sales_Monthly' in ExcelHandler._parse_cached(quickbooks_workbook)
+
+
+def test_lru_eviction_keeps_cache_bounded(tmp_path):
+    cache = WorkbookCache(str(tmp_path), max_bytes=1)
+    frame = {'Sheet': pd.DataFrame({'Amount': range(100)})}
+
+    cache.put('old', frame)
+    cache.put('new', frame)
+
+    assert cache.get('old') is None
+    assert cache.get('new') is not None
+
+
+def test_cache_directory_is_private(tmp_path):
+    cache = WorkbookCache(str(tmp_path / 'cache'))
+    cache.put('key', {'Sheet': pd.DataFrame({'Amount': [1, 2]})})
+
+    assert os.stat(tmp_path / 'cache').st_mode & 0o777 == 0o700
+    assert cache.get('key') is not None
+
+    os.chmod(tmp_path / 'cache', 0o777)  # e.g. a shared directory other users can plant files in
+    assert cache.get('key') is None
+    cache.put('other', {'Sheet': pd.DataFrame({'Amount': [1]})})
+    assert not cache.contains('other')
+
+
+def test_pickled_entries_are_never_loaded(tmp_path):
+    cache = WorkbookCache(str(tmp_path))
+    entry = tmp_path / 'planted'
+    entry.mkdir()
+    pd.DataFrame({'Amount': [1]}).to_pickle(entry / '0.pkl')
+    (entry / 'manifest.json').write_text(json.dumps({'sheets': [{'name': 'S', 'file': '0.pkl', 'format': 'pickle'}]}))
+
+    assert cache.get('planted') is None
+    assert not entry.exists()
+
+
+def test_frames_parquet_cannot_round_trip_are_not_cached(tmp_path):
+    cache = WorkbookCache(str(tmp_path))
+    cache.put('mixed', {'Sheet': pd.DataFrame({'Cell': ['text', 1.5, pd.Timestamp('2025-01-01')]})})
+
+    assert not cache.contains('mixed')
+    assert cache.get('mixed') is None
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except Exception:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Per-user cache root (not the shared temp directory, where other local users could plant entries)
+DEFAULT_CACHE_DIR = os.path.join(os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                                 'financial_analyzer', 'workbooks')
+DEFAULT_MAX_MB = 256
+MANIFEST_NAME = 'manifest.json'
+VALIDATORS_NAME = 'validators.json'
+
+
+class WorkbookCache:
+    """
+    Persistent on-disk cache of parsed workbooks.
+
+    Entries are keyed by a hash of the workbook bytes, so an unchanged file always
+    maps to the same entry. Sheets are stored as parquet only (never pickle, so a planted
+    file cannot execute code); a workbook with a frame parquet cannot represent, e.g.
+    mixed-type object columns, is simply not cached. The directory is created private
+    (0700) and ignored unless it is owned by the current user and not writable by others.
+    The cache directory is bounded by `max_bytes`; least recently used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or os.getenv('WORKBOOK_CACHE_DIR', DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('WORKBOOK_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(data):
+        """Returns the content hash used as cache key for workbook bytes."""
+        return hashlib.sha256(data).hexdigest()
+
+    def _ensure_private_dir(self):
+        """Creates the cache directory (0700) and checks nobody else can write into it."""
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        if hasattr(os, 'getuid'):
+            st = os.stat(self.cache_dir)
+            if st.st_uid != os.getuid() or st.st_mode & 0o022:
+                raise PermissionError(f"Workbook cache directory {self.cache_dir} is not private to this user")
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def contains(self, key):
+        """Returns True if a complete entry is stored under `key`."""
+        return os.path.isfile(os.path.join(self._entry_dir(key), MANIFEST_NAME))
+
+    def get(self, key):
+        """
+        Returns the cached dict of DataFrames for `key`, or None on a miss.
+        A hit refreshes the entry's LRU position.
+        """
+        entry = self._entry_dir(key)
+        manifest_path = os.path.join(entry, MANIFEST_NAME)
+        if not os.path.isfile(manifest_path):
+            return None
+        try:
+            self._ensure_private_dir()
+        except Exception as e:
+            logger.warning(f"Not reading workbook cache: {e}")
+            return None
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+
+            dfs = {}
+            for sheet in manifest['sheets']:
+                if sheet['format'] != 'parquet':
+                    raise ValueError(f"unsupported sheet format {sheet['format']!r}")
+                df = pd.read_parquet(os.path.join(entry, os.path.basename(sheet['file'])))
+                # Parquet turns missing values in object columns into None; restore NaN
+                for col in df.columns[df.dtypes == object]:
+                    df[col] = df[col].where(df[col].notna(), np.nan)
+                dfs[sheet['name']] = df
+
+            os.utime(manifest_path)  # mark as recently used
+            return dfs
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable workbook cache entry {key}: {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+    def put(self, key, dfs):
+        """
+        Stores a parsed workbook under `key` and enforces the size cap. Workbooks with a
+        sheet parquet cannot round-trip (or without pyarrow) are not cached.
+        """
+        if self.max_bytes <= 0 or not PARQUET_AVAILABLE:
+            return
+
+        try:
+            self._ensure_private_dir()
+        except Exception as e:
+            logger.warning(f"Not writing workbook cache: {e}")
+            return
+        # Write into a private staging directory and rename it into place so readers
+        # never observe a half-written entry.
+        staging = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}.tmp")
+        os.makedirs(staging, mode=0o700)
+        try:
+            sheets = []
+            for i, (name, df) in enumerate(dfs.items()):
+                table = self._to_arrow(df)
+                if table is None:
+                    logger.info(f"Not caching workbook {key}: sheet {name!r} does not round-trip through parquet")
+                    shutil.rmtree(staging, ignore_errors=True)
+                    return
+                pq.write_table(table, os.path.join(staging, f"{i}.parquet"))
+                sheets.append({'name': name, 'file': f"{i}.parquet", 'format': 'parquet'})
+
+            with open(os.path.join(staging, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+                json.dump({'created': time.time(), 'sheets': sheets}, f)
+
+            with self._lock:
+                entry = self._entry_dir(key)
+                if os.path.exists(entry):
+                    shutil.rmtree(staging, ignore_errors=True)
+                else:
+                    os.rename(staging, entry)
+                self._evict(keep=key)
+        except Exception as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            logger.warning(f"Could not write workbook cache entry {key}: {e}")
+
+    @staticmethod
+    def _to_arrow(df):
+        """
+        Converts a frame to an Arrow table, or returns None when parquet would not
+        round-trip it (object columns holding numbers/dates come back re-typed).
+        """
+        table = pa.Table.from_pandas(df)
+        for col in df.columns[df.dtypes == object]:
+            field_type = table.schema.field(str(col)).type
+            if not (pa.types.is_string(field_type) or pa.types.is_null(field_type)):
+                return None
+        return table
+
+    def _evict(self, keep=None):
+        """Deletes least recently used entries until the cache fits in `max_bytes`."""
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            manifest_path = os.path.join(path, MANIFEST_NAME)
+            if name.startswith('.') or not os.path.isfile(manifest_path):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(manifest_path), name, size))
+            total += size
+
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+            total -= size
+            logger.info(f"Evicted workbook cache entry {name} ({size} bytes)")
+
+    def get_validators(self, url):
+        """
+        Returns the HTTP validators stored for `url` as a dict with 'etag', 'last_modified'
+        and 'digest' (hash of the workbook they describe), or None.
+        """
+        return self._read_validators().get(self.digest(url.encode('utf-8')))
+
+    def put_validators(self, url, etag, last_modified, digest):
+        """Remembers the ETag/Last-Modified a download of `url` was served with."""
+        if not (etag or last_modified):
+            return
+        with self._lock:
+            validators = self._read_validators()
+            validators[self.digest(url.encode('utf-8'))] = {
+                'etag': etag, 'last_modified': last_modified, 'digest': digest}
+            try:
+                self._ensure_private_dir()
+                path = os.path.join(self.cache_dir, VALIDATORS_NAME)
+                staging = f"{path}.{uuid.uuid4().hex}.tmp"
+                with open(staging, 'w', encoding='utf-8') as f:
+                    json.dump(validators, f)
+                os.replace(staging, path)
+            except Exception as e:
+                logger.warning(f"Could not store HTTP validators: {e}")
+
+    def _read_validators(self):
+        try:
+            with open(os.path.join(self.cache_dir, VALIDATORS_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def clear(self):
+        """Removes every cached workbook."""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+_default_cache = None
+
+
+def get_workbook_cache():
+    """Returns the process-wide WorkbookCache configured from the environment."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = WorkbookCache()
+    return _default_cache